@@ -1,11 +1,83 @@
 import logging
-from src.settings.config import setup_logging
+import argparse
+from ecomma.settings.config import RAW_DATA, PROCESSED_DATA, setup_logging
+from ecomma.orchestrator import Stage, run_pipeline
+
+EXTRACT_MAX_AGE = 24 * 3600
+# seed is per id block: each datagen run mixes it with the order id block it claims, so seed 42 gives new data every run.
+# Replay a run with run_parallel_data_generation(seed=42, id_block=<block from its log>).
+DATAGEN_CONFIG = {"seed": 42, "orders_rows": 10000, "promotions_rows": 30000, "marketing_rows": 30000, "parquet": True}
+GENERATED = ["orders", "marketing", "promotions"]
+API_RESOURCES = ["products", "users", "carts"]
+
+# Stage bodies import their modules lazily, so a rerun where every stage is skipped never loads pandas/pyarrow/pandera.
+
+def extract_api():
+    from ecomma.extract.runner import run_extraction
+    run_extraction(parquet=True)
+
+def extract_sheets():
+    from ecomma.extract.extract_sheets import extract_sheets_parallel
+    extract_sheets_parallel(parquet=True)
+
+def datagen():
+    from ecomma.datagen.runner import run_parallel_data_generation
+    run_parallel_data_generation(merge=True, **DATAGEN_CONFIG)
+
+def transform():
+    from ecomma.transform.runner import run_transform
+    run_transform()
+
+def validate():
+    from ecomma.transform.validation import run_validation
+    run_validation()
+
+def dedup():
+    from ecomma.storage.dedup import run_dedup
+    run_dedup()
+
+def load():
+    from ecomma.load.runner import run_load
+    run_load()
+
+def aggregate():
+    from ecomma.aggregate.cube import CUBES, update_cube
+    for name in CUBES:
+        update_cube(name)
+
+STAGES = [
+    Stage("extract_api", extract_api, config={"resources": API_RESOURCES}, max_age=EXTRACT_MAX_AGE),
+    Stage("extract_sheets", extract_sheets, max_age=EXTRACT_MAX_AGE),
+    Stage("datagen", datagen, deps=("extract_api",), config=DATAGEN_CONFIG,
+          inputs=((RAW_DATA / "products", "**/*.jsonl*"), (RAW_DATA / "users", "**/*.jsonl*"))),
+    Stage("transform", transform, deps=("datagen",),
+          inputs=tuple((RAW_DATA / name, "*.csv") for name in GENERATED)),
+    Stage("validate", validate, deps=("datagen", "extract_api"),
+          inputs=tuple((RAW_DATA / name, "*.csv") for name in GENERATED) +
+                 tuple((RAW_DATA / name, "*.jsonl*") for name in API_RESOURCES)),
+    Stage("dedup", dedup, deps=("datagen", "extract_api"),
+          inputs=tuple((RAW_DATA / name, "*.csv") for name in GENERATED) +
+                 tuple((RAW_DATA / name, "**/*.jsonl*") for name in API_RESOURCES)),
+    Stage("load", load, deps=("transform", "extract_api"),
+          inputs=tuple((PROCESSED_DATA / name, "**/*.parquet") for name in GENERATED) +
+                 tuple((RAW_DATA / name, "**/*.jsonl*") for name in API_RESOURCES)),
+    Stage("aggregate", aggregate, deps=("datagen",),
+          inputs=((RAW_DATA / "orders", "*.csv"), (RAW_DATA / "marketing", "*.csv"))),
+]
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the ecomma pipeline")
+    parser.add_argument("--force", nargs="+", default=[], help="stages to rerun regardless of their inputs, or 'all'")
+    parser.add_argument("--workers", type=int, default=4, help="stages allowed to run at the same time")
+    args = parser.parse_args(argv)
 
-def main():
     logger = logging.getLogger(__name__)
     setup_logging()
+    logger.info("Starting pipeline...")
+    status = run_pipeline(STAGES, max_workers=args.workers, force=args.force)
+    return 1 if any(s in ("failed", "blocked") for s in status.values()) else 0
 
 
 
 if __name__ == "__main__":
-    main()
+    raise SystemExit(main())
@@ -0,0 +1,108 @@
+import logging
+import numpy as np
+import pandas as pd
+from ecomma.transform.categories import canonicalize
+from ecomma.transform.dates import default_parser, DAYFIRST
+
+logger = logging.getLogger(__name__)
+
+NO_DAY = np.iinfo(np.int64).min
+
+
+def as_days(series, dataset):
+    '''Day numbers (days since 1970-01-01) for a date column; raw strings are parsed first. Missing dates become NO_DAY.'''
+    if not pd.api.types.is_datetime64_any_dtype(series):
+        series = default_parser.parse(series, DAYFIRST[dataset])
+    return series.to_numpy("datetime64[ns]").astype("datetime64[D]").astype(np.int64)
+
+
+def as_codes(series):
+    return np.asarray(canonicalize(series, "promo_code").astype(object))
+
+
+class WindowIndex:
+
+    '''Per promo code, keeps the code's date windows as arrays sorted by start day. For each order, a binary search (searchsorted) finds the windows that started on or before the order day. A prefix maximum of end days rules out codes with no active window in O(1). Among the remaining candidates, the most recently started window still running on the order day wins. A second sorted array of end days gives the number of overlapping active windows in O(log n).'''
+
+    def __init__(self, codes, starts, ends, labels):
+        df = pd.DataFrame({"code": codes, "start": starts, "end": ends, "label": labels})
+        # windows without a label (e.g. a blank Campaign_ID) cannot be attributed and must not shadow older ones
+        df = df[df["code"].notna() & df["label"].notna() & (df["start"] != NO_DAY) & (df["end"] != NO_DAY) & (df["end"] >= df["start"])]
+        df = df.sort_values(["code", "start"], kind="stable")
+
+        self.groups = {}
+        for code, group in df.groupby("code", sort=False):
+            ends_by_start = group["end"].to_numpy()
+            self.groups[code] = (
+                group["start"].to_numpy(),
+                ends_by_start,
+                np.maximum.accumulate(ends_by_start),
+                np.sort(ends_by_start),
+                group["label"].to_numpy(dtype=object),
+            )
+
+    def match(self, codes, days):
+        '''Returns (matched label or None, number of active windows) for each (code, day) pair.'''
+        labels = np.full(len(days), None, dtype=object)
+        active = np.zeros(len(days), dtype=np.int64)
+
+        for code, positions in pd.Series(np.arange(len(days))).groupby(codes, sort=False).groups.items():
+            if code not in self.groups:
+                continue
+            starts, ends, max_ends, sorted_ends, group_labels = self.groups[code]
+            positions = np.asarray(positions)
+            t = days[positions]
+            valid = t != NO_DAY
+
+            started = np.searchsorted(starts, t, side="right")
+            active[positions] = np.where(valid, started - np.searchsorted(sorted_ends, t, side="left"), 0)
+
+            idx = started - 1
+            pending = valid & (idx >= 0)
+            pending[pending] = max_ends[idx[pending]] >= t[pending]
+            while pending.any():
+                hit = pending & (ends[np.maximum(idx, 0)] >= t)
+                labels[positions[hit]] = group_labels[idx[hit]]
+                pending &= ~hit
+                idx = idx - pending
+        return labels, active
+
+
+def build_index(df, code_col, start_col, end_col, label_col, dataset):
+    return WindowIndex(as_codes(df[code_col]), as_days(df[start_col], dataset), as_days(df[end_col], dataset),
+                       df[label_col].to_numpy(dtype=object))
+
+
+def attribute_orders(orders, campaigns, promotions):
+
+    '''Attributes every order to the campaign and promotion whose promo code matches the order's promo_code_used and whose Start_Date-End_Date window covers the order day. Both indexes are keyed on the normalized promo code, so there is no merge-then-filter blow-up. Returns a frame aligned with orders with campaign_id, active_campaigns, promo_id and active_promos.'''
+
+    codes = as_codes(orders["promo_code_used"])
+    days = as_days(orders["order_date"], "orders")
+
+    campaign_index = build_index(campaigns, "Promo_Code_Linked", "Start_Date", "End_Date", "Campaign_ID", "marketing")
+    promo_index = build_index(promotions, "Promo_Code", "Start_Date", "End_Date", "Promo_ID", "promotions")
+
+    campaign_id, active_campaigns = campaign_index.match(codes, days)
+    promo_id, active_promos = promo_index.match(codes, days)
+
+    result = pd.DataFrame({
+        "campaign_id": campaign_id,
+        "active_campaigns": active_campaigns,
+        "promo_id": promo_id,
+        "active_promos": active_promos,
+    }, index=orders.index)
+    logger.info(f"Attributed {result['campaign_id'].notna().sum()}/{len(result)} orders to campaigns, "
+                f"{result['promo_id'].notna().sum()} to promotions")
+    return result
+
+
+def campaign_revenue(orders, attribution):
+    '''Order count and revenue (total_amount) per attributed campaign.'''
+    revenue = pd.to_numeric(orders["total_amount"], errors="coerce")
+    return (pd.DataFrame({"campaign_id": attribution["campaign_id"], "revenue": revenue})
+            .dropna(subset=["campaign_id"])
+            .groupby("campaign_id")["revenue"]
+            .agg(orders="count", revenue="sum")
+            .sort_values("revenue", ascending=False)
+            .reset_index())
@@ -0,0 +1,187 @@
+import os
+import logging
+from functools import lru_cache
+import pandas as pd
+from ecomma.settings.config import RAW_DATA, FINAL_DATA
+from ecomma.storage.manifest import pending_files
+from ecomma.transform.currency import normalize_amounts, AMOUNT_COLUMNS
+from ecomma.transform.dates import normalize_dates
+from ecomma.transform.categories import canonicalize_columns
+
+logger = logging.getLogger(__name__)
+
+CUBE_DIR = FINAL_DATA / "cube"
+NO_VALUE = "(none)"
+CHUNK_SIZE = 500000
+
+
+def read_raw_csv(path, chunksize=CHUNK_SIZE):
+    return pd.read_csv(path, dtype=str, keep_default_na=False, na_values=[""], chunksize=chunksize)
+
+
+def fill_dims(df, dims):
+    return df.assign(**{dim: df[dim].astype(object).where(df[dim].notna(), NO_VALUE) for dim in dims if dim != "date"})
+
+
+def aggregate_orders(chunk):
+    '''Rolls raw orders up to daily grain by status, payment method and promo code.'''
+    df = canonicalize_columns(normalize_dates(normalize_amounts(chunk, AMOUNT_COLUMNS["orders"]), "orders"), "orders")
+    df = pd.DataFrame({
+        "date": df["order_date"].dt.normalize(),
+        "status": df["status"],
+        "payment_method": df["payment_method"],
+        "promo_code": df["promo_code_used"],
+        "orders": 1,
+        "promo_orders": df["promo_code_used"].notna().astype(int),
+        "revenue": df["total_amount"].fillna(0),
+        "subtotal": df["subtotal_before_discount"].fillna(0),
+        "discount": df["discount_applied"].fillna(0),
+        "product_cost": df["product_cost"].fillna(0),
+    })
+    dims = CUBES["orders"]["dims"]
+    return fill_dims(df, dims).groupby(dims, as_index=False, dropna=False).sum()
+
+
+def aggregate_marketing(chunk):
+    '''Rolls raw campaign rows up to daily grain (by start date) by channel, region and linked promo code.'''
+    df = canonicalize_columns(normalize_dates(normalize_amounts(chunk, AMOUNT_COLUMNS["marketing"]), "marketing"), "marketing")
+    df = pd.DataFrame({
+        "date": df["Start_Date"],
+        "channel": df["Channel"],
+        "region": df["Target_Region"],
+        "promo_code": df["Promo_Code_Linked"],
+        "campaigns": 1,
+        "spend": df["Budget_Spend"].fillna(0),
+        "impressions": pd.to_numeric(df["Impressions"], errors="coerce").fillna(0),
+        "clicks": pd.to_numeric(df["Clicks"], errors="coerce").fillna(0),
+    })
+    dims = CUBES["marketing"]["dims"]
+    return fill_dims(df, dims).groupby(dims, as_index=False, dropna=False).sum()
+
+
+# cube -> raw folder, dimensions, additive measures and the aggregation applied to each raw chunk
+CUBES = {
+    "orders": {
+        "folder": "orders",
+        "dims": ["date", "status", "payment_method", "promo_code"],
+        "measures": ["orders", "promo_orders", "revenue", "subtotal", "discount", "product_cost"],
+        "aggregate": aggregate_orders,
+    },
+    "marketing": {
+        "folder": "marketing",
+        "dims": ["date", "channel", "region", "promo_code"],
+        "measures": ["campaigns", "spend", "impressions", "clicks"],
+        "aggregate": aggregate_marketing,
+    },
+}
+
+
+def cube_path(name, cube_dir=None):
+    return (cube_dir or CUBE_DIR) / f"{name}_daily.parquet"
+
+
+def update_cube(name, cube_dir=None):
+
+    '''Folds raw files not yet seen by this cube into FINAL_DATA/cube/<name>_daily.parquet. All measures are additive, so each new file is aggregated chunk by chunk and merged into the existing cube by summing. The manifest makes a rerun with no new files a no-op. Returns the number of files added.'''
+
+    spec = CUBES[name]
+    manifest, files = pending_files(f"cube_{name}", RAW_DATA / spec["folder"], suffixes=(".csv",))
+    if not files:
+        return 0
+
+    path = cube_path(name, cube_dir)
+    parts = [pd.read_parquet(path)] if path.exists() else []
+    for file_path in files:
+        parts.extend(spec["aggregate"](chunk) for chunk in read_raw_csv(file_path))
+
+    cube = pd.concat(parts, ignore_index=True).groupby(spec["dims"], as_index=False, dropna=False)[spec["measures"]].sum()
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(path.name + ".tmp")
+    cube.to_parquet(tmp_path, index=False)
+    os.replace(tmp_path, path)
+
+    for file_path in files:
+        manifest.mark_done(file_path)
+    logger.info(f"Cube {name}: added {len(files)} file(s), {len(cube)} cells")
+    return len(files)
+
+
+def add_derived_metrics(df):
+    if "revenue" in df:
+        df["margin"] = df["revenue"] - df["product_cost"]
+        df["margin_pct"] = df["margin"] / df["revenue"].where(df["revenue"] != 0)
+        df["promo_uptake"] = df["promo_orders"] / df["orders"].where(df["orders"] != 0)
+    if "clicks" in df:
+        df["ctr"] = df["clicks"] / df["impressions"].where(df["impressions"] != 0)
+    return df
+
+
+class KpiCube:
+
+    '''Query API over the materialized cubes for the dashboard. Results are memoized in an LRU cache keyed on the query arguments. Every query compares the cube file's version (mtime and size) with the one its cached frame was read from, so a cube rewritten by refresh() or by another process (the pipeline's aggregate stage) clears the cached frames and results.'''
+
+    def __init__(self, cube_dir=None, cache_size=256):
+        self.cube_dir = cube_dir
+        self.frames = {}
+        self.versions = {}
+        self.cached_query = lru_cache(maxsize=cache_size)(self.compute)
+
+    def version(self, name):
+        try:
+            stat = cube_path(name, self.cube_dir).stat()
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def check_version(self, name):
+        '''Drops every cached frame and result if the cube file changed since its frame was read.'''
+        version = self.version(name)
+        if name in self.versions and self.versions[name] != version:
+            logger.info(f"Cube {name} changed on disk, clearing cached results")
+            self.frames.clear()
+            self.versions.clear()
+            self.cached_query.cache_clear()
+        self.versions[name] = version
+
+    def frame(self, name):
+        if name not in self.frames:
+            path = cube_path(name, self.cube_dir)
+            if path.exists():
+                self.frames[name] = pd.read_parquet(path)
+            else:
+                empty = pd.DataFrame(columns=CUBES[name]["dims"] + CUBES[name]["measures"])
+                self.frames[name] = empty.astype({"date": "datetime64[ns]"})
+        return self.frames[name]
+
+    def refresh(self):
+        '''Updates every cube from new raw files. The next query sees the new version and reloads.'''
+        return sum(update_cube(name, self.cube_dir) for name in CUBES)
+
+    def compute(self, name, dims, start, end, freq, filters):
+        spec = CUBES[name]
+        df = self.frame(name)
+
+        mask = pd.Series(True, index=df.index)
+        if start is not None:
+            mask &= df["date"] >= pd.Timestamp(start)
+        if end is not None:
+            mask &= df["date"] <= pd.Timestamp(end)
+        for dim, value in filters:
+            mask &= df[dim] == value
+        df = df[mask]
+
+        if "date" in dims and freq != "D":
+            df = df.assign(date=df["date"].dt.to_period(freq).dt.start_time)
+
+        if dims:
+            out = df.groupby(list(dims), as_index=False, dropna=False)[spec["measures"]].sum()
+        else:
+            out = df[spec["measures"]].sum().to_frame().T
+        return add_derived_metrics(out)
+
+    def query(self, name="orders", dims=("date",), start=None, end=None, freq="D", filters=None):
+        '''Returns a slice or roll-up of a cube. dims are the dimensions to keep, freq rolls dates up (D, W or M), and filters maps dimensions to required values, e.g. {"status": "COMPLETED"}. Derived KPIs (margin, margin_pct, promo_uptake, ctr) are added to the result.'''
+        filters = tuple(sorted((filters or {}).items()))
+        self.check_version(name)
+        return self.cached_query(name, tuple(dims), start, end, freq, filters).copy()
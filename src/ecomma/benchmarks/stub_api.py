@@ -0,0 +1,98 @@
+import json
+import time
+import hashlib
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+
+
+def make_item(resource, i):
+    '''One record shaped like the dummyjson entity, with the fields the pipeline reads.'''
+    if resource == "users":
+        return {"id": i, "firstName": f"First{i}", "lastName": f"Last{i}", "age": 20 + i % 50,
+                "gender": "female" if i % 2 else "male", "email": f"user{i}@example.com"}
+    if resource == "carts":
+        return {"id": i, "userId": 1 + i % 100, "total": 100.0 + i, "discountedTotal": 90.0 + i,
+                "totalProducts": 1 + i % 5, "totalQuantity": 2 + i % 7, "products": [{"id": 1 + i % 30, "quantity": 1}]}
+    return {"id": i, "title": f"Product {i}", "category": "beauty", "price": round(1 + (i * 7.31) % 500, 2),
+            "discountPercentage": 5.0, "rating": 4.2, "stock": i % 100, "tags": ["a", "b"]}
+
+
+class StubApi:
+
+    '''dummyjson-style paginated API on a local port: GET /<resource>?limit=&skip= returns {resource: [...], total, skip, limit}. Every response is delayed by latency seconds. failures maps a skip to the status codes its next requests get before it succeeds (429 responses carry retry_after as a Retry-After header, if set). Successful responses carry an ETag, and a request whose If-None-Match matches it gets an empty 304. Every request is recorded in requests as (resource, skip, status). Use it as a context manager; base_url is set once the server is running.'''
+
+    def __init__(self, total=300, latency=0.0, failures=None, retry_after=None):
+        self.total = total
+        self.latency = latency
+        self.failures = {skip: list(statuses) for skip, statuses in (failures or {}).items()}
+        self.retry_after = retry_after
+        self.requests = []
+        self.lock = threading.Lock()
+        self.server = None
+        self.base_url = None
+
+    def next_status(self, skip):
+        with self.lock:
+            pending = self.failures.get(skip)
+            return pending.pop(0) if pending else 200
+
+    def record(self, resource, skip, status):
+        with self.lock:
+            self.requests.append((resource, skip, status))
+
+    def handler(self):
+        api = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                url = urlparse(self.path)
+                query = parse_qs(url.query)
+                resource = url.path.strip("/")
+                skip = int(query.get("skip", [0])[0])
+                limit = int(query.get("limit", [30])[0])
+                if api.latency:
+                    time.sleep(api.latency)
+
+                status = api.next_status(skip)
+                if status != 200:
+                    api.record(resource, skip, status)
+                    self.send_response(status)
+                    if status == 429 and api.retry_after is not None:
+                        self.send_header("Retry-After", str(api.retry_after))
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+
+                items = [make_item(resource, i) for i in range(skip + 1, min(api.total, skip + limit) + 1)]
+                body = json.dumps({resource: items, "total": api.total, "skip": skip, "limit": limit}).encode("utf-8")
+                etag = f'"{hashlib.sha1(body).hexdigest()}"'
+                if self.headers.get("If-None-Match") == etag:
+                    api.record(resource, skip, 304)
+                    self.send_response(304)
+                    self.send_header("ETag", etag)
+                    self.end_headers()
+                    return
+
+                api.record(resource, skip, 200)
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.send_header("ETag", etag)
+                self.end_headers()
+                self.wfile.write(body)
+
+        return Handler
+
+    def __enter__(self):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), self.handler())
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.base_url = f"http://127.0.0.1:{self.server.server_port}"
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.server.shutdown()
+        self.server.server_close()
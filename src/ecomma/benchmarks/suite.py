@@ -0,0 +1,249 @@
+import sys
+import json
+import time
+import random
+import logging
+import platform
+import argparse
+import tempfile
+import multiprocessing
+import numpy as np
+import pandas as pd
+from pathlib import Path
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
+from ecomma.settings.config import LOG_DIR, setup_logging
+from ecomma.settings.instrumentation import peak_rss_mb
+from ecomma.datagen import orders, campaign_spend, promotions
+from ecomma.datagen.pools import AddressPool
+from ecomma.extract.extract_api import fetch_data, save_raw_json
+from ecomma.extract.runner import run_extraction
+from ecomma.benchmarks.stub_api import StubApi, make_item
+
+logger = logging.getLogger(__name__)
+
+BENCHMARK_DIR = LOG_DIR / "benchmarks"
+BASELINE_FILE = BENCHMARK_DIR / "baseline.json"
+DEFAULT_SIZES = [10_000, 100_000, 1_000_000]
+LEGACY_MAX_ROWS = 100_000  # the per-row generators take minutes at 1M rows
+SEED = 42
+
+# benchmark name -> (per-row generator, vectorized generator, output folder)
+GENERATORS = {
+    "generate_orders": (orders.generate_orders, orders.generate_orders_vectorized, "orders"),
+    "generate_marketing_data": (campaign_spend.generate_marketing_data,
+                                campaign_spend.generate_marketing_data_vectorized, "marketing"),
+    "generate_promotions_data": (promotions.generate_promotions_data,
+                                 promotions.generate_promotions_data_vectorized, "promotions"),
+}
+
+
+def measure(case, *args):
+    '''Runs in a fresh worker process: calls case(*args), which returns (rows, seconds), and adds the worker's peak RSS.'''
+    rows, seconds = case(*args)
+    return {"rows": rows, "seconds": round(seconds, 4), "rows_per_sec": round(rows / seconds, 1) if seconds else None,
+            "peak_rss_mb": peak_rss_mb()}
+
+
+def run_isolated(case, *args):
+    '''One spawned process per case, so peak RSS belongs to that case alone and no state leaks between cases.'''
+    with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as executor:
+        return executor.submit(measure, case, *args).result()
+
+
+def timed_call(func, *args, **kwargs):
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def generator_case(name, variant, rows, work_dir, file_path):
+    legacy, vectorized, _ = GENERATORS[name]
+    if variant == "vectorized":
+        _, seconds = timed_call(vectorized, work_dir, rows, seed=SEED, file_path=file_path)
+    else:
+        random.seed(SEED)
+        np.random.seed(SEED)
+        _, seconds = timed_call(legacy, work_dir, rows)
+    return rows, seconds
+
+
+def fetch_case(base_url):
+    items, seconds = timed_call(fetch_data, base_url, "products", cache=False)
+    return len(items), seconds
+
+
+def extraction_case(base_url, work_dir, rate):
+    summaries, seconds = timed_call(run_extraction, base_url=base_url, rate=rate, raw_dir=work_dir, cache=False)
+    return sum(s["items"] for s in summaries.values()), seconds
+
+
+def csv_read_case(path):
+    df, seconds = timed_call(pd.read_csv, path, dtype=str, keep_default_na=False, na_values=[""])
+    return len(df), seconds
+
+
+def csv_write_case(path, out_path):
+    df = pd.read_csv(path, dtype=str, keep_default_na=False, na_values=[""])
+    _, seconds = timed_call(df.to_csv, out_path, index=False)
+    return len(df), seconds
+
+
+def jsonl_write_case(path, out_dir):
+    records = pd.read_csv(path, dtype=str, keep_default_na=False, na_values=[""]).to_dict(orient="records")
+    _, seconds = timed_call(save_raw_json, out_dir, records, "orders")
+    return len(records), seconds
+
+
+def jsonl_read_case(path):
+    df, seconds = timed_call(pd.read_json, path, lines=True, dtype=False)
+    return len(df), seconds
+
+
+def write_seed_catalog(work_dir, products=200, users=500):
+    '''Gives generate_orders a products/users snapshot to sample from, like a real run after extraction.'''
+    for resource, total in (("products", products), ("users", users)):
+        (work_dir / resource).mkdir(parents=True, exist_ok=True)
+        save_raw_json(work_dir / resource, [make_item(resource, i) for i in range(1, total + 1)], resource)
+
+
+def run_suite(sizes=None, legacy_max_rows=LEGACY_MAX_ROWS, total=300, latency=0.01, rate=50.0, output=None):
+
+    '''Runs every benchmark case in its own process and writes the results to BENCHMARK_DIR/results_<ts>.json (or output). Cases:
+    - the per-row and vectorized generators at each size (per-row ones only up to legacy_max_rows), with fixed seeds
+    - fetch_data and run_extraction against a local StubApi serving total items per resource with latency seconds per response
+    - CSV read/write and JSONL write/read of the largest generated orders file
+    Returns the results dict.'''
+
+    sizes = sorted(sizes or DEFAULT_SIZES)
+    AddressPool(orders.ADDRESS_POOL_SIZE)  # build the persisted pool up front so no case pays for it
+    results = {}
+
+    with tempfile.TemporaryDirectory(prefix="ecomma_bench_") as tmp:
+        work_dir = Path(tmp)
+        write_seed_catalog(work_dir)
+
+        orders_csv = work_dir / "orders_bench.csv"
+        for name, (_, _, folder) in GENERATORS.items():
+            (work_dir / folder).mkdir(parents=True, exist_ok=True)
+            for rows in sizes:
+                for variant in ("vectorized", "per_row"):
+                    if variant == "per_row" and rows > legacy_max_rows:
+                        continue
+                    case = f"{name}[{variant}]@{rows}"
+                    results[case] = run_isolated(generator_case, name, variant, rows, work_dir, work_dir / folder / "bench.csv")
+                    logger.info(f"{case}: {results[case]}")
+                    if name == "generate_orders" and variant == "vectorized" and rows == sizes[-1]:
+                        (work_dir / folder / "bench.csv").replace(orders_csv)  # input for the I/O cases
+                    for path in (work_dir / folder).glob("*.csv"):
+                        path.unlink()
+
+        with StubApi(total=total, latency=latency) as api:
+            results[f"fetch_data@{total}"] = run_isolated(fetch_case, api.base_url)
+            results[f"run_extraction@{total}"] = run_isolated(extraction_case, api.base_url, work_dir / "extract", rate)
+
+        jsonl_dir = work_dir / "jsonl"
+        jsonl_dir.mkdir()
+        rows = sizes[-1]
+        results[f"csv_read@{rows}"] = run_isolated(csv_read_case, orders_csv)
+        results[f"csv_write@{rows}"] = run_isolated(csv_write_case, orders_csv, work_dir / "copy.csv")
+        results[f"jsonl_write@{rows}"] = run_isolated(jsonl_write_case, orders_csv, jsonl_dir)
+        results[f"jsonl_read@{rows}"] = run_isolated(jsonl_read_case, max(jsonl_dir.glob("*.jsonl")))
+        for case in list(results)[-6:]:
+            logger.info(f"{case}: {results[case]}")
+
+    report = {
+        "meta": {
+            "created": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "numpy": np.__version__,
+            "pandas": pd.__version__,
+            "seed": SEED,
+            "stub": {"total": total, "latency": latency, "rate": rate},
+        },
+        "results": results,
+    }
+    output = Path(output) if output else BENCHMARK_DIR / f"results_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    logger.info(f"Benchmark results written to {output}")
+    return report
+
+
+def compare(baseline, current, threshold=0.10, memory_threshold=0.20):
+
+    '''Compares two result files case by case. A case regresses when its rows/sec falls by more than threshold, or when its peak RSS grows by more than memory_threshold (both fractions of the baseline). Returns the list of regression messages; cases present in only one file are skipped.'''
+
+    with open(baseline, 'r', encoding='utf-8') as f:
+        base = json.load(f)["results"]
+    with open(current, 'r', encoding='utf-8') as f:
+        cur = json.load(f)["results"]
+
+    regressions = []
+    for case in sorted(base.keys() & cur.keys()):
+        before, after = base[case], cur[case]
+        speed = after["rows_per_sec"] / before["rows_per_sec"] - 1 if before["rows_per_sec"] else 0.0
+        memory = after["peak_rss_mb"] / before["peak_rss_mb"] - 1 if before["peak_rss_mb"] else 0.0
+        flags = []
+        if speed < -threshold:
+            flags.append(f"throughput {speed:+.1%}")
+        if memory > memory_threshold:
+            flags.append(f"peak RSS {memory:+.1%}")
+        line = (f"{case}: {before['rows_per_sec']} -> {after['rows_per_sec']} rows/s ({speed:+.1%}), "
+                f"{before['peak_rss_mb']} -> {after['peak_rss_mb']} MB ({memory:+.1%})")
+        if flags:
+            regressions.append(f"{case}: " + ", ".join(flags))
+            logger.warning("REGRESSION " + line)
+        else:
+            logger.info(line)
+
+    logger.info(f"{len(regressions)} regression(s) across {len(base.keys() & cur.keys())} shared cases")
+    return regressions
+
+
+def latest_results():
+    return max(BENCHMARK_DIR.glob("results_*.json"), default=None)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="ecomma benchmark suite")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="run the suite and store the results as JSON")
+    run.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    run.add_argument("--legacy-max-rows", type=int, default=LEGACY_MAX_ROWS)
+    run.add_argument("--total", type=int, default=300, help="items per resource served by the stub API")
+    run.add_argument("--latency", type=float, default=0.01, help="stub API delay per response, in seconds")
+    run.add_argument("--rate", type=float, default=50.0, help="request rate for run_extraction")
+    run.add_argument("--output")
+    run.add_argument("--save-baseline", action="store_true", help="also store the results as the baseline")
+
+    cmp = commands.add_parser("compare", help="flag regressions against a baseline")
+    cmp.add_argument("current", nargs="?", help="results file (latest by default)")
+    cmp.add_argument("--baseline", default=str(BASELINE_FILE))
+    cmp.add_argument("--threshold", type=float, default=0.10)
+    cmp.add_argument("--memory-threshold", type=float, default=0.20)
+
+    args = parser.parse_args(argv)
+    setup_logging()
+
+    if args.command == "run":
+        report = run_suite(args.sizes, args.legacy_max_rows, args.total, args.latency, args.rate, args.output)
+        if args.save_baseline:
+            BASELINE_FILE.parent.mkdir(parents=True, exist_ok=True)
+            with open(BASELINE_FILE, 'w', encoding='utf-8') as f:
+                json.dump(report, f, indent=2)
+            logger.info(f"Baseline saved to {BASELINE_FILE}")
+        return 0
+
+    current = args.current or latest_results()
+    if current is None:
+        logger.error(f"No results found in {BENCHMARK_DIR}")
+        return 2
+    return 1 if compare(args.baseline, current, args.threshold, args.memory_threshold) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -3,10 +3,27 @@ import logging
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
-from faker import Faker
+from ecomma.datagen.pools import DatePool
+from ecomma.settings.instrumentation import timed, count
+from ecomma.datagen.vectorized import (
+    DEFAULT_CHUNK_SIZE, make_rng, iter_chunks, choose, to_text, map_unique,
+    format_days_mixed, inject_nans
+)
 
 logger = logging.getLogger(__name__)
-fake = Faker()
+
+CHANNELS = ['Google Ads', 'Facebook', 'Instagram', 'TikTok', 'Email', 'Influencer']
+REGIONS = ['North America', 'Europe', 'Asia Pacific', 'Latin America']
+CAMPAIGN_TYPES = ['Summer_Sale', 'Black_Friday', 'New_User_Promo', 'Retargeting', 'Brand_Awareness']
+PROMO_POOL = ['SAVE25', 'GET50', 'FLASH100', 'DEAL20', 'NEW100', 'VIP', 
+              'HOTSALE', 'BULK50', 'SAVENOW', 'FLASHNOW', 'GET100']
+
+CHANNEL_TYPOS = {'Google Ads': 'Goggle Ads', 'Facebook': 'FaceBook', 'Instagram': 'Insta', 'TikTok': 'Tik Tok'}
+REGION_ABBREVS = {'North America': 'NA', 'Europe': 'EU', 'Asia Pacific': 'APAC', 'Latin America': 'Latam'}
+DATE_FORMATS = ["%b %d, %Y", "%d/%m/%Y", "%Y-%m-%d"]
+
+COLUMNS = ["Campaign_ID", "Channel", "Target_Region", "Start_Date", "End_Date", "Budget_Spend",
+           "Impressions", "Clicks", "Campaign_Type", "Promo_Code_Linked"]
 
 def generate_campaign_id():
     cid_num = random.randint(100, 9999)
@@ -16,8 +33,7 @@ def generate_campaign_id():
 
 def apply_channel_messiness(channel):
     if random.random() < 0.30: 
-        typos = {'Google Ads': 'Goggle Ads', 'Facebook': 'FaceBook', 'Instagram': 'Insta', 'TikTok': 'Tik Tok'}
-        channel = typos.get(channel, channel)
+        channel = CHANNEL_TYPOS.get(channel, channel)
         
     if random.random() < 0.20:
         channel = channel.lower()
@@ -29,8 +45,7 @@ def apply_channel_messiness(channel):
 
 def apply_region_messiness(region):
     if random.random() < 0.40:
-        abbrevs = {'North America': 'NA', 'Europe': 'EU', 'Asia Pacific': 'APAC', 'Latin America': 'Latam'}
-        return abbrevs.get(region, region)
+        return REGION_ABBREVS.get(region, region)
     return region
 
 def format_campaign_dates(start_date_obj, duration):
@@ -72,24 +87,19 @@ def get_promo_code_linked(promo_pool):
         return promo_linked
     return None
 
+@timed()
 def generate_marketing_data(RAW_DATA_DIR, num_rows=15000):
     logger.info(f"Generating {num_rows} rows of marketing data...")
     
     data = []
+    start_dates = DatePool(365).sample_dates(num_rows)
     
-    channels = ['Google Ads', 'Facebook', 'Instagram', 'TikTok', 'Email', 'Influencer']
-    regions = ['North America', 'Europe', 'Asia Pacific', 'Latin America']
-    campaign_types = ['Summer_Sale', 'Black_Friday', 'New_User_Promo', 'Retargeting', 'Brand_Awareness']
-    
-    promo_pool = ['SAVE25', 'GET50', 'FLASH100', 'DEAL20', 'NEW100', 'VIP', 
-                  'HOTSALE', 'BULK50', 'SAVENOW', 'FLASHNOW', 'GET100']
-    
-    for _ in range(num_rows):
+    for i in range(num_rows):
         campaign_id = generate_campaign_id()
-        channel = apply_channel_messiness(random.choice(channels))
-        region = apply_region_messiness(random.choice(regions))
+        channel = apply_channel_messiness(random.choice(CHANNELS))
+        region = apply_region_messiness(random.choice(REGIONS))
         
-        start_date_obj = fake.date_between(start_date='-1y', end_date='now')
+        start_date_obj = start_dates[i]
         duration = random.randint(5, 30)
         start_date, end_date = format_campaign_dates(start_date_obj, duration)
         
@@ -99,7 +109,7 @@ def generate_marketing_data(RAW_DATA_DIR, num_rows=15000):
         impressions = int(base_spend * random.uniform(50, 150))
         clicks = int(impressions * random.uniform(0.01, 0.05))
         
-        promo_linked = get_promo_code_linked(promo_pool)
+        promo_linked = get_promo_code_linked(PROMO_POOL)
 
         row = {
             "Campaign_ID": campaign_id,
@@ -110,7 +120,7 @@ def generate_marketing_data(RAW_DATA_DIR, num_rows=15000):
             "Budget_Spend": spend,
             "Impressions": impressions,
             "Clicks": clicks,
-            "Campaign_Type": random.choice(campaign_types),
+            "Campaign_Type": random.choice(CAMPAIGN_TYPES),
             "Promo_Code_Linked": promo_linked if promo_linked else ""
         }
         data.append(row)
@@ -130,8 +140,84 @@ def generate_marketing_data(RAW_DATA_DIR, num_rows=15000):
     
     try:
         df.to_csv(file_path, index=False)
+        count(rows=len(df), bytes=file_path.stat().st_size)
+        logger.info("Marketing data generation complete.")
+    except Exception as e:
+        count(errors=1)
+        logger.error(f"Failed to save CSV file: {e}")
+
+def build_marketing_block(rng, n):
+    '''Builds one block of campaign rows column by column. Each messiness rule is a single mask over the column.'''
+    cid_num = to_text(rng.integers(100, 10000, n))
+    campaign_id = np.where(rng.random(n) < 0.05, "id-" + cid_num, "CMP-" + cid_num)
+
+    channel = choose(rng, CHANNELS, n)
+    typo = rng.random(n) < 0.30
+    channel[typo] = map_unique(channel[typo], lambda c: CHANNEL_TYPOS.get(c, c))
+    lowered = rng.random(n) < 0.20
+    channel[lowered] = map_unique(channel[lowered], str.lower)
+    padded = rng.random(n) < 0.15
+    channel[padded] = " " + channel[padded] + " "
+
+    region = choose(rng, REGIONS, n)
+    abbrev = rng.random(n) < 0.40
+    region[abbrev] = map_unique(region[abbrev], lambda r: REGION_ABBREVS.get(r, r))
+
+    start_day = DatePool(365).sample(n, rng)
+    end_day = start_day + rng.integers(5, 31, n)
+    fmt_idx = np.searchsorted([0.33, 0.66], rng.random(n), side='right')
+    start_date = format_days_mixed(start_day, fmt_idx, DATE_FORMATS)
+    end_date = format_days_mixed(end_day, fmt_idx, DATE_FORMATS)
+
+    base_spend = np.round(rng.uniform(500.0, 50000.0, n), 2)
+    spend = base_spend.astype(object)
+    roll_money = rng.random(n)
+    dollar = (roll_money >= 0.10) & (roll_money < 0.40)
+    usd = (roll_money >= 0.40) & (roll_money < 0.60)
+    spend[roll_money < 0.10] = None
+    spend[dollar] = "$" + to_text(base_spend[dollar])
+    spend[usd] = to_text(base_spend[usd]) + " USD"
+
+    impressions = (base_spend * rng.uniform(50, 150, n)).astype(np.int64)
+    clicks = (impressions * rng.uniform(0.01, 0.05, n)).astype(np.int64)
+
+    promo_linked = choose(rng, PROMO_POOL, n)
+    promo_lowered = rng.random(n) < 0.18
+    promo_padded = ~promo_lowered & (rng.random(n) < 0.08)
+    promo_linked[promo_lowered] = map_unique(promo_linked[promo_lowered], str.lower)
+    promo_linked[promo_padded] = " " + promo_linked[promo_padded] + " "
+    promo_linked[rng.random(n) >= 0.65] = ""
+
+    columns = [campaign_id, channel, region, start_date, end_date, spend,
+               impressions, clicks, choose(rng, CAMPAIGN_TYPES, n), promo_linked]
+    return pd.DataFrame(dict(zip(COLUMNS, columns)))
+
+@timed()
+def generate_marketing_data_vectorized(RAW_DATA_DIR, num_rows=15000, seed=None, chunk_size=DEFAULT_CHUNK_SIZE, file_path=None):
+
+    '''Column-wise version of generate_marketing_data. Rows are built and written one chunk at a time, so the cost per row stays constant and memory is bounded by chunk_size.'''
+
+    logger.info(f"Generating {num_rows} rows of marketing data (vectorized, seed={seed})...")
+    rng = make_rng(seed)
+
+    if file_path is None:
+        save_dir = RAW_DATA_DIR / 'marketing'
+        save_dir.mkdir(parents=True, exist_ok=True)
+        filename = f"marketing_spend_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
+        file_path = save_dir / filename
+    
+    logger.info(f"Streaming marketing data to {file_path}...")
+
+    try:
+        pd.DataFrame(columns=COLUMNS).to_csv(file_path, index=False)
+        for _, size in iter_chunks(num_rows, chunk_size):
+            block = inject_nans(build_marketing_block(rng, size), rng, 0.02)
+            block.to_csv(file_path, mode='a', header=False, index=False)
+        count(rows=num_rows, bytes=file_path.stat().st_size)
         logger.info("Marketing data generation complete.")
+        return file_path
     except Exception as e:
+        count(errors=1)
         logger.error(f"Failed to save CSV file: {e}")
 
 if __name__ == "__main__":
@@ -1,59 +1,123 @@
+import os
 import csv
 import json
 import random
 import logging
+import numpy as np
+import pandas as pd
 from datetime import datetime, timedelta
-from faker import Faker
+from ecomma.datagen.pools import AddressPool, DatePool, IdPool
+from ecomma.datagen.seed_cache import load_seed_arrays
+from ecomma.settings.instrumentation import timed, count
+from ecomma.datagen.vectorized import DEFAULT_CHUNK_SIZE, make_rng, iter_chunks, choose, to_text
 
 logger = logging.getLogger(__name__)
-fake = Faker()
+
+PROMO_CODES = ['SAVE25', 'GET50', 'FLASH100', 'DEAL20', 'NEW100', 'VIP', 
+               'HOTSALE', 'BULK50', 'SAVENOW', 'FLASHNOW', 'GET100']
+STATUS_CHOICES = ["COMPLETED", "PENDING", "SHIPPED", "CANCELLED", "RETURNED"]
+PAYMENT_METHODS = ["Credit Card", "PayPal", "Debit Card", "Apple Pay"]
+DISCOUNT_PCTS = [0.05, 0.10, 0.15, 0.20, 0.25, 0.30]
+
+HEADERS = [
+    "order_id", 
+    "user_id", 
+    "order_date", 
+    "status", 
+    "total_amount",
+    "subtotal_before_discount",
+    "discount_applied",
+    "promo_code_used",
+    "product_cost",
+    "payment_method", 
+    "shipping_address", 
+    "delivery_date"
+]
+
+ORDER_ID_SPACE = 10 ** 8
+ADDRESS_POOL_SIZE = 5000
+MAX_CART_ITEMS = 5
+# keeps the next unused block of order ids, one ORDER_ID_SPACE-sized block per generation run
+ID_STATE_FILE = "_id_blocks.json"
+
+def next_id_block(folder):
+    '''Claims the next block of order ids for this run. Loads upsert on order_id, so a rerun drawing from the same ids as an earlier one would overwrite those orders instead of adding new ones.'''
+    folder.mkdir(parents=True, exist_ok=True)
+    state_path = folder / ID_STATE_FILE
+    block = json.loads(state_path.read_text())["next_block"] if state_path.exists() else 0
+    tmp_path = state_path.with_name(state_path.name + ".tmp")
+    tmp_path.write_text(json.dumps({"next_block": block + 1}))
+    os.replace(tmp_path, state_path)
+    return block
+
+def id_block_range(block):
+    return block * ORDER_ID_SPACE, (block + 1) * ORDER_ID_SPACE
 
 def get_latest_file(RAW_DATA_DIR, folder_name):
+    '''Latest plain or gzip-compressed JSONL snapshot in the folder, by its timestamped name.'''
     target_dir = RAW_DATA_DIR / folder_name
     if not target_dir.exists():
         return None
-    files = sorted(target_dir.glob("*.jsonl"))
-    return files[-1] if files else None
+    snapshots = [*target_dir.glob("*.jsonl"), *target_dir.glob("*.jsonl.gz")]
+    return max(snapshots, key=lambda p: p.name, default=None)
 
-def load_seed_data(RAW_DATA_DIR):
-    products_file = get_latest_file(RAW_DATA_DIR, "products")
-    users_file = get_latest_file(RAW_DATA_DIR, "users")
-    
-    product_info = [] 
-    user_ids = [1]
+def get_seed_files(RAW_DATA_DIR, folder_name):
+    '''The latest full snapshot followed by the incremental deltas written after it, oldest first.'''
+    latest = get_latest_file(RAW_DATA_DIR, folder_name)
+    if latest is None:
+        return []
+    deltas = [*(RAW_DATA_DIR / folder_name / "deltas").glob("*.jsonl"), *(RAW_DATA_DIR / folder_name / "deltas").glob("*.jsonl.gz")]
+    return [latest] + sorted((p for p in deltas if p.name >= latest.name), key=lambda p: p.name)
+
+def load_seed_snapshots(paths):
+    '''Seed arrays of a snapshot and its deltas, combined so the newest version of each id wins.'''
+    seeds = [load_seed_arrays(path) for path in paths]
+    if len(seeds) == 1:
+        return seeds[0]
+    combined = {name: np.concatenate([seed[name] for seed in seeds]) for name in seeds[0]}
+    _, last = np.unique(combined["id"][::-1], return_index=True)
+    keep = np.sort(len(combined["id"]) - 1 - last)
+    return {name: values[keep] for name, values in combined.items()}
+
+def load_seed_columns(RAW_DATA_DIR):
+    '''Returns (product_ids, prices, user_ids) arrays for the latest products/users snapshots, with later incremental deltas applied. The arrays come from the memory-mapped seed cache, so only the first run after a new snapshot parses the JSONL.'''
+    products_files = get_seed_files(RAW_DATA_DIR, "products")
+    users_files = get_seed_files(RAW_DATA_DIR, "users")
 
-    if products_file:
+    product_ids = np.array([1])
+    prices = np.array([10.0])
+    user_ids = np.array([1])
+
+    if products_files:
         try:
-            with open(products_file, 'r', encoding='utf-8') as f:
-                items = [json.loads(line) for line in f if line.strip()]
-                if items:
-                    product_info = [{'id': p['id'], 'price': p.get('price', 0)} for p in items]
-            logger.info(f"Loaded {len(product_info)} Products.")
+            seed = load_seed_snapshots(products_files)
+            if len(seed["id"]):
+                product_ids, prices = seed["id"], seed["price"]
+            logger.info(f"Loaded {len(seed['id'])} Products.")
         except Exception as e:
             logger.warning(f"Could not load products: {e}")
 
-    if users_file:
+    if users_files:
         try:
-            with open(users_file, 'r', encoding='utf-8') as f:
-                items = [json.loads(line) for line in f if line.strip()]
-                if items:
-                    user_ids = [u['id'] for u in items]
-            logger.info(f"Loaded {len(user_ids)} Users.")
+            seed = load_seed_snapshots(users_files)
+            if len(seed["id"]):
+                user_ids = seed["id"]
+            logger.info(f"Loaded {len(seed['id'])} Users.")
         except Exception as e:
             logger.warning(f"Could not load users: {e}")
-            
-    if not product_info: 
-        product_info = [{'id': 1, 'price': 10.0}]
-    
-    return product_info, user_ids
 
+    return product_ids, prices, user_ids
+
+def load_seed_data(RAW_DATA_DIR):
+    product_ids, prices, user_ids = load_seed_columns(RAW_DATA_DIR)
+    product_info = [{'id': int(i), 'price': float(p)} for i, p in zip(product_ids, prices)]
+    return product_info, user_ids.tolist()
+
+@timed()
 def generate_orders(RAW_DATA_DIR, num_orders=10000):
     product_info, user_ids = load_seed_data(RAW_DATA_DIR)
     logger.info(f"Generating {num_orders} orders...")
     
-    promo_codes = ['SAVE25', 'GET50', 'FLASH100', 'DEAL20', 'NEW100', 'VIP', 
-                   'HOTSALE', 'BULK50', 'SAVENOW', 'FLASHNOW', 'GET100']
-    
     save_dir = RAW_DATA_DIR / 'orders'
     save_dir.mkdir(parents=True, exist_ok=True)
     
@@ -61,34 +125,22 @@ def generate_orders(RAW_DATA_DIR, num_orders=10000):
     filename = f"orders_{timestamp_str}.csv"
     file_path = save_dir / filename
     
-    headers = [
-        "order_id", 
-        "user_id", 
-        "order_date", 
-        "status", 
-        "total_amount",
-        "subtotal_before_discount",
-        "discount_applied",
-        "promo_code_used",
-        "product_cost",
-        "payment_method", 
-        "shipping_address", 
-        "delivery_date"
-    ]
+    order_ids = IdPool(*id_block_range(next_id_block(save_dir))).sample(num_orders).tolist()
+    order_dates = DatePool(365).sample_datetimes(num_orders).tolist()
+    addresses = AddressPool(min(num_orders, ADDRESS_POOL_SIZE)).sample(num_orders)
 
     try:
         with open(file_path, 'w', newline='', encoding='utf-8') as f:
             writer = csv.writer(f)
-            writer.writerow(headers)
+            writer.writerow(HEADERS)
             
-            for _ in range(num_orders):
-                order_id = fake.unique.random_number(digits=8)
+            for i in range(num_orders):
+                order_id = order_ids[i]
                 user_id = random.choice(user_ids)
                 
-                order_date = fake.date_time_between(start_date='-1y', end_date='now')
+                order_date = order_dates[i]
                 
-                status_choices = ["COMPLETED", "PENDING", "SHIPPED", "CANCELLED", "RETURNED"]
-                status = random.choice(status_choices)
+                status = random.choice(STATUS_CHOICES)
                 
                 delivery_date = "" 
                 
@@ -113,14 +165,14 @@ def generate_orders(RAW_DATA_DIR, num_orders=10000):
                 discount_amt = 0
                 
                 if random.random() < 0.48:
-                    promo_code = random.choice(promo_codes)
+                    promo_code = random.choice(PROMO_CODES)
                     
                     if random.random() < 0.20:
                         promo_code = promo_code.lower()
                     elif random.random() < 0.10:
                         promo_code = f" {promo_code}"
                     
-                    disc_pct = random.choice([0.05, 0.10, 0.15, 0.20, 0.25, 0.30])
+                    disc_pct = random.choice(DISCOUNT_PCTS)
                     discount_amt = round(subtotal * disc_pct, 2)
                     
                     if random.random() < 0.30:
@@ -146,8 +198,8 @@ def generate_orders(RAW_DATA_DIR, num_orders=10000):
                 if random.random() < 0.12:
                     subtotal_fmt = f"${subtotal}"
                 
-                payment = random.choice(["Credit Card", "PayPal", "Debit Card", "Apple Pay"])
-                address = fake.address().replace("\n", ", ")
+                payment = random.choice(PAYMENT_METHODS)
+                address = addresses[i]
 
                 writer.writerow([
                     order_id,
@@ -164,9 +216,113 @@ def generate_orders(RAW_DATA_DIR, num_orders=10000):
                     delivery_date
                 ])
                 
+        count(rows=num_orders, bytes=file_path.stat().st_size)
         logger.info(f"Successfully generated {num_orders} orders at {file_path}")
         
     except Exception as e:
+        count(errors=1)
+        logger.error(f"Failed to save orders: {e}")
+
+def build_orders_block(rng, order_ids, prices, user_ids, addresses, dates):
+    '''Builds one block of orders column by column. Mirrors the per-row rules in generate_orders, including the messiness rates.'''
+    n = len(order_ids)
+
+    order_dt = dates.sample_datetimes(n, rng)
+
+    status = choose(rng, STATUS_CHOICES, n)
+    delivered = (status == "COMPLETED") | (status == "RETURNED")
+    shipped = status == "SHIPPED"
+    ship_days = np.where(delivered, rng.integers(2, 11, n), rng.integers(1, 6, n)).astype("timedelta64[D]")
+    delivery_date = np.datetime_as_string(order_dt.astype("datetime64[D]") + ship_days, unit="D").astype(object)
+    delivery_date[~(delivered | shipped)] = ""
+
+    num_items = rng.integers(1, MAX_CART_ITEMS + 1, n)
+    cart_prices = prices[rng.integers(0, len(prices), (n, MAX_CART_ITEMS))]
+    in_cart = np.arange(MAX_CART_ITEMS) < num_items[:, None]
+    subtotal = np.round((cart_prices * in_cart).sum(axis=1), 2)
+
+    avg_margin = rng.uniform(0.35, 0.65, n)
+    total_cost = np.round(subtotal * (1 - avg_margin), 2)
+
+    has_promo = rng.random(n) < 0.48
+    codes = np.array(PROMO_CODES, dtype=object)
+    code_idx = rng.integers(0, len(codes), n)
+    lowered = rng.random(n) < 0.20
+    padded = ~lowered & (rng.random(n) < 0.10)
+    promo_code = np.where(lowered, np.array([c.lower() for c in codes], dtype=object)[code_idx], codes[code_idx])
+    promo_code[padded] = " " + promo_code[padded]
+    promo_code[~has_promo] = ""
+
+    disc_pct = rng.choice(DISCOUNT_PCTS, n)
+    discount_amt = np.round(subtotal * disc_pct, 2)
+    whole = rng.random(n) < 0.30
+    discount_amt = np.where(whole, np.round(discount_amt), discount_amt)
+    discount_amt[~has_promo] = 0
+
+    total_amount = np.round(subtotal - discount_amt, 2)
+
+    discount_applied = to_text(discount_amt)
+    discount_applied[whole] = to_text(discount_amt[whole].astype(np.int64))
+    fmt_roll = rng.random(n)
+    dollar = fmt_roll < 0.15
+    usd = (fmt_roll >= 0.15) & (fmt_roll < 0.25)
+    discount_applied[dollar] = "$" + discount_applied[dollar]
+    discount_applied[usd] = discount_applied[usd] + " USD"
+    discount_applied[discount_amt <= 0] = ""
+
+    subtotal_fmt = subtotal.astype(object)
+    dollar_subtotal = rng.random(n) < 0.12
+    subtotal_fmt[dollar_subtotal] = "$" + to_text(subtotal[dollar_subtotal])
+
+    columns = [
+        order_ids,
+        user_ids[rng.integers(0, len(user_ids), n)],
+        np.char.replace(np.datetime_as_string(order_dt, unit="s"), "T", " "),
+        status,
+        total_amount,
+        subtotal_fmt,
+        discount_applied,
+        promo_code,
+        total_cost,
+        choose(rng, PAYMENT_METHODS, n),
+        addresses.sample(n, rng),
+        delivery_date,
+    ]
+    return pd.DataFrame(dict(zip(HEADERS, columns)))
+
+@timed()
+def generate_orders_vectorized(RAW_DATA_DIR, num_orders=10000, seed=None, chunk_size=DEFAULT_CHUNK_SIZE,
+                               file_path=None, id_range=None):
+
+    '''Batched version of generate_orders for large runs. Whole columns are built with NumPy per chunk and each chunk is written with a single to_csv call. The same seed gives the same orders (dates are relative to the current time). order_id values come from an IdPool over id_range, so they are distinct, and shards given disjoint ranges never collide. Without id_range the run claims its own block with next_id_block, like generate_orders. Addresses and dates are sampled from the shared value pools.'''
+
+    _, prices, user_ids = load_seed_columns(RAW_DATA_DIR)
+    logger.info(f"Generating {num_orders} orders (vectorized, seed={seed})...")
+
+    rng = make_rng(seed)
+    addresses = AddressPool(min(num_orders, ADDRESS_POOL_SIZE))
+    dates = DatePool(365)
+    ids = IdPool(*(id_range or id_block_range(next_id_block(RAW_DATA_DIR / 'orders'))), seed=seed)
+
+    if file_path is None:
+        save_dir = RAW_DATA_DIR / 'orders'
+        save_dir.mkdir(parents=True, exist_ok=True)
+        timestamp_str = datetime.now().strftime('%Y%m%d_%H%M%S')
+        file_path = save_dir / f"orders_{timestamp_str}.csv"
+
+    try:
+        pd.DataFrame(columns=HEADERS).to_csv(file_path, index=False)
+        for start, size in iter_chunks(num_orders, chunk_size):
+            block = build_orders_block(rng, ids.sample(size), prices, user_ids, addresses, dates)
+            block.to_csv(file_path, mode='a', header=False, index=False)
+            logger.info(f"Wrote orders {start + size}/{num_orders}")
+
+        count(rows=num_orders, bytes=file_path.stat().st_size)
+        logger.info(f"Successfully generated {num_orders} orders at {file_path}")
+        return file_path
+
+    except Exception as e:
+        count(errors=1)
         logger.error(f"Failed to save orders: {e}")
 
 if __name__ == "__main__":
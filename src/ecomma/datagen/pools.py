@@ -0,0 +1,93 @@
+import os
+import math
+import logging
+import numpy as np
+from datetime import datetime, timedelta
+from faker import Faker
+from ecomma.settings.config import CACHE_DATA
+from ecomma.datagen.vectorized import EPOCH, make_rng, today_day_number
+
+logger = logging.getLogger(__name__)
+
+POOL_DIR = CACHE_DATA / "pools"
+MAX_ADDRESS_POOL_SIZE = 20_000
+ADDRESS_POOL_SEED = 0
+
+
+class AddressPool:
+
+    '''A fixed set of Faker addresses, built once and kept in POOL_DIR/addresses.txt between runs. Faker is seeded with ADDRESS_POOL_SEED, so a bigger pool always starts with the same addresses as a smaller one. The file only grows when a run asks for more than it holds, up to MAX_ADDRESS_POOL_SIZE.'''
+
+    def __init__(self, size=5000, pool_dir=None):
+        self.size = max(1, min(size, MAX_ADDRESS_POOL_SIZE))
+        self.path = (pool_dir or POOL_DIR) / "addresses.txt"
+        self.values = self.load()
+
+    def load(self):
+        if self.path.exists():
+            with open(self.path, 'r', encoding='utf-8') as f:
+                stored = f.read().splitlines()
+            if len(stored) >= self.size:
+                return np.array(stored[:self.size], dtype=object)
+
+        pool_fake = Faker()
+        pool_fake.seed_instance(ADDRESS_POOL_SEED)
+        values = [pool_fake.address().replace("\n", ", ") for _ in range(self.size)]
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(self.path.name + f".{os.getpid()}.tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write("\n".join(values) + "\n")
+        os.replace(tmp_path, self.path)
+        logger.info(f"Built address pool of {self.size} at {self.path}")
+        return np.array(values, dtype=object)
+
+    def sample(self, n, rng=None):
+        rng = rng or make_rng()
+        return self.values[rng.integers(0, len(self.values), n)]
+
+
+class DatePool:
+
+    '''Dates in the last days_back days, up to today. This replaces fake.date_between / fake.date_time_between.'''
+
+    def __init__(self, days_back=365):
+        self.days_back = days_back
+        self.today = today_day_number()
+        self.now = np.datetime64(datetime.now().replace(microsecond=0), "s")
+
+    def sample(self, n, rng=None):
+        '''Day numbers (days since 1970-01-01), uniform over the window.'''
+        rng = rng or make_rng()
+        return self.today - rng.integers(0, self.days_back, n, endpoint=True)
+
+    def sample_datetimes(self, n, rng=None):
+        '''datetime64[s] values uniform over the window, to the second.'''
+        rng = rng or make_rng()
+        return self.now - rng.integers(0, self.days_back * 86400, n, endpoint=True).astype("timedelta64[s]")
+
+    def sample_dates(self, n, rng=None):
+        '''datetime.date objects, for the per-row generators.'''
+        return [EPOCH + timedelta(days=int(d)) for d in self.sample(n, rng)]
+
+
+class IdPool:
+
+    '''Hands out distinct ids from [start, end) in a shuffled order. The k-th id is start + (a * k + b) mod m, where m = end - start and a is coprime with m. This map is a bijection, so ids never repeat, and unlike fake.unique nothing has to be remembered. It also does not slow down as more ids are handed out. sample raises once the range is used up. Keep m below 2**31 so a * k fits in int64.'''
+
+    def __init__(self, start, end, seed=None):
+        self.start = start
+        self.span = end - start
+        rng = make_rng(seed)
+        self.offset = int(rng.integers(0, self.span))
+        self.step = int(rng.integers(1, self.span)) if self.span > 1 else 1
+        while math.gcd(self.step, self.span) != 1:
+            self.step += 1
+        self.cursor = 0
+
+    def sample(self, n):
+        if self.cursor + n > self.span:
+            raise ValueError(f"IdPool exhausted: {self.span - self.cursor} ids left, {n} requested")
+        k = np.arange(self.cursor, self.cursor + n, dtype=np.int64)
+        self.cursor += n
+        return self.start + (self.step * k + self.offset) % self.span
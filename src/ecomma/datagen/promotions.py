@@ -3,10 +3,34 @@ import logging
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
-from faker import Faker
+from ecomma.datagen.pools import DatePool
+from ecomma.settings.instrumentation import timed, count
+from ecomma.datagen.vectorized import (
+    DEFAULT_CHUNK_SIZE, make_rng, iter_chunks, choose, to_text, map_unique,
+    format_days_mixed, inject_nans
+)
 
 logger = logging.getLogger(__name__)
-fake = Faker()
+
+PROMO_TYPES = ['percentage_off', 'fixed_amount', 'bogo', 'free_shipping', 'bundle_deal']
+CATEGORIES = ['Electronics', 'Clothing', 'Home & Garden', 'Beauty', 'Sports', 'Books', 'Toys']
+STATUS_OPTS = ['active', 'expired', 'scheduled', 'paused']
+
+PREFIXES = ['SAVE', 'GET', 'FLASH', 'DEAL', 'HOT', 'NEW', 'VIP', 'BULK']
+SUFFIXES = ['2024', '50', 'NOW', 'SALE', '25', '100']
+
+DISCOUNT_CHOICES = {
+    'percentage_off': [5, 10, 15, 20, 25, 30, 40, 50, 60, 75],
+    'fixed_amount': [5, 10, 15, 20, 25, 50, 100],
+    'bogo': [50, 100],
+}
+MIN_PURCHASE_VALUES = [25, 50, 75, 100, 150, 200]
+USAGE_LIMITS = [1, 5, 10, 25, 50, 100, 500, 1000, None]
+STATUS_MAP = {'active': 'Active', 'expired': 'Expire', 'scheduled': 'Scheduled'}
+DATE_FORMATS = ["%Y-%m-%d", "%m/%d/%Y", "%d-%b-%Y"]
+
+COLUMNS = ["Promo_ID", "Promo_Code", "Promo_Type", "Discount_Value", "Category", "Start_Date",
+           "End_Date", "Min_Purchase", "Usage_Limit", "Times_Used", "Status"]
 
 def generate_promo_id():
     if random.random() < 0.08:
@@ -30,12 +54,8 @@ def generate_promo_code(prefixes, suffixes):
     return code
 
 def get_discount_value(promo_type):
-    if promo_type == 'percentage_off':
-        return random.choice([5, 10, 15, 20, 25, 30, 40, 50, 60, 75])
-    elif promo_type == 'fixed_amount':
-        return random.choice([5, 10, 15, 20, 25, 50, 100])
-    elif promo_type == 'bogo':
-        return random.choice([50, 100])
+    if promo_type in DISCOUNT_CHOICES:
+        return random.choice(DISCOUNT_CHOICES[promo_type])
     return None
 
 def format_discount_value(discount_val, promo_type):
@@ -67,7 +87,7 @@ def format_promo_dates(start_dt, duration):
 
 def get_min_purchase():
     if random.random() > 0.45:
-        min_val = random.choice([25, 50, 75, 100, 150, 200])
+        min_val = random.choice(MIN_PURCHASE_VALUES)
         mp_roll = random.random()
         
         if mp_roll < 0.35:
@@ -80,7 +100,7 @@ def get_min_purchase():
 def get_usage_stats():
     usage_lim = None
     if random.random() > 0.40:
-        usage_lim = random.choice([1, 5, 10, 25, 50, 100, 500, 1000, None])
+        usage_lim = random.choice(USAGE_LIMITS)
     
     used_ct = 0
     if usage_lim and random.random() > 0.25:
@@ -97,39 +117,33 @@ def apply_status_messiness(status):
     if random.random() < 0.18:
         return status.upper()
     elif random.random() < 0.12:
-        status_map = {'active': 'Active', 'expired': 'Expire', 'scheduled': 'Scheduled'}
-        return status_map.get(status, status)
+        return STATUS_MAP.get(status, status)
     return status
 
+@timed()
 def generate_promotions_data(RAW_DATA_DIR, num_rows=15000):
     logger.info(f"Generating {num_rows} rows of promotions data...")
     
     data = []
+    start_dates = DatePool(200).sample_dates(num_rows)
     
-    promo_types = ['percentage_off', 'fixed_amount', 'bogo', 'free_shipping', 'bundle_deal']
-    categories = ['Electronics', 'Clothing', 'Home & Garden', 'Beauty', 'Sports', 'Books', 'Toys']
-    status_opts = ['active', 'expired', 'scheduled', 'paused']
-    
-    prefixes = ['SAVE', 'GET', 'FLASH', 'DEAL', 'HOT', 'NEW', 'VIP', 'BULK']
-    suffixes = ['2024', '50', 'NOW', 'SALE', '25', '100']
-    
-    for _ in range(num_rows):
+    for i in range(num_rows):
         promo_id = generate_promo_id()
-        promo_type = random.choice(promo_types)
-        code = generate_promo_code(prefixes, suffixes)
+        promo_type = random.choice(PROMO_TYPES)
+        code = generate_promo_code(PREFIXES, SUFFIXES)
         
         discount_val = get_discount_value(promo_type)
         discount = format_discount_value(discount_val, promo_type)
         
-        start_dt = fake.date_between(start_date='-200d', end_date='now')
+        start_dt = start_dates[i]
         duration = random.randint(3, 45)
         start_date, end_date = format_promo_dates(start_dt, duration)
         
         min_purchase = get_min_purchase()
         usage_lim, used_ct = get_usage_stats()
         
-        category = apply_category_messiness(random.choice(categories))
-        status = apply_status_messiness(random.choice(status_opts))
+        category = apply_category_messiness(random.choice(CATEGORIES))
+        status = apply_status_messiness(random.choice(STATUS_OPTS))
         
         row = {
             "Promo_ID": promo_id,
@@ -161,8 +175,101 @@ def generate_promotions_data(RAW_DATA_DIR, num_rows=15000):
     
     try:
         df.to_csv(file_path, index=False)
+        count(rows=len(df), bytes=file_path.stat().st_size)
+        logger.info("Promotions data generation complete.")
+    except Exception as e:
+        count(errors=1)
+        logger.error(f"Failed to save CSV file: {e}")
+
+def build_promotions_block(rng, n):
+    '''Builds one block of promotion rows column by column, following the same rules as the per-row helpers above.'''
+    promo_id = np.where(
+        rng.random(n) < 0.08,
+        "promo_" + to_text(rng.integers(100, 10000, n)),
+        "PR-" + to_text(rng.integers(1000, 100000, n)),
+    )
+    promo_type = choose(rng, PROMO_TYPES, n)
+
+    code = choose(rng, PREFIXES, n)
+    with_suffix = rng.random(n) > 0.3
+    code[with_suffix] = code[with_suffix] + choose(rng, SUFFIXES, int(with_suffix.sum()))
+    lowered = rng.random(n) < 0.25
+    padded = ~lowered & (rng.random(n) < 0.10)
+    code[lowered] = map_unique(code[lowered], str.lower)
+    code[padded] = " " + code[padded]
+    code[rng.random(n) < 0.15] = None
+
+    discount_val = np.full(n, None, dtype=object)
+    for ptype, choices in DISCOUNT_CHOICES.items():
+        mask = promo_type == ptype
+        discount_val[mask] = choose(rng, choices, int(mask.sum()))
+    roll_disc = rng.random(n)
+    discount = discount_val.copy()
+    percent = (roll_disc >= 0.12) & (roll_disc < 0.35) & pd.notna(discount_val)
+    dollar = (roll_disc >= 0.35) & (roll_disc < 0.55) & (promo_type == 'fixed_amount')
+    discount[percent] = to_text(discount_val[percent]) + "%"
+    discount[dollar] = "$" + to_text(discount_val[dollar])
+    discount[roll_disc < 0.12] = None
+
+    start_day = DatePool(200).sample(n, rng)
+    end_day = start_day + rng.integers(3, 46, n)
+    fmt_idx = np.searchsorted([0.30, 0.60], rng.random(n), side='right')
+    start_date = format_days_mixed(start_day, fmt_idx, DATE_FORMATS)
+    end_date = format_days_mixed(end_day, fmt_idx, DATE_FORMATS)
+
+    min_val = choose(rng, MIN_PURCHASE_VALUES, n)
+    min_purchase = min_val.copy()
+    mp_roll = rng.random(n)
+    min_purchase[mp_roll < 0.35] = "$" + to_text(min_val[mp_roll < 0.35])
+    min_purchase[mp_roll >= 0.65] = to_text(min_val[mp_roll >= 0.65]) + " USD"
+    min_purchase[rng.random(n) <= 0.45] = None
+
+    usage_lim = np.array([np.nan if v is None else v for v in USAGE_LIMITS])[rng.integers(0, len(USAGE_LIMITS), n)]
+    usage_lim[rng.random(n) <= 0.40] = np.nan
+    has_limit = ~np.isnan(usage_lim)
+    upper = (np.nan_to_num(usage_lim) * rng.uniform(0.5, 1.2, n)).astype(np.int64)
+    used_ct = np.where(has_limit & (rng.random(n) > 0.25), rng.integers(0, upper + 1), 0)
+
+    category = choose(rng, CATEGORIES, n)
+    messy_category = rng.random(n) < 0.15
+    category[messy_category] = map_unique(category[messy_category], lambda c: f" {c.lower()} ")
+
+    status = choose(rng, STATUS_OPTS, n)
+    upper_status = rng.random(n) < 0.18
+    mapped_status = ~upper_status & (rng.random(n) < 0.12)
+    status[upper_status] = map_unique(status[upper_status], str.upper)
+    status[mapped_status] = map_unique(status[mapped_status], lambda s: STATUS_MAP.get(s, s))
+
+    columns = [promo_id, code, promo_type, discount, category, start_date,
+               end_date, min_purchase, usage_lim, used_ct, status]
+    return pd.DataFrame(dict(zip(COLUMNS, columns)))
+
+@timed()
+def generate_promotions_data_vectorized(RAW_DATA_DIR, num_rows=15000, seed=None, chunk_size=DEFAULT_CHUNK_SIZE, file_path=None):
+
+    '''Streaming version of generate_promotions_data. Promotions are generated in blocks of chunk_size, NaNs are injected per block at the same 2.5% rate, and each block is appended to the CSV, so peak memory does not grow with num_rows.'''
+
+    logger.info(f"Generating {num_rows} rows of promotions data (streaming, seed={seed})...")
+    rng = make_rng(seed)
+
+    if file_path is None:
+        save_dir = RAW_DATA_DIR / 'promotions'
+        save_dir.mkdir(parents=True, exist_ok=True)
+        filename = f"promotions_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
+        file_path = save_dir / filename
+    
+    logger.info(f"Streaming promotions data to {file_path}...")
+
+    try:
+        pd.DataFrame(columns=COLUMNS).to_csv(file_path, index=False)
+        for _, size in iter_chunks(num_rows, chunk_size):
+            block = inject_nans(build_promotions_block(rng, size), rng, 0.025)
+            block.to_csv(file_path, mode='a', header=False, index=False)
+        count(rows=num_rows, bytes=file_path.stat().st_size)
         logger.info("Promotions data generation complete.")
+        return file_path
     except Exception as e:
+        count(errors=1)
         logger.error(f"Failed to save CSV file: {e}")
 
 if __name__ == "__main__":
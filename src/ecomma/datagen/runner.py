@@ -1,9 +1,33 @@
+import os
+import shutil
 import logging
+import multiprocessing
+import numpy as np
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
 from ecomma.datagen import campaign_spend, promotions, orders
 from ecomma.settings.config import RAW_DATA, setup_logging
+from ecomma.settings.instrumentation import stage, count, write_report
+from ecomma.storage.parquet_store import csv_to_parquet
+from ecomma.transform.dates import DAYFIRST
 
 logger = logging.getLogger(__name__)
 setup_logging()
+
+# dataset name -> (folder under RAW_DATA, filename prefix, vectorized generator)
+SHARDED_DATASETS = {
+    "promotions": ("promotions", "promotions", promotions.generate_promotions_data_vectorized),
+    "marketing": ("marketing", "marketing_spend", campaign_spend.generate_marketing_data_vectorized),
+    "orders": ("orders", "orders", orders.generate_orders_vectorized),
+}
+
+# dataset name -> (partition column, source date column, date format, dayfirst) for the Parquet copy
+PARQUET_PARTITIONS = {
+    "promotions": ("start_date", "Start_Date", None, DAYFIRST["promotions"]),
+    "marketing": ("start_date", "Start_Date", None, DAYFIRST["marketing"]),
+    "orders": ("order_day", "order_date", "%Y-%m-%d %H:%M:%S", DAYFIRST["orders"]),
+}
+
 def run_data_generation():
     logger.info("Starting data generation process...")
     
@@ -17,6 +41,82 @@ def run_data_generation():
     orders.generate_orders(RAW_DATA, 10000)
     
     logger.info("Data generation process completed.")
+    write_report("datagen")
+
+def derive_seeds(master_seed, count):
+    '''Spawns count independent integer seeds from one master seed (an int or a list of ints).'''
+    children = np.random.SeedSequence(master_seed).spawn(count)
+    return [int(child.generate_state(1)[0]) for child in children]
+
+def split_rows(total, num_shards):
+    base, extra = divmod(total, num_shards)
+    return [base + (1 if i < extra else 0) for i in range(num_shards)]
+
+def merge_shards(part_paths, file_path):
+    '''Concatenates shard CSVs into file_path, keeping only the first header, then removes the parts.'''
+    with open(file_path, 'wb') as out:
+        for i, part in enumerate(part_paths):
+            with open(part, 'rb') as f:
+                header = f.readline()
+                if i == 0:
+                    out.write(header)
+                shutil.copyfileobj(f, out)
+    for part in part_paths:
+        part.unlink()
+    logger.info(f"Merged {len(part_paths)} shards into {file_path}")
+    return file_path
+
+def run_parallel_data_generation(num_shards=None, seed=None, merge=False, max_workers=None,
+                                 promotions_rows=30000, marketing_rows=30000, orders_rows=10000, parquet=False, id_block=None):
+
+    '''Runs all three vectorized generators as num_shards shards each on a process pool. Every run claims a fresh block of order ids (orders.next_id_block), and orders shards draw order_id from disjoint slices of that block, so ids stay unique across shards and across runs. Every shard gets its own seed derived from the master seed and the block number, so the seed is per block: the same master seed gives different data on every run, and a run is only reproduced by passing the same seed and num_shards together with its id_block (logged at the start). Passing id_block reuses that block, so the replayed orders overwrite the earlier ones when loaded. The pool uses the spawn start method because the pipeline calls this from a worker thread, and forking a multithreaded process can deadlock the children. With merge=True the parts are concatenated into one <prefix>_<ts>.csv per dataset. With parquet=True the output is also written to RAW_DATA/parquet/<dataset>, partitioned by date.'''
+
+    num_shards = num_shards or os.cpu_count() or 1
+    row_counts = {"promotions": promotions_rows, "marketing": marketing_rows, "orders": orders_rows}
+    if id_block is None:
+        id_block = orders.next_id_block(RAW_DATA / SHARDED_DATASETS["orders"][0])
+    seeds = iter(derive_seeds(None if seed is None else [seed, id_block], len(SHARDED_DATASETS) * num_shards))
+    id_base, _ = orders.id_block_range(id_block)
+    id_step = orders.ORDER_ID_SPACE // num_shards
+    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+
+    logger.info(f"Starting parallel data generation: {num_shards} shards per dataset, master seed {seed}, order id block {id_block}...")
+    orders.load_seed_columns(RAW_DATA)  # build the seed cache once so the shards only memory-map it
+
+    futures = {}
+    # the generators' own stats stay in the worker processes, so the totals are recorded here
+    with stage("parallel_generation"), ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context("spawn")) as executor:
+        for name, (folder, prefix, generator) in SHARDED_DATASETS.items():
+            save_dir = RAW_DATA / folder
+            save_dir.mkdir(parents=True, exist_ok=True)
+
+            for shard, rows in enumerate(split_rows(row_counts[name], num_shards)):
+                part_path = save_dir / f"{prefix}_{timestamp}_part-{shard:04d}.csv"
+                kwargs = {"seed": next(seeds), "file_path": part_path}
+                if name == "orders":
+                    kwargs["id_range"] = (id_base + shard * id_step, id_base + (shard + 1) * id_step)
+                futures.setdefault(name, []).append(executor.submit(generator, RAW_DATA, rows, **kwargs))
+
+        results = {name: [f.result() for f in shard_futures] for name, shard_futures in futures.items()}
+        for name, part_paths in results.items():
+            done = [p for p in part_paths if p is not None]
+            count(rows=row_counts[name], bytes=sum(p.stat().st_size for p in done), errors=len(part_paths) - len(done))
+
+    for name, part_paths in results.items():
+        if any(p is None for p in part_paths):
+            logger.error(f"{name}: {part_paths.count(None)} shard(s) failed, leaving parts unmerged.")
+            continue
+        if merge:
+            folder, prefix, _ = SHARDED_DATASETS[name]
+            results[name] = [merge_shards(part_paths, RAW_DATA / folder / f"{prefix}_{timestamp}.csv")]
+        if parquet:
+            partition_col, date_column, date_format, dayfirst = PARQUET_PARTITIONS[name]
+            for path in results[name]:
+                csv_to_parquet(path, RAW_DATA / 'parquet' / name, partition_col, date_column, date_format, dayfirst)
+
+    logger.info("Parallel data generation process completed.")
+    write_report("datagen")
+    return results
 
 if __name__ == "__main__":
     run_data_generation()
@@ -0,0 +1,95 @@
+import os
+import gzip
+import json
+import logging
+import tempfile
+import numpy as np
+from ecomma.storage.manifest import file_hash
+
+logger = logging.getLogger(__name__)
+
+CACHE_FOLDER = "_seed_cache"
+
+# resource -> {array name: (JSON field, default, dtype)}
+SEED_FIELDS = {
+    "products": {"id": ("id", None, np.int64), "price": ("price", 0, np.float64)},
+    "users": {"id": ("id", None, np.int64)},
+}
+
+
+def resource_of(source):
+    '''products/users for a snapshot, including incremental deltas in <resource>/deltas/.'''
+    return source.parent.parent.name if source.parent.name == "deltas" else source.parent.name
+
+
+def cache_paths(source):
+    '''The .npy arrays and the meta file for a source JSONL (or .jsonl.gz) live in a _seed_cache/ folder next to it.'''
+    cache_dir = source.parent / CACHE_FOLDER
+    stem = source.name.removesuffix(".gz").removesuffix(".jsonl")
+    arrays = {name: cache_dir / f"{stem}.{name}.npy" for name in SEED_FIELDS[resource_of(source)]}
+    return cache_dir, arrays, cache_dir / f"{stem}.meta.json"
+
+
+def read_meta(meta_path):
+    try:
+        with open(meta_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def replace(path, write):
+    '''Calls write(f) on a temporary file of its own next to path and renames it onto path, so processes rebuilding the same cache never write into each other's file.'''
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=path.name + ".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            write(f)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def write_json(path, data):
+    replace(path, lambda f: f.write(json.dumps(data).encode('utf-8')))
+
+
+def build_arrays(source, fields):
+    '''Parses the JSONL once, keeping only the seed fields.'''
+    columns = {name: [] for name in fields}
+    opener = gzip.open if source.suffix == ".gz" else open
+    with opener(source, 'rt', encoding='utf-8') as f:
+        for line in f:
+            if not line.strip():
+                continue
+            item = json.loads(line)
+            for name, (key, default, _) in fields.items():
+                value = item.get(key, default)
+                columns[name].append(default if value is None else value)
+    return {name: np.asarray(values, dtype=fields[name][2]) for name, values in columns.items()}
+
+
+def load_seed_arrays(source):
+
+    '''Returns {name: array} with the seed columns of a products/users JSONL file (plain or gzipped), memory-mapped from a .npy cache. The cache is reused while the source's size and mtime are unchanged. If they changed but the sha256 still matches (a copy or a touch), only the stored stat is refreshed. Otherwise the file is parsed again and the arrays rewritten. Arrays and meta are each written to a temporary file of their own and renamed into place, meta last, so shards that load or rebuild concurrently never see half-written files.'''
+
+    fields = SEED_FIELDS[resource_of(source)]
+    cache_dir, arrays, meta_path = cache_paths(source)
+    stat = source.stat()
+    meta = read_meta(meta_path)
+    present = all(p.exists() for p in arrays.values())
+
+    if meta and present and (meta["size"], meta["mtime_ns"]) == (stat.st_size, stat.st_mtime_ns):
+        return {name: np.load(path, mmap_mode='r') for name, path in arrays.items()}
+
+    digest = file_hash(source)
+    if meta and present and meta["sha256"] == digest:
+        write_json(meta_path, {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "sha256": digest})
+        return {name: np.load(path, mmap_mode='r') for name, path in arrays.items()}
+
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    for name, values in build_arrays(source, fields).items():
+        replace(arrays[name], lambda f: np.save(f, values))
+    write_json(meta_path, {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "sha256": digest})
+    logger.info(f"Rebuilt seed cache for {source.name}")
+    return {name: np.load(path, mmap_mode='r') for name, path in arrays.items()}
@@ -0,0 +1,52 @@
+import numpy as np
+import pandas as pd
+from datetime import date, timedelta
+
+EPOCH = date(1970, 1, 1)
+DEFAULT_CHUNK_SIZE = 100_000
+
+def make_rng(seed=None):
+    '''Returns a NumPy Generator. Passing the same seed gives the same data back.'''
+    return np.random.default_rng(seed)
+
+def iter_chunks(total, chunk_size=DEFAULT_CHUNK_SIZE):
+    '''Yields (start, size) pairs covering total rows in blocks of chunk_size.'''
+    for start in range(0, total, chunk_size):
+        yield start, min(chunk_size, total - start)
+
+def map_unique(values, func):
+    '''Applies a Python function once per distinct value and broadcasts the results back over the array.'''
+    if len(values) == 0:
+        return np.asarray(values, dtype=object)
+    codes, uniq = pd.factorize(values)
+    mapped = np.array([func(v) for v in uniq], dtype=object)
+    return mapped[codes]
+
+def today_day_number():
+    return (date.today() - EPOCH).days
+
+def format_days(days, fmt):
+    '''Formats day numbers (days since 1970-01-01) with strftime, once per distinct day.'''
+    return map_unique(days, lambda d: (EPOCH + timedelta(days=int(d))).strftime(fmt))
+
+def format_days_mixed(days, fmt_idx, fmts):
+    '''Formats each day with fmts[fmt_idx[i]] so one column can carry several date formats.'''
+    out = np.empty(len(days), dtype=object)
+    for i, fmt in enumerate(fmts):
+        mask = fmt_idx == i
+        if mask.any():
+            out[mask] = format_days(days[mask], fmt)
+    return out
+
+def choose(rng, options, size):
+    '''Vectorized random.choice: returns an object array of size picks from options.'''
+    options = np.asarray(options, dtype=object)
+    return options[rng.integers(0, len(options), size)]
+
+def to_text(values):
+    '''Converts a numeric array into strings the way str() would print each value.'''
+    return np.asarray(values).astype(str).astype(object)
+
+def inject_nans(df, rng, frac):
+    '''Blanks out roughly frac of the cells in every column in one masked pass.'''
+    return df.mask(rng.random(df.shape) < frac)
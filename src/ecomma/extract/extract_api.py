@@ -1,15 +1,27 @@
+import os
+import gzip
 import requests
 import logging
 import json
 import time
+import threading
+from collections import deque, namedtuple
+from itertools import islice
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from requests.adapters import HTTPAdapter
+from ecomma.settings.instrumentation import timed, count, submit
+from ecomma.extract.http_cache import resolve_cache
 
 logger = logging.getLogger(__name__)
 
-def fetch_data(base_url, resource):
+@timed()
+def fetch_data(base_url, resource, cache=True):
 
-    '''This function will get a url and resource such as pages or orders from the runner module which will pass it upon call. It will then paginate through the results and return a list of all items found.'''
+    '''This function will get a url and resource such as pages or orders from the runner module which will pass it upon call. It will then paginate through the results and return a list of all items found. Pages go through the shared response cache (or the ResponseCache passed in) and are served from it or revalidated with conditional requests; cache=False fetches everything.'''
 
+    cache = resolve_cache(cache)
     all_items = []
     skip = 0
     limit = 30
@@ -18,7 +30,7 @@ def fetch_data(base_url, resource):
         url = f"{base_url}/{resource}?limit={limit}&skip={skip}"
 
         try:
-            response = requests.get(url)
+            response = cache.get(requests, url) if cache else requests.get(url)
 
             if response.status_code == 200:
                 data = response.json()
@@ -28,18 +40,22 @@ def fetch_data(base_url, resource):
 
                 all_items.extend(items)
                 skip += limit
-                logger.info(f"Fetched {len(items)} items, total so far: {len(all_items)}")
+                count(pages=1, rows=len(items), bytes=len(response.content))
+                logger.debug(f"Fetched {len(items)} items, total so far: {len(all_items)}")
                 time.sleep(0.5)
                 
             else:
+                count(errors=1)
                 logger.error(f"Request failed with status code: {response.status_code}")
                 break
         except Exception as e:
+            count(errors=1)
             logger.error(f"An error occurred: {e}")
             break
     return all_items
 
 
+@timed()
 def save_raw_json(file_path, data, resource):
 
     '''This function will save the raw data fetched from the API into a JSON file with a timestamped filename. It takes in the file path, data to be saved, and the resource type for naming from runner module.'''
@@ -52,6 +68,208 @@ def save_raw_json(file_path, data, resource):
         with open(file_path, 'w', encoding='utf-8') as f:
             for item in data:
                 f.write(json.dumps(item, ensure_ascii=False) + '\n')
+        count(rows=len(data), bytes=file_path.stat().st_size)
         logger.info(f"SUCCESS: Saved raw data to {file_path}")
     except Exception as e:
-        logger.error(f"Failed to save JSONL: {e}")
\ No newline at end of file
+        count(errors=1)
+        logger.error(f"Failed to save JSONL: {e}")
+
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class RateLimiter:
+
+    '''Token bucket shared between threads. Allows rate requests per second on average, with bursts of up to capacity requests.'''
+
+    def __init__(self, rate=5.0, capacity=None):
+        self.rate = rate
+        self.capacity = capacity or max(1.0, rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+def make_session(pool_size=8):
+
+    '''Builds a requests Session whose connection pool is large enough for pool_size concurrent workers.'''
+
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def get_with_retry(session, url, rate_limiter=None, max_retries=4, backoff=0.5, timeout=30, cache=None):
+
+    '''GETs url and returns the parsed JSON body. 429/5xx responses and connection errors are retried with exponential backoff (backoff, 2*backoff, 4*backoff, ...); a Retry-After header takes precedence. Raises once max_retries is exhausted.'''
+
+    for attempt in range(max_retries + 1):
+        if rate_limiter:
+            rate_limiter.acquire()
+        try:
+            response = cache.get(session, url, timeout=timeout) if cache else session.get(url, timeout=timeout)
+            if response.status_code == 200:
+                return response.json()
+            if response.status_code not in RETRY_STATUSES:
+                response.raise_for_status()
+            error = f"status code {response.status_code}"
+            retry_after = response.headers.get("Retry-After")
+        except (requests.ConnectionError, requests.Timeout) as e:
+            error = str(e)
+            retry_after = None
+
+        if attempt == max_retries:
+            break
+        delay = float(retry_after) if retry_after and retry_after.isdigit() else backoff * (2 ** attempt)
+        count(retries=1)
+        logger.warning(f"Request to {url} failed ({error}), retrying in {delay:.1f}s ({attempt + 1}/{max_retries})")
+        time.sleep(delay)
+
+    raise requests.HTTPError(f"Giving up on {url} after {max_retries + 1} attempts: {error}")
+
+
+Page = namedtuple("Page", ["skip", "total", "items", "error"])
+
+
+def iter_pages(base_url, resource, limit=30, max_workers=8, rate_limiter=None, session=None, start_skip=0, cache=None):
+
+    '''Yields Page(skip, total, items, error) tuples in skip order as they arrive. The first page gives the total; the rest are fetched on a thread pool with at most 2 * max_workers pages in flight, so memory stays O(page size). A page that fails after retries is yielded with empty items and the error message instead of stopping the iteration.'''
+
+    session = session or make_session(max_workers)
+    rate_limiter = rate_limiter or RateLimiter()
+
+    def fetch_page(skip):
+        return get_with_retry(session, f"{base_url}/{resource}?limit={limit}&skip={skip}", rate_limiter, cache=cache)
+
+    try:
+        first = fetch_page(start_skip)
+    except Exception as e:
+        logger.error(f"An error occurred fetching {resource} at skip={start_skip}: {e}")
+        yield Page(start_skip, None, [], str(e))
+        return
+
+    first_items = first.get(resource, [])
+    total = first.get("total", start_skip + len(first_items))
+    yield Page(start_skip, total, first_items, None)
+
+    skips = iter(range(start_skip + limit, total, limit))
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        in_flight = deque((skip, submit(executor, fetch_page, skip)) for skip in islice(skips, 2 * max_workers))
+        while in_flight:
+            skip, future = in_flight.popleft()
+            next_skip = next(skips, None)
+            if next_skip is not None:
+                in_flight.append((next_skip, submit(executor, fetch_page, next_skip)))
+
+            try:
+                page = Page(skip, total, future.result().get(resource, []), None)
+            except Exception as e:
+                logger.error(f"Page skip={skip} of {resource} failed: {e}")
+                page = Page(skip, total, [], str(e))
+            yield page
+
+
+def fetch_data_concurrent(base_url, resource, limit=30, max_workers=8, rate_limiter=None, session=None, cache=None):
+
+    '''Concurrent version of fetch_data. The remaining skip offsets are computed from the first page's total and fetched on a thread pool through one pooled session. A token bucket limits the request rate in place of the fixed sleep. A page that still fails after retries is logged and skipped, and the other pages are kept.'''
+
+    all_items = []
+    pages = failed = 0
+    for page in iter_pages(base_url, resource, limit, max_workers, rate_limiter, session, cache=cache):
+        pages += 1
+        failed += page.error is not None
+        all_items.extend(page.items)
+
+    logger.info(f"Fetched {len(all_items)} {resource} over {pages} pages ({failed} failed)")
+    return all_items
+
+
+class JsonlSink:
+
+    '''Context manager that streams records into a JSONL file. Each page is written and flushed to a .part file next to file_path, which is renamed onto file_path when the block exits cleanly. If the block fails, or the data was flagged with mark_incomplete, the .part file is left in place. resume_at continues such a leftover .part file: it is cut back to resume_at bytes (the last size known to be good, see size) and appended to. With compress=True the output is gzip-compressed.'''
+
+    def __init__(self, file_path, compress=False, resume_at=None):
+        self.file_path = Path(file_path)
+        self.tmp_path = self.file_path.with_name(self.file_path.name + ".part")
+        if compress and resume_at is not None:
+            raise ValueError("Compressed sinks cannot be resumed")
+        self.compress = compress
+        self.resume_at = resume_at
+        self.incomplete = None
+        self.items = 0
+        self.bytes = 0
+        self.size = resume_at or 0
+
+    def __enter__(self):
+        if self.resume_at is not None:
+            with open(self.tmp_path, 'r+b') as f:
+                f.truncate(self.resume_at)
+            self.f = open(self.tmp_path, 'at', encoding='utf-8')
+            return self
+        opener = gzip.open if self.compress else open
+        self.f = opener(self.tmp_path, 'wt', encoding='utf-8')
+        return self
+
+    def write_page(self, items):
+        chunk = ''.join(json.dumps(item, ensure_ascii=False) + '\n' for item in items)
+        self.f.write(chunk)
+        self.f.flush()
+        size = len(chunk.encode('utf-8'))
+        self.items += len(items)
+        self.bytes += size
+        self.size += size
+
+    def mark_incomplete(self, reason):
+        self.incomplete = reason
+
+    def __exit__(self, exc_type, exc, tb):
+        self.f.close()
+        if exc_type is not None:
+            logger.error(f"Writing {self.file_path} failed, partial data left in {self.tmp_path}")
+        elif self.incomplete:
+            logger.warning(f"{self.file_path} is incomplete ({self.incomplete}), partial data left in {self.tmp_path}")
+        else:
+            os.replace(self.tmp_path, self.file_path)
+        return False
+
+
+@timed()
+def extract_to_jsonl(file_path, base_url, resource, compress=False, **fetch_kwargs):
+
+    '''Streams a resource straight from the API to a timestamped JSONL file in file_path, page by page, without collecting all_items in memory. If any page still fails after retries, the snapshot is not published: the data stays in the .part file, which downstream stages ignore, and file is None. Returns a summary dict with the output file, item/page/byte counts and the number of failed pages.'''
+
+    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    filename = f"{resource}_{timestamp}.jsonl" + (".gz" if compress else "")
+    target = file_path / filename
+
+    summary = {"resource": resource, "file": None, "items": 0, "pages": 0, "bytes": 0, "errors": 0}
+    try:
+        with JsonlSink(target, compress) as sink:
+            for page in iter_pages(base_url, resource, **fetch_kwargs):
+                summary["pages"] += 1
+                summary["errors"] += page.error is not None
+                sink.write_page(page.items)
+            if summary["errors"]:
+                sink.mark_incomplete(f"{summary['errors']} failed page(s)")
+        summary.update(file=None if summary["errors"] else target, items=sink.items, bytes=sink.bytes)
+        count(rows=sink.items, pages=summary["pages"], bytes=sink.bytes, errors=summary["errors"])
+        if not summary["errors"]:
+            logger.info(f"SUCCESS: Streamed {sink.items} {resource} to {target}")
+    except Exception as e:
+        summary["errors"] += 1
+        logger.error(f"Failed to stream {resource} to JSONL: {e}")
+    return summary
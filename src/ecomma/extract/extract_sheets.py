@@ -1,11 +1,92 @@
+import io
+import os
+import hashlib
+import requests
 import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
 from ecomma.settings.config import RAW_DATA, setup_logging
+from ecomma.storage.parquet_store import write_frames
+from ecomma.settings.instrumentation import timed, count, submit, write_report
+from ecomma.extract.http_cache import resolve_cache
 import logging
 
 logger = logging.getLogger(__name__)
 setup_logging()
 
-def extract_from_sheets():
+SHEETS = [
+    {"sheet_id": "1nN0el0BiRtvPJs7QAuVMMAMU5VN8vDEgIAaJ2FuLdWg", "gid": "0", "output": "raw_orders.jsonl"},
+]
+
+def sheet_csv_url(sheet_id, gid):
+    return f"https://docs.google.com/spreadsheets/d/{sheet_id}/export?format=csv&gid={gid}"
+
+def download_sheet(csv_url, download_path):
+    '''Downloads the CSV export to download_path in chunks and returns its sha256, so the whole sheet is never held as one string. This bypasses the response cache, which keeps whole bodies in memory; an unchanged sheet is caught by its sha256 instead.'''
+    digest = hashlib.sha256()
+    with open(download_path, 'wb') as f:
+        response = requests.get(csv_url, stream=True, timeout=60)
+        response.raise_for_status()
+        for chunk in response.iter_content(chunk_size=1024 * 1024):
+            digest.update(chunk)
+            f.write(chunk)
+    return digest.hexdigest()
+
+def extract_sheet_streaming(sheet_id, gid, output, chunksize=50000, parquet=False):
+
+    '''Streaming version of extract_from_sheets for one sheet tab. The export is hashed while downloading. If the hash matches the previous run (kept next to the output as <output>.sha256), the write is skipped. Otherwise the CSV is read in chunks and each chunk is appended to the JSONL output, which replaces the old file only once complete. With parquet=True the chunks are also streamed to RAW_DATA/parquet/<output stem>, partitioned by extraction date, as string columns so every chunk has the same schema. That write replaces the day's partition, so re-extracting a changed sheet does not duplicate its rows.'''
+
+    RAW_DATA.mkdir(parents=True, exist_ok=True)
+    raw_file_path = RAW_DATA / output
+    hash_path = raw_file_path.with_name(raw_file_path.name + ".sha256")
+    download_path = raw_file_path.with_name(raw_file_path.name + ".download")
+    part_path = raw_file_path.with_name(raw_file_path.name + ".part")
+    summary = {"sheet_id": sheet_id, "gid": gid, "file": raw_file_path, "rows": 0, "skipped": False, "errors": 0}
+
+    try:
+        digest = download_sheet(sheet_csv_url(sheet_id, gid), download_path)
+
+        if raw_file_path.exists() and hash_path.exists() and hash_path.read_text().strip() == digest:
+            summary["skipped"] = True
+            logger.info(f"Sheet {sheet_id}/{gid} unchanged since last run, keeping {raw_file_path}")
+            return summary
+
+        with open(part_path, 'w', encoding='utf-8') as f:
+            def chunks():
+                for chunk in pd.read_csv(download_path, chunksize=chunksize):
+                    lines = chunk.to_json(orient="records", lines=True)
+                    f.write(lines if lines.endswith("\n") else lines + "\n")
+                    summary["rows"] += len(chunk)
+                    yield chunk.astype("string")
+
+            if parquet:
+                write_frames(chunks(), RAW_DATA / 'parquet' / raw_file_path.stem, "extract_date", replace=True)
+            else:
+                for _ in chunks():
+                    pass
+        os.replace(part_path, raw_file_path)
+        hash_path.write_text(digest)
+
+        logger.info(f"Success! Extracted {summary['rows']} rows from sheet {sheet_id}/{gid} to {raw_file_path}")
+
+    except Exception as e:
+        summary["errors"] += 1
+        logger.error(f"Error extracting Google Sheet {sheet_id}/{gid}: {e}", exc_info=True)
+    finally:
+        download_path.unlink(missing_ok=True)
+        part_path.unlink(missing_ok=True)
+    return summary
+
+def extract_sheets_parallel(sheets=None, max_workers=4, chunksize=50000, parquet=False):
+    '''Runs extract_sheet_streaming for several sheet IDs/GIDs at once. sheets is a list of dicts with sheet_id, gid and output keys (SHEETS by default).'''
+    sheets = sheets or SHEETS
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [submit(executor, extract_sheet_streaming, sheet["sheet_id"], sheet["gid"], sheet["output"], chunksize, parquet)
+                   for sheet in sheets]
+        return [f.result() for f in futures]
+
+@timed()
+def extract_from_sheets(cache=True):
+    cache = resolve_cache(cache)
     SHEET_ID = "1nN0el0BiRtvPJs7QAuVMMAMU5VN8vDEgIAaJ2FuLdWg"
     GID = "0"
 
@@ -15,18 +96,26 @@ def extract_from_sheets():
     )
 
     try:
-        df = pd.read_csv(csv_url)
+        if cache:
+            response = cache.get(requests, csv_url, timeout=60)
+            response.raise_for_status()
+            df = pd.read_csv(io.BytesIO(response.content))
+        else:
+            df = pd.read_csv(csv_url)
 
         RAW_DATA.mkdir(parents=True, exist_ok=True)
         raw_file_path = RAW_DATA / "raw_orders.jsonl"
 
         df.to_json(raw_file_path, orient="records", lines=True)
+        count(rows=len(df), bytes=raw_file_path.stat().st_size)
 
         logger.info(f"Success! Extracted {len(df)} rows.")
         logger.info(f"Saved to: {raw_file_path}")
 
     except Exception as e:
+        count(errors=1)
         logger.error(f"Error extracting Google Sheet: {e}", exc_info=True)
 
 if __name__ == "__main__":
-    extract_from_sheets()
\ No newline at end of file
+    extract_from_sheets()
+    write_report("sheets")
\ No newline at end of file
@@ -0,0 +1,142 @@
+import os
+import json
+import tempfile
+import time
+import hashlib
+import logging
+import threading
+import functools
+import requests
+from requests.structures import CaseInsensitiveDict
+from ecomma.settings.config import CACHE_DATA
+
+logger = logging.getLogger(__name__)
+
+
+class ResponseCache:
+
+    '''On-disk HTTP response cache keyed by URL. Each entry is a body file plus a small JSON file with the ETag/Last-Modified headers. A fresh entry (younger than ttl seconds) is served without a request. A stale entry is revalidated with If-None-Match/If-Modified-Since, so an unchanged resource costs a 304 instead of a full download. When the cache grows past max_bytes, the least recently used entries are evicted.'''
+
+    def __init__(self, cache_dir=None, ttl=3600, max_bytes=512 * 1024 * 1024):
+        self.cache_dir = cache_dir or CACHE_DATA / "http"
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self.stats = {"hits": 0, "revalidated": 0, "misses": 0, "bytes_saved": 0, "evictions": 0}
+
+    def paths(self, url):
+        key = hashlib.sha256(url.encode('utf-8')).hexdigest()
+        return self.cache_dir / f"{key}.body", self.cache_dir / f"{key}.json"
+
+    def count(self, name, amount=1):
+        with self.lock:
+            self.stats[name] += amount
+
+    def get(self, session, url, **kwargs):
+
+        '''Drop-in for session.get(url). Returns a requests.Response, served from the cache when possible. Only 200 responses are cached; anything else is returned untouched for the caller to handle.'''
+
+        body_path, meta_path = self.paths(url)
+        meta = None
+        if meta_path.exists() and body_path.exists():
+            try:
+                with open(meta_path, 'r', encoding='utf-8') as f:
+                    meta = json.load(f)
+            except (OSError, ValueError):
+                meta = None
+
+        if meta and time.time() - meta["stored_at"] < self.ttl:
+            self.count("hits")
+            self.count("bytes_saved", meta["size"])
+            return self.cached_response(url, body_path, meta)
+
+        headers = dict(kwargs.pop("headers", None) or {})
+        if meta and meta.get("etag"):
+            headers["If-None-Match"] = meta["etag"]
+        if meta and meta.get("last_modified"):
+            headers["If-Modified-Since"] = meta["last_modified"]
+
+        response = session.get(url, headers=headers, **kwargs)
+
+        if response.status_code == 304 and meta:
+            self.count("revalidated")
+            self.count("bytes_saved", meta["size"])
+            meta["stored_at"] = time.time()
+            self.write_meta(meta_path, meta)
+            return self.cached_response(url, body_path, meta)
+
+        self.count("misses")
+        if response.status_code == 200:
+            self.store(url, response)
+        return response
+
+    def cached_response(self, url, body_path, meta):
+        os.utime(body_path)  # mtime doubles as the LRU access time
+        response = requests.Response()
+        response.status_code = 200
+        response.url = url
+        response.headers = CaseInsensitiveDict(meta.get("headers", {}))
+        with open(body_path, 'rb') as f:
+            response._content = f.read()
+        return response
+
+    def replace(self, path, data):
+        '''Writes data to a temporary file of its own in the cache directory and renames it onto path, so two threads storing the same URL never write into each other's file.'''
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, prefix=path.name + ".", suffix=".tmp")
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    def write_meta(self, meta_path, meta):
+        self.replace(meta_path, json.dumps(meta).encode('utf-8'))
+
+    def store(self, url, response):
+        body_path, meta_path = self.paths(url)
+        self.replace(body_path, response.content)
+
+        self.write_meta(meta_path, {
+            "url": url,
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+            "headers": {"Content-Type": response.headers.get("Content-Type", "")},
+            "stored_at": time.time(),
+            "size": len(response.content),
+        })
+        self.evict()
+
+    def evict(self):
+
+        '''Deletes least recently used entries until the cache fits in max_bytes.'''
+
+        with self.lock:
+            bodies = [(p.stat().st_mtime, p.stat().st_size, p) for p in self.cache_dir.glob("*.body")]
+            total = sum(size for _, size, _ in bodies)
+            for _, size, body_path in sorted(bodies):
+                if total <= self.max_bytes:
+                    break
+                body_path.unlink(missing_ok=True)
+                body_path.with_suffix(".json").unlink(missing_ok=True)
+                total -= size
+                self.stats["evictions"] += 1
+
+    def log_stats(self):
+        logger.info(f"HTTP cache: {self.stats['hits']} hits, {self.stats['revalidated']} revalidated (304), "
+                    f"{self.stats['misses']} misses, {self.stats['bytes_saved']} bytes saved")
+
+
+@functools.lru_cache(maxsize=None)
+def default_cache():
+    '''The shared ResponseCache under CACHE_DATA/http used by the extract layer.'''
+    return ResponseCache()
+
+
+def resolve_cache(cache):
+    '''Maps an extract function's cache argument to a ResponseCache or None: True selects the shared default_cache, a ResponseCache is used as is, and None/False turns caching off.'''
+    if cache is True:
+        return default_cache()
+    return cache or None
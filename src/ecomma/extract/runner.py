@@ -1,36 +1,206 @@
+import os
+import json
+import time
+import hashlib
 import logging
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
 from ecomma.settings.config import RAW_DATA
-from ecomma.extract.extraction import fetch_data, save_raw_json
+from ecomma.extract.extract_api import iter_pages, extract_to_jsonl, JsonlSink, RateLimiter
+from ecomma.extract.http_cache import resolve_cache
+from ecomma.storage.parquet_store import jsonl_to_parquet
+from ecomma.settings.instrumentation import timed, count, submit, write_report
 
 logger = logging.getLogger(__name__)
 
-def run_extraction():
-    '''This function will run the extraction process for products, users, and carts from the dummyjson.com API. It will fetch the data using the fetch_data function and save it using the save_raw_json function.'''
-
-    base_url = "https://dummyjson.com"
-
-    products_file_path = RAW_DATA / 'products'
-    users_file_path = RAW_DATA / 'users'
-    carts_file_path = RAW_DATA / 'carts'
-
-    file_paths = [products_file_path, users_file_path, carts_file_path]
-    for file_path in file_paths:
-        file_path.mkdir(parents=True, exist_ok=True)
-
-    # Call the functions and save the data
-    products = fetch_data(base_url, "products")
-    if products:
-        save_raw_json(products_file_path, products, "products")
-    
-    users = fetch_data(base_url, "users")
-    if users:
-        save_raw_json(users_file_path, users, "users")
-    
-    carts = fetch_data(base_url, "carts")
-    if carts:
-        save_raw_json(carts_file_path, carts, "carts")
-
-    logger.debug(f"Extraction run completed. Products: {len(products)}, Users: {len(users)}, Carts: {len(carts)}. Data saved to {RAW_DATA}")
+BASE_URL = "https://dummyjson.com"
+RESOURCES = ["products", "users", "carts"]
+STATE_FILE = "_state.json"
+
+
+def extract_resource(base_url, resource, compress=False, raw_dir=None, **fetch_kwargs):
+    '''Streams one resource into RAW_DATA/<resource>/<resource>_<ts>.jsonl (or under raw_dir). Like before, nothing is kept if no items came back.'''
+    file_path = (raw_dir or RAW_DATA) / resource
+    file_path.mkdir(parents=True, exist_ok=True)
+    summary = extract_to_jsonl(file_path, base_url, resource, compress=compress, **fetch_kwargs)
+    if summary["file"] and not summary["items"]:
+        summary["file"].unlink()
+        summary["file"] = None
+    return summary
+
+
+def timed_extract(extract_one, base_url, resource, **kwargs):
+    start = time.perf_counter()
+    try:
+        summary = extract_one(base_url, resource, **kwargs)
+    except Exception as e:
+        logger.error(f"Extraction of {resource} failed: {e}", exc_info=True)
+        summary = {"resource": resource, "file": None, "items": 0, "pages": 0, "bytes": 0, "errors": 1}
+    summary["elapsed"] = round(time.perf_counter() - start, 3)
+    return summary
+
+
+def run_resources(extract_one, resources, base_url, rate, **kwargs):
+    '''Runs extract_one for every resource on its own thread. All threads share one token bucket, so rate is the global request rate.'''
+    rate_limiter = RateLimiter(rate)
+    with ThreadPoolExecutor(max_workers=len(resources)) as executor:
+        futures = [submit(executor, timed_extract, extract_one, base_url, resource, rate_limiter=rate_limiter, **kwargs)
+                   for resource in resources]
+        summaries = {f.result()["resource"]: f.result() for f in futures}
+
+    for summary in summaries.values():
+        logger.info(f"{summary['resource']}: {summary['items']} items, {summary['pages']} pages, "
+                    f"{summary.get('bytes', 0)} bytes, {summary['elapsed']}s, {summary['errors']} errors")
+    return summaries
+
+
+def run_extraction(resources=None, base_url=BASE_URL, rate=5.0, compress=False, cache=True, parquet=False, raw_dir=None):
+    '''This function will run the extraction process for the given resources (products, users and carts by default) from the dummyjson.com API. The resources are fetched concurrently under one shared rate limit and streamed to disk page by page. Returns a per-resource summary with item count, pages, bytes, elapsed time and error count. Pages go through the shared response cache (or the ResponseCache passed in), so unchanged pages from earlier runs are reused; cache=False turns it off. With parquet=True each snapshot is also written to RAW_DATA/parquet/<resource>, partitioned by extraction date, replacing any earlier snapshot of the same day. raw_dir overrides RAW_DATA as the output root.'''
+
+    raw_dir = raw_dir or RAW_DATA
+    cache = resolve_cache(cache)
+    summaries = run_resources(extract_resource, resources or RESOURCES, base_url, rate, compress=compress, cache=cache,
+                              raw_dir=raw_dir)
+    if cache:
+        cache.log_stats()
+    if parquet:
+        for resource, summary in summaries.items():
+            if summary["file"]:
+                jsonl_to_parquet(summary["file"], raw_dir / 'parquet' / resource, replace=True)
+    logger.info(f"Extraction run completed. Data saved to {raw_dir}")
+    write_report("extraction")
+    return summaries
+
+
+def page_hash(items):
+    return hashlib.sha256(json.dumps(items, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+def load_state(state_path, limit):
+    '''Loads the extraction checkpoint for a resource. Starts fresh if there is none or it was written with a different page size.'''
+    if state_path.exists():
+        with open(state_path, 'r', encoding='utf-8') as f:
+            state = json.load(f)
+        if state.get("limit") == limit:
+            return state
+        logger.warning(f"Page size changed, discarding checkpoint {state_path}")
+    return {"limit": limit, "total": None, "last_skip": None, "complete": False, "pages": {}, "failed": [], "run": None}
+
+
+def save_state(state_path, state):
+    state["updated_at"] = datetime.now().isoformat(timespec='seconds')
+    tmp_path = state_path.with_name(state_path.name + ".tmp")
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(state, f)
+    os.replace(tmp_path, state_path)
+
+
+def resume_skip(state, full_refresh):
+    '''Works out where to start paging: after the last checkpointed page of an interrupted run, or at the last (possibly partial) page of a completed one. Failed pages are always fetched again. A completed run is only extended past its previous total, so records edited in place on earlier pages are only picked up by a full_refresh. Without a known total (no page ever came back) paging starts over.'''
+    limit = state["limit"]
+    if state.get("run"):
+        start = state["last_skip"] + limit
+    elif full_refresh or state["last_skip"] is None or state["total"] is None:
+        start = 0
+    else:
+        start = (state["total"] // limit) * limit
+    return min([start] + state["failed"])
+
+
+@timed()
+def extract_resource_incremental(base_url, resource, full_refresh=False, limit=30, raw_dir=None, **fetch_kwargs):
+
+    '''Incrementally extracts one resource using a checkpoint kept in RAW_DATA/<resource>/_state.json (last skip, total, and a content hash per page). The checkpoint is saved after every page together with the output .part file and its size, so an interrupted run resumes where it stopped and keeps appending to the same file. A run whose pages failed after retries is treated the same way: its file stays unpublished and the next run fetches the failed pages into it, so a snapshot or delta is only published once it is complete. The hashes of a run's pages only join the committed page hashes once its file has been renamed into place, so a page is never marked as seen while its data sits in an unfinished file. A repeat run only pages past the previous total, plus any failed pages, unless full_refresh re-checks every page. Only new or changed pages are written. The first run writes a normal <resource>_<ts>.jsonl snapshot; later runs write a delta file under <resource>/deltas/, and no file is written when nothing changed. raw_dir overrides RAW_DATA as the output root.'''
+
+    resource_dir = (raw_dir or RAW_DATA) / resource
+    resource_dir.mkdir(parents=True, exist_ok=True)
+    state_path = resource_dir / STATE_FILE
+    state = load_state(state_path, limit)
+
+    run = state.get("run")
+    resumed = bool(run) and (resource_dir / f"{run['file']}.part").exists()
+    if run and not resumed:
+        logger.warning(f"{resource}: the partial file of the interrupted run is gone, re-checking every page")
+        state["run"] = None
+        full_refresh = True
+    elif not run and not state["complete"] and state["last_skip"] is not None:
+        logger.warning(f"{resource}: interrupted run left no resumable file, re-checking every page")
+        full_refresh = True
+
+    start = resume_skip(state, full_refresh)
+    if resumed:
+        logger.info(f"{resource}: resuming interrupted run at skip={start} into {run['file']}")
+    else:
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        name = f"{resource}_{timestamp}.jsonl"
+        if state["pages"]:
+            (resource_dir / "deltas").mkdir(exist_ok=True)
+            name = f"deltas/{name}"
+        run = state["run"] = {"file": name, "bytes": 0, "pages": {}}
+    target = resource_dir / run["file"]
+
+    failed = set(state["failed"])
+    summary = {"resource": resource, "file": None, "start_skip": start, "resumed": resumed, "pages": 0, "changed_pages": 0, "items": 0, "bytes": 0, "errors": 0}
+    state["complete"] = False
+
+    with JsonlSink(target, resume_at=run["bytes"] if resumed else None) as sink:
+        for page in iter_pages(base_url, resource, limit=limit, start_skip=start, **fetch_kwargs):
+            summary["pages"] += 1
+            if page.error is not None:
+                summary["errors"] += 1
+                failed.add(page.skip)
+            else:
+                failed.discard(page.skip)
+                key = str(page.skip)
+                digest = page_hash(page.items)
+                if run["pages"].get(key, state["pages"].get(key)) != digest:
+                    sink.write_page(page.items)
+                    summary["changed_pages"] += 1
+                    run["pages"][key] = digest
+
+            if page.total is not None:
+                state["total"] = page.total
+            state["last_skip"] = page.skip
+            state["failed"] = sorted(failed)
+            run["bytes"] = sink.size
+            save_state(state_path, state)
+        if failed:
+            sink.mark_incomplete(f"{len(failed)} failed page(s)")
+
+    summary["items"] = sink.items
+    summary["bytes"] = sink.bytes
+    count(rows=sink.items, pages=summary["pages"], bytes=sink.bytes, errors=summary["errors"])
+    if failed:
+        logger.warning(f"{resource}: pages {sorted(failed)} failed, the next run retries them before publishing {target}")
+        return summary
+
+    state["pages"].update(run["pages"])
+    if state["total"] is not None:
+        state["pages"] = {k: v for k, v in state["pages"].items() if int(k) < state["total"]}
+    state["run"] = None
+    state["complete"] = True
+    save_state(state_path, state)
+
+    if sink.size:
+        summary["file"] = target
+        logger.info(f"{resource}: {summary['changed_pages']} new/changed pages ({sink.items} items) saved to {target}")
+    else:
+        target.unlink()
+        logger.info(f"{resource}: no changes since last run")
+    return summary
+
+
+def run_incremental_extraction(resources=None, base_url=BASE_URL, rate=5.0, full_refresh=False, cache=True, raw_dir=None):
+    '''Incremental counterpart of run_extraction. Resources run concurrently under one shared rate limit.'''
+    cache = resolve_cache(cache)
+    summaries = run_resources(extract_resource_incremental, resources or RESOURCES, base_url, rate,
+                              full_refresh=full_refresh, cache=cache, raw_dir=raw_dir)
+    if cache:
+        cache.log_stats()
+    logger.info(f"Incremental extraction run completed. Data saved to {raw_dir or RAW_DATA}")
+    write_report("incremental_extraction")
+    return summaries
+
 
 if __name__ == "__main__":
     run_extraction()
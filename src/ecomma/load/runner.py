@@ -0,0 +1,47 @@
+import logging
+import pandas as pd
+from itertools import groupby
+from ecomma.settings.config import RAW_DATA, PROCESSED_DATA
+from ecomma.storage.manifest import pending_files
+from ecomma.load.sqlite_loader import connect, load_table
+
+logger = logging.getLogger(__name__)
+
+# table -> (folder, file suffixes, reader, recursive); generated datasets come from the partitioned transform output,
+# whose files sit in <partition>=YYYY-MM-DD subfolders, API entities from RAW_DATA, including incremental deltas/
+SOURCES = {
+    "orders": (PROCESSED_DATA / "orders", (".parquet",), pd.read_parquet, True),
+    "marketing": (PROCESSED_DATA / "marketing", (".parquet",), pd.read_parquet, True),
+    "promotions": (PROCESSED_DATA / "promotions", (".parquet",), pd.read_parquet, True),
+    "products": (RAW_DATA / "products", (".jsonl", ".jsonl.gz"), lambda p: pd.read_json(p, lines=True), True),
+    "users": (RAW_DATA / "users", (".jsonl", ".jsonl.gz"), lambda p: pd.read_json(p, lines=True), True),
+    "carts": (RAW_DATA / "carts", (".jsonl", ".jsonl.gz"), lambda p: pd.read_json(p, lines=True), True),
+}
+
+
+def source_groups(files, recursive):
+    '''Groups pending files by the source they came from. The transform writes one raw file as <stem>-<i>.parquet fragments spread over its day partitions; those are loaded together, in one upsert, as the single file was before.'''
+    if not recursive:
+        return [[path] for path in files]
+    source = lambda path: path.name.rsplit("-", 1)[0]
+    return [list(group) for _, group in groupby(sorted(files, key=source), key=source)]
+
+
+def run_load(tables=None, db_path=None):
+
+    '''Upserts every file not loaded yet into its SQLite table, oldest first, so newer snapshots win on key conflicts. Returns {table: [load metrics per source file]}.'''
+
+    conn = connect(db_path)
+    metrics = {}
+    try:
+        for table in tables or SOURCES:
+            folder, suffixes, reader, recursive = SOURCES[table]
+            manifest, files = pending_files(f"load_{table}", folder, suffixes, recursive)
+            metrics[table] = []
+            for group in source_groups(files, recursive):
+                metrics[table].append(load_table(conn, table, pd.concat([reader(p) for p in group], ignore_index=True)))
+                for path in group:
+                    manifest.mark_done(path)
+    finally:
+        conn.close()
+    return metrics
@@ -0,0 +1,148 @@
+import json
+import time
+import sqlite3
+import logging
+import pandas as pd
+from itertools import islice
+from ecomma.settings.config import DATABASE_PATH
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 50000
+
+# table -> upsert key and the secondary indexes built after each bulk load; generated campaigns and promotions
+# reuse their ids, so they are keyed on the record_id added by the transform
+TABLES = {
+    "orders": {"key": "order_id", "indexes": ["order_date", "user_id", "status", "promo_code_used"]},
+    "promotions": {"key": "record_id", "indexes": ["Promo_ID", "Promo_Code", "Start_Date"]},
+    "marketing": {"key": "record_id", "indexes": ["Campaign_ID", "Promo_Code_Linked", "Start_Date", "Channel"]},
+    "products": {"key": "id", "indexes": ["category"]},
+    "users": {"key": "id", "indexes": []},
+    "carts": {"key": "id", "indexes": ["userId"]},
+}
+
+
+def connect(db_path=None):
+    '''Opens the embedded database with settings tuned for bulk loading.'''
+    db_path = db_path or DATABASE_PATH
+    db_path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(db_path)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=OFF")
+    conn.execute("PRAGMA temp_store=MEMORY")
+    conn.execute("PRAGMA cache_size=-262144")
+    return conn
+
+
+def sql_type(dtype):
+    if pd.api.types.is_bool_dtype(dtype) or pd.api.types.is_integer_dtype(dtype):
+        return "INTEGER"
+    if pd.api.types.is_float_dtype(dtype):
+        return "REAL"
+    return "TEXT"
+
+
+def to_sql_columns(df):
+    '''Converts each column into a list of plain Python values SQLite can bind. Datetimes become ISO strings and nested API fields become JSON text. NaN is left alone because SQLite stores it as NULL; only pandas NA/NaT need replacing with None.'''
+    columns = []
+    for col in df.columns:
+        series = df[col]
+        if pd.api.types.is_datetime64_any_dtype(series):
+            series = series.dt.strftime("%Y-%m-%d %H:%M:%S")
+        elif series.dtype == object:
+            series = series.map(lambda v: json.dumps(v) if isinstance(v, (dict, list)) else v)
+        if pd.api.types.is_extension_array_dtype(series.dtype) and not isinstance(series.dtype, pd.CategoricalDtype):
+            series = series.astype(object).where(series.notna(), None)
+        columns.append(series.tolist())
+    return columns
+
+
+def ensure_table(conn, table, df, key):
+    columns = ", ".join(f'"{col}" {sql_type(df[col].dtype)}' + (" PRIMARY KEY" if col == key else "") for col in df.columns)
+    conn.execute(f'CREATE TABLE IF NOT EXISTS "{table}" ({columns})')
+
+    info = conn.execute(f'PRAGMA table_info("{table}")').fetchall()
+    primary = [row[1] for row in info if row[5]]
+    if primary != [key]:
+        raise ValueError(f'Table "{table}" is keyed on {primary}, not "{key}"; drop it and its load manifest to reload it')
+    existing = {row[1] for row in info}
+    for col in df.columns:
+        if col not in existing:
+            conn.execute(f'ALTER TABLE "{table}" ADD COLUMN "{col}" {sql_type(df[col].dtype)}')
+
+
+def index_names(table, columns):
+    return {f"idx_{table}_{col}".lower(): col for col in columns}
+
+
+def load_table(conn, table, df):
+
+    '''Bulk-upserts df into table. Secondary indexes are dropped first. Rows are inserted in BATCH_SIZE executemany batches inside one transaction, with ON CONFLICT on the table's key so re-running a load is idempotent. The indexes are rebuilt afterwards. Rows without a key are skipped, and when a key repeats within df only its last row is kept; both are logged and counted in the metrics. Returns per-table load metrics: prepare_seconds covers the key checks, sorting and conversion to Python values, insert_seconds only the executemany batches, and rows_per_second is the insert rate while total_rows_per_second includes all three phases.'''
+
+    spec = TABLES[table]
+    key = spec["key"]
+    start = time.perf_counter()
+
+    missing_key = df[key].isna()
+    if missing_key.any():
+        logger.warning(f"{table}: skipping {int(missing_key.sum())} rows without {key}")
+        df = df[~missing_key]
+    repeated = df.duplicated(subset=key, keep="last")
+    if repeated.any():
+        logger.warning(f"{table}: dropping {int(repeated.sum())} rows whose {key} repeats later in the same load")
+        df = df[~repeated]
+    # sorted keys turn random primary-key inserts into B-tree appends
+    df = df.sort_values(key, kind="stable")
+
+    ensure_table(conn, table, df, key)
+    indexes = index_names(table, [col for col in spec["indexes"] if col in df.columns])
+
+    columns = ", ".join(f'"{col}"' for col in df.columns)
+    placeholders = ", ".join("?" for _ in df.columns)
+    updates = ", ".join(f'"{col}" = excluded."{col}"' for col in df.columns if col != key)
+    sql = (f'INSERT INTO "{table}" ({columns}) VALUES ({placeholders}) '
+           f'ON CONFLICT("{key}") DO ' + (f"UPDATE SET {updates}" if updates else "NOTHING"))
+
+    rows = zip(*to_sql_columns(df))
+    prepare_seconds = time.perf_counter() - start
+    with conn:
+        for name in indexes:
+            conn.execute(f'DROP INDEX IF EXISTS "{name}"')
+        insert_start = time.perf_counter()
+        while True:
+            batch = list(islice(rows, BATCH_SIZE))
+            if not batch:
+                break
+            conn.executemany(sql, batch)
+        insert_seconds = time.perf_counter() - insert_start
+
+        index_start = time.perf_counter()
+        for name, col in indexes.items():
+            conn.execute(f'CREATE INDEX IF NOT EXISTS "{name}" ON "{table}" ("{col}")')
+    index_seconds = time.perf_counter() - index_start
+
+    elapsed = time.perf_counter() - start
+    metrics = {
+        "table": table,
+        "rows": len(df),
+        "skipped": int(missing_key.sum()),
+        "duplicates": int(repeated.sum()),
+        "prepare_seconds": round(prepare_seconds, 3),
+        "insert_seconds": round(insert_seconds, 3),
+        "index_seconds": round(index_seconds, 3),
+        "total_seconds": round(elapsed, 3),
+        "rows_per_second": round(len(df) / insert_seconds) if insert_seconds else None,
+        "total_rows_per_second": round(len(df) / elapsed) if elapsed else None,
+    }
+    logger.info(f"Loaded {metrics['rows']} rows into {table} in {elapsed:.2f}s ({metrics['rows_per_second']} rows/s insert, "
+                f"{metrics['total_rows_per_second']} rows/s end to end)")
+    return metrics
+
+
+def load_tables(frames, db_path=None):
+    '''Loads a {table: DataFrame} mapping (orders, promotions, marketing, products, users, carts) and returns the metrics for each table.'''
+    conn = connect(db_path)
+    try:
+        return {table: load_table(conn, table, df) for table, df in frames.items()}
+    finally:
+        conn.close()
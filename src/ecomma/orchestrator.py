@@ -0,0 +1,163 @@
+import os
+import json
+import time
+import hashlib
+import logging
+from dataclasses import dataclass, field
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from datetime import datetime
+from ecomma.settings.config import CACHE_DATA
+from ecomma.settings.instrumentation import recorder, submit
+
+logger = logging.getLogger(__name__)
+
+STATE_PATH = CACHE_DATA / "pipeline_state.json"
+
+
+@dataclass
+class Stage:
+
+    '''One node of the pipeline graph.
+    func      - called with no arguments to run the stage
+    deps      - names of stages that must finish first
+    inputs    - (folder, glob pattern) pairs whose files feed the stage
+    config    - JSON-serialisable settings; changing any of them invalidates the stage
+    max_age   - seconds after which the stage reruns even if nothing changed (for external sources such as the API)'''
+
+    name: str
+    func: object
+    deps: tuple = ()
+    inputs: tuple = ()
+    config: dict = field(default_factory=dict)
+    max_age: float = None
+
+
+def input_files(stage):
+    files = []
+    for folder, pattern in stage.inputs:
+        if folder.exists():
+            files.extend(p for p in folder.glob(pattern) if p.is_file())
+    return sorted(files)
+
+
+def fingerprint(stage, dep_fingerprints):
+    '''sha256 over the stage config, the path/size/mtime of every input file and the fingerprints of its dependencies. Only stat calls are made, so checking a stage whose inputs are unchanged costs milliseconds.'''
+    digest = hashlib.sha256(json.dumps(stage.config, sort_keys=True, default=str).encode('utf-8'))
+    for path in input_files(stage):
+        stat = path.stat()
+        digest.update(f"{path}|{stat.st_size}|{stat.st_mtime_ns}".encode('utf-8'))
+    for dep in stage.deps:
+        digest.update(f"{dep}={dep_fingerprints.get(dep)}".encode('utf-8'))
+    return digest.hexdigest()
+
+
+def load_state(state_path):
+    if state_path.exists():
+        with open(state_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    return {}
+
+
+def save_state(state_path, state):
+    state_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = state_path.with_name(state_path.name + ".tmp")
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(state, f, indent=2)
+    os.replace(tmp_path, state_path)
+
+
+def check_graph(stages):
+    '''Raises ValueError on unknown dependencies or cycles; returns the stages by name.'''
+    by_name = {s.name: s for s in stages}
+    for s in stages:
+        missing = [d for d in s.deps if d not in by_name]
+        if missing:
+            raise ValueError(f"Stage {s.name} depends on unknown stage(s) {missing}")
+
+    visiting, done = set(), set()
+
+    def visit(name):
+        if name in done:
+            return
+        if name in visiting:
+            raise ValueError(f"Dependency cycle through stage {name}")
+        visiting.add(name)
+        for dep in by_name[name].deps:
+            visit(dep)
+        visiting.discard(name)
+        done.add(name)
+
+    for name in by_name:
+        visit(name)
+    return by_name
+
+
+def run_pipeline(stages, max_workers=4, force=(), state_path=None):
+
+    '''Runs the stage graph. A stage starts as soon as all its dependencies have finished, so independent stages run side by side on a thread pool. Before running, a stage's fingerprint is compared with the one saved after its last successful run; if it matches (and max_age has not passed), the stage is skipped. Stages named in force (or all, with "all") always run. A failed stage is not recorded, and its dependents are marked blocked. Every stage is timed under its own name, and one run report (LOG_DIR/pipeline_report_<ts>.json) covers the whole run. Returns {stage: status} with status in ran, skipped, failed, blocked.'''
+
+    state_path = state_path or STATE_PATH
+    by_name = check_graph(stages)
+    state = load_state(state_path)
+    force = set(by_name) if "all" in force else set(force)
+
+    status, fingerprints, futures = {}, {}, {}
+    start = time.perf_counter()
+
+    def should_skip(stage, current):
+        previous = state.get(stage.name)
+        if stage.name in force or not previous or previous["fingerprint"] != current:
+            return False
+        if stage.max_age is not None and time.time() - previous["finished"] > stage.max_age:
+            return False
+        return True
+
+    def execute(stage, current):
+        began = time.perf_counter()
+        with recorder.stage(stage.name):
+            stage.func()
+        return current, round(time.perf_counter() - began, 3)
+
+    with recorder.run("pipeline"), ThreadPoolExecutor(max_workers=max_workers) as executor:
+        while len(status) < len(by_name):
+            for stage in by_name.values():
+                if stage.name in status or stage.name in futures.values():
+                    continue
+                dep_status = [status.get(d) for d in stage.deps]
+                if any(s in ("failed", "blocked") for s in dep_status):
+                    status[stage.name] = "blocked"
+                    logger.warning(f"Stage {stage.name}: blocked by a failed dependency")
+                    continue
+                if not all(s in ("ran", "skipped") for s in dep_status):
+                    continue
+
+                current = fingerprint(stage, fingerprints)
+                if should_skip(stage, current):
+                    status[stage.name] = "skipped"
+                    fingerprints[stage.name] = current
+                    logger.info(f"Stage {stage.name}: inputs unchanged, skipped")
+                    continue
+                logger.info(f"Stage {stage.name}: running")
+                futures[submit(executor, execute, stage, current)] = stage.name
+
+            if not futures:
+                continue
+            finished, _ = wait(futures, return_when=FIRST_COMPLETED)
+            for future in finished:
+                name = futures.pop(future)
+                try:
+                    current, seconds = future.result()
+                except Exception as e:
+                    status[name] = "failed"
+                    logger.error(f"Stage {name} failed: {e}", exc_info=True)
+                    continue
+                status[name] = "ran"
+                fingerprints[name] = current
+                state[name] = {"fingerprint": current, "finished": time.time(), "seconds": seconds,
+                               "finished_at": datetime.now().isoformat(timespec='seconds')}
+                save_state(state_path, state)
+                logger.info(f"Stage {name}: done in {seconds:.2f}s")
+
+    counts = {s: list(status.values()).count(s) for s in ("ran", "skipped", "failed", "blocked")}
+    logger.info(f"Pipeline finished in {time.perf_counter() - start:.2f}s: {counts}")
+    return status
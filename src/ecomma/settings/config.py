@@ -1,5 +1,9 @@
-import logging
+import os
 import sys
+import queue
+import atexit
+import logging
+import logging.handlers
 from pathlib import Path
 
 BASE_DIR = Path(__file__).resolve().parents[2]
@@ -8,14 +12,18 @@ RAW_DATA = Path(BASE_DIR) / "data" / "raw"
 PROCESSED_DATA = Path(BASE_DIR) / 'data' / 'processed'
 ARCHIVE_DATA = Path(BASE_DIR) / 'data' / 'archive'
 FINAL_DATA = Path(BASE_DIR) / 'data' / 'final'
+CACHE_DATA = Path(BASE_DIR) / 'data' / 'cache'
+
+FOLDERS = [RAW_DATA, PROCESSED_DATA, ARCHIVE_DATA, FINAL_DATA, CACHE_DATA]
 
-FOLDERS = [RAW_DATA, PROCESSED_DATA, ARCHIVE_DATA, FINAL_DATA]
+DATABASE_PATH = FINAL_DATA / 'ecomma.db'
 
 LOG_DIR = BASE_DIR / 'logs'
 LOG_FILE = LOG_DIR / 'app.log'
 LOG_LEVEL = logging.INFO
 
 def setup_logging():
+    '''Log records are put on a queue by a QueueHandler and written to the file and stdout by a QueueListener thread, so a slow disk or terminal never blocks the code that logs.'''
     LOG_DIR.mkdir(parents=True, exist_ok=True)
     logger = logging.getLogger()
 
@@ -27,7 +35,19 @@ def setup_logging():
         fileHandler.setFormatter(formatter)
         streamHandler.setFormatter(formatter)
 
+        log_queue = queue.SimpleQueue()
+        queueHandler = logging.handlers.QueueHandler(log_queue)
+        listener = logging.handlers.QueueListener(log_queue, fileHandler, streamHandler, respect_handler_level=True)
+        listener.start()
+        atexit.register(listener.stop)
+
+        def log_directly_in_child():
+            # a forked worker has the queue but not the listener thread
+            logger.removeHandler(queueHandler)
+            logger.addHandler(fileHandler)
+            logger.addHandler(streamHandler)
+        os.register_at_fork(after_in_child=log_directly_in_child)
+
         logger.setLevel(LOG_LEVEL)
-        logger.addHandler(fileHandler)
-        logger.addHandler(streamHandler)
+        logger.addHandler(queueHandler)
         
\ No newline at end of file
@@ -0,0 +1,155 @@
+import json
+import time
+import cProfile
+import resource
+import logging
+import threading
+import functools
+import contextvars
+from contextlib import contextmanager
+from datetime import datetime
+from ecomma.settings.config import LOG_DIR
+
+logger = logging.getLogger(__name__)
+
+COUNTERS = ("rows", "bytes", "pages", "retries", "errors")
+
+# names of the stages open in the current context, innermost last
+open_stages = contextvars.ContextVar("open_stages", default=())
+# the enclosing run (the pipeline) that writes the report for everything in the current context, if any
+report_owner = contextvars.ContextVar("report_owner", default=None)
+
+
+def peak_rss_mb():
+    '''Peak resident set size of this process and its finished children, in MB (ru_maxrss is in KB on Linux).'''
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    return round(max(own, children) / 1024, 1)
+
+
+class RunRecorder:
+
+    '''Collects per-stage timings and counters for one process. A stage can run several times (once per resource, say); calls, seconds and counters add up across runs. Safe to use from several threads; work handed to an executor should go through submit() so its counts land in the stage that submitted it.'''
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.profile_stages = set()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.started = datetime.now()
+            self.stages = {}
+
+    def stats(self, name):
+        if name not in self.stages:
+            self.stages[name] = {"calls": 0, "seconds": 0.0, **{c: 0 for c in COUNTERS}, "peak_rss_mb": 0.0}
+        return self.stages[name]
+
+    def count(self, name=None, **counters):
+        '''Adds to the counters of stage name. Without a name, uses the innermost stage open in the current context; outside any stage the counts are dropped.'''
+        stack = open_stages.get()
+        name = name or (stack[-1] if stack else None)
+        if name is None:
+            return
+        with self.lock:
+            stats = self.stats(name)
+            for key, value in counters.items():
+                stats[key] = stats.get(key, 0) + value
+
+    @contextmanager
+    def stage(self, name):
+
+        '''Times the block as stage name and records peak RSS when it ends. If the stage was passed to profile(), it runs under cProfile and the stats are dumped to LOG_DIR/profile_<name>_<ts>.prof.'''
+
+        token = open_stages.set(open_stages.get() + (name,))
+        profiler = cProfile.Profile() if name in self.profile_stages else None
+        if profiler:
+            try:
+                profiler.enable()
+            except ValueError:  # another profiler is already active
+                profiler = None
+        start = time.perf_counter()
+        try:
+            yield
+        except Exception:
+            self.count(name, errors=1)
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            if profiler:
+                profiler.disable()
+                LOG_DIR.mkdir(parents=True, exist_ok=True)
+                profiler.dump_stats(LOG_DIR / f"profile_{name}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.prof")
+            open_stages.reset(token)
+            with self.lock:
+                stats = self.stats(name)
+                stats["calls"] += 1
+                stats["seconds"] = round(stats["seconds"] + elapsed, 4)
+                stats["peak_rss_mb"] = max(stats["peak_rss_mb"], peak_rss_mb())
+
+    def timed(self, name=None):
+        '''Decorator form of stage(); the stage name defaults to the function name.'''
+        def decorator(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.stage(name or func.__name__):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def profile(self, *names):
+        '''Runs the named stages under cProfile from now on.'''
+        self.profile_stages.update(names)
+
+    def report(self):
+        with self.lock:
+            return {
+                "started": self.started.isoformat(timespec="seconds"),
+                "finished": datetime.now().isoformat(timespec="seconds"),
+                "peak_rss_mb": peak_rss_mb(),
+                "stages": {name: dict(stats) for name, stats in self.stages.items()},
+            }
+
+    @contextmanager
+    def run(self, run_name):
+        '''Collects everything done in the block, on any thread it submits work to, into one report written as run_name when the block ends. write_report calls made inside the block by sub-runners such as run_extraction are skipped, so they neither take a share of the counts nor reset the recorder under stages still running.'''
+        self.reset()
+        token = report_owner.set(run_name)
+        try:
+            yield
+        finally:
+            report_owner.reset(token)
+            self.write_report(run_name)
+
+    def write_report(self, run_name="run", reset=True):
+        '''Writes the report to LOG_DIR/<run_name>_report_<ts>.json, logs a one-line summary per stage and returns the path. Inside run() this does nothing and returns None; the enclosing run reports instead.'''
+        owner = report_owner.get()
+        if owner is not None:
+            logger.debug(f"{run_name}: counts go into the {owner} report")
+            return None
+        report = self.report()
+        LOG_DIR.mkdir(parents=True, exist_ok=True)
+        path = LOG_DIR / f"{run_name}_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        for name, stats in report["stages"].items():
+            logger.info(f"{name}: {stats['calls']} call(s), {stats['seconds']:.2f}s, {stats['rows']} rows, "
+                        f"{stats['bytes']} bytes, {stats['pages']} pages, {stats['retries']} retries, {stats['errors']} errors")
+        logger.info(f"Run report written to {path}")
+        if reset:
+            self.reset()
+        return path
+
+
+def submit(executor, func, *args, **kwargs):
+    '''executor.submit() that runs func in a copy of the caller's context, so the worker sees the stages open where the work was submitted.'''
+    return executor.submit(contextvars.copy_context().run, func, *args, **kwargs)
+
+
+recorder = RunRecorder()
+stage = recorder.stage
+timed = recorder.timed
+count = recorder.count
+profile = recorder.profile
+write_report = recorder.write_report
@@ -0,0 +1,169 @@
+import os
+import gzip
+import json
+import time
+import sqlite3
+import hashlib
+import logging
+import numpy as np
+import pandas as pd
+from itertools import islice
+from ecomma.settings.config import RAW_DATA, PROCESSED_DATA
+from ecomma.storage.manifest import pending_files
+
+logger = logging.getLogger(__name__)
+
+DEDUP_DIR = PROCESSED_DATA / "dedup"
+CHUNK_SIZE = 200_000
+
+# dataset -> (snapshot folder under RAW_DATA, natural id column, file format). Generated campaigns and promotions reuse
+# their ids across unrelated rows, so they have none: a row is identified by its content hash, and is either new or unchanged.
+SOURCES = {
+    "products": ("products", "id", "jsonl"),
+    "users": ("users", "id", "jsonl"),
+    "carts": ("carts", "id", "jsonl"),
+    "orders": ("orders", "order_id", "csv"),
+    "promotions": ("promotions", None, "csv"),
+    "marketing": ("marketing", None, "csv"),
+}
+
+
+def connect_index(index_path):
+    '''The hash index is a SQLite table per dataset mapping natural id -> 64-bit content hash and the snapshot holding that version. Lookups go through the table's primary key on disk, so memory does not grow with history.'''
+    index_path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(index_path)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("CREATE TEMP TABLE incoming (key TEXT PRIMARY KEY, hash INTEGER, pos INTEGER)")
+    return conn
+
+
+def ensure_index(conn, dataset):
+    conn.execute(f'CREATE TABLE IF NOT EXISTS "{dataset}" (key TEXT PRIMARY KEY, hash INTEGER NOT NULL, '
+                 f'snapshot TEXT NOT NULL) WITHOUT ROWID')
+
+
+def csv_chunks(path, key_column, chunksize):
+    '''Yields (chunk, keys, hashes) for a CSV snapshot. Rows are hashed column-wise with pandas' vectorized row hash. Without a key_column the hash is the key.'''
+    for chunk in pd.read_csv(path, dtype=str, keep_default_na=False, na_values=[""], chunksize=chunksize):
+        hashes = pd.util.hash_pandas_object(chunk, index=False).to_numpy().view(np.int64)
+        keys = chunk[key_column].to_numpy(dtype=object) if key_column else hashes.astype(str).astype(object)
+        yield chunk, keys, hashes
+
+
+def jsonl_chunks(path, key_column, chunksize):
+    '''Yields (lines, keys, hashes) for a JSONL snapshot (optionally gzipped). Each record is hashed as canonical JSON (sorted keys), so reordered fields do not count as a change.'''
+    opener = gzip.open if path.suffix == ".gz" else open
+    with opener(path, 'rt', encoding='utf-8') as f:
+        while True:
+            lines = [line for line in islice(f, chunksize) if line.strip()]
+            if not lines:
+                return
+            records = [json.loads(line) for line in lines]
+            keys = np.array([r.get(key_column) for r in records], dtype=object)
+            hashes = np.array([
+                int.from_bytes(hashlib.blake2b(json.dumps(r, sort_keys=True).encode('utf-8'), digest_size=8).digest(),
+                               'little', signed=True)
+                for r in records
+            ], dtype=np.int64)
+            yield lines, keys, hashes
+
+
+def classify(conn, dataset, keys, hashes, snapshot):
+
+    '''Compares one chunk with the index and upserts it. Returns (emit mask, counts). The mask marks the rows to write to the delta: new or changed records, and only the last occurrence of an id within the chunk. Runs inside the caller's transaction.'''
+
+    valid = pd.notna(keys) & (keys != "")
+    keys = np.where(valid, keys, None).astype(object)
+    positions = np.flatnonzero(valid)
+    last = pd.Series(positions, index=pd.Index(keys[positions]).astype(str)).groupby(level=0).max()
+
+    conn.execute("DELETE FROM incoming")
+    conn.executemany("INSERT INTO incoming VALUES (?, ?, ?)",
+                     zip(last.index.tolist(), hashes[last.to_numpy()].tolist(), last.to_numpy().tolist()))
+    rows = conn.execute(f'SELECT i.pos, i.hash, d.hash FROM incoming i LEFT JOIN "{dataset}" d ON d.key = i.key').fetchall()
+
+    emit = np.zeros(len(keys), dtype=bool)
+    counts = {"new": 0, "changed": 0, "unchanged": 0}
+    for pos, new_hash, old_hash in rows:
+        if old_hash is None:
+            counts["new"] += 1
+        elif old_hash != new_hash:
+            counts["changed"] += 1
+        else:
+            counts["unchanged"] += 1
+            continue
+        emit[pos] = True
+
+    conn.execute(f'INSERT INTO "{dataset}" (key, hash, snapshot) SELECT key, hash, ? FROM incoming WHERE true '
+                 f'ON CONFLICT(key) DO UPDATE SET hash = excluded.hash, snapshot = excluded.snapshot '
+                 f'WHERE hash != excluded.hash', (snapshot,))
+    counts["duplicates"] = int(valid.sum()) - len(last)
+    counts["skipped"] = int((~valid).sum())
+    return emit, counts
+
+
+def dedup_file(conn, dataset, path, output_dir, chunksize=CHUNK_SIZE):
+
+    '''Runs one snapshot through the index and writes its new and changed records, uncompressed, to <output_dir>/<dataset>/<file name>. Unchanged records and repeats of an id within a chunk are dropped; a repeat in a later chunk of the same file counts as changed and is written after the earlier row, so the last row still wins downstream. The delta is written to a .part file; the index changes are committed only after it has been renamed into place, so an interrupted run leaves both untouched. Returns the counts.'''
+
+    _, key_column, fmt = SOURCES[dataset]
+    target = output_dir / dataset / path.name.removesuffix(".gz")
+    target.parent.mkdir(parents=True, exist_ok=True)
+    part_path = target.with_name(target.name + ".part")
+    totals = {"rows": 0, "new": 0, "changed": 0, "unchanged": 0, "duplicates": 0, "skipped": 0}
+
+    try:
+        with open(part_path, 'w', encoding='utf-8', newline='') as out:
+            chunks = csv_chunks(path, key_column, chunksize) if fmt == "csv" else jsonl_chunks(path, key_column, chunksize)
+            for i, (chunk, keys, hashes) in enumerate(chunks):
+                emit, counts = classify(conn, dataset, keys, hashes, path.name)
+                totals["rows"] += len(keys)
+                for name, value in counts.items():
+                    totals[name] += value
+                if fmt == "csv":
+                    chunk[emit].to_csv(out, header=(i == 0), index=False)
+                else:
+                    out.writelines(line if line.endswith("\n") else line + "\n" for line, e in zip(chunk, emit) if e)
+        os.replace(part_path, target)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        part_path.unlink(missing_ok=True)
+        raise
+    return totals
+
+
+def run_dedup(datasets=None, raw_dir=None, output_dir=None, chunksize=CHUNK_SIZE):
+
+    '''Deduplicates every snapshot not processed yet, oldest first, against the hash index in <output_dir>/index.db. Only the latest version of each record is kept in the index, and each snapshot's delta holds just its new and changed records, so consumers can union the deltas instead of every full snapshot. Logs and returns the new/changed/unchanged counts per dataset, and writes them to <output_dir>/dedup_<ts>.json.'''
+
+    raw_dir = raw_dir or RAW_DATA
+    output_dir = output_dir or DEDUP_DIR
+    conn = connect_index(output_dir / "index.db")
+    report = {}
+    try:
+        for dataset in datasets or SOURCES:
+            folder, _, fmt = SOURCES[dataset]
+            suffixes = (".csv",) if fmt == "csv" else (".jsonl", ".jsonl.gz")
+            manifest, files = pending_files(f"dedup_{dataset}", raw_dir / folder, suffixes, recursive=fmt == "jsonl")
+            ensure_index(conn, dataset)
+            summary = {"files": 0, "rows": 0, "new": 0, "changed": 0, "unchanged": 0, "duplicates": 0, "skipped": 0}
+            start = time.perf_counter()
+            for path in files:
+                for name, value in dedup_file(conn, dataset, path, output_dir, chunksize).items():
+                    summary[name] += value
+                summary["files"] += 1
+                manifest.mark_done(path)
+            summary["elapsed"] = round(time.perf_counter() - start, 3)
+            report[dataset] = summary
+            logger.info(f"Dedup {dataset}: {summary['files']} file(s), {summary['rows']} rows -> {summary['new']} new, "
+                        f"{summary['changed']} changed, {summary['unchanged']} unchanged, "
+                        f"{summary['duplicates']} repeated ids, {summary['skipped']} without id")
+    finally:
+        conn.close()
+
+    report_path = output_dir / f"dedup_{time.strftime('%Y%m%d_%H%M%S')}.json"
+    with open(report_path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    return report
@@ -0,0 +1,94 @@
+import os
+import json
+import shutil
+import hashlib
+import logging
+from datetime import datetime
+from pathlib import Path
+from ecomma.settings.config import PROCESSED_DATA, ARCHIVE_DATA, RAW_DATA
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_DIR = PROCESSED_DATA / "manifests"
+
+
+def file_hash(path, chunk_size=1024 * 1024):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def scan_files(folder, suffixes=(".csv", ".jsonl", ".gz"), recursive=False):
+    '''Lists the data files directly inside folder with os.scandir, which is cheaper than sorting a full glob. With recursive=True subfolders are walked too, for partitioned datasets.'''
+    if not folder.exists():
+        return []
+    if recursive:
+        return [Path(root) / name for root, _, names in os.walk(folder) for name in names if name.endswith(suffixes)]
+    with os.scandir(folder) as entries:
+        return [Path(e.path) for e in entries if e.is_file() and e.name.endswith(suffixes)]
+
+
+class Manifest:
+
+    '''Records which input files a stage has already processed: path, size, mtime and sha256. A file whose path, size and mtime are unchanged is skipped without hashing. A file with a new path is hashed, and skipped too if the same content was already processed under another name. This makes reruns no-ops.'''
+
+    def __init__(self, stage, manifest_dir=None):
+        self.stage = stage
+        self.path = (manifest_dir or MANIFEST_DIR) / f"{stage}.json"
+        self.entries = {}
+        if self.path.exists():
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self.entries = json.load(f)
+        self.hashes = {entry["sha256"] for entry in self.entries.values()}
+
+    def is_processed(self, path):
+        stat = path.stat()
+        entry = self.entries.get(str(path))
+        if entry and entry["size"] == stat.st_size and entry["mtime"] == stat.st_mtime:
+            return True
+        return file_hash(path) in self.hashes
+
+    def new_files(self, paths):
+        '''Returns the paths not processed yet, oldest name first. Names carry the timestamp, so files from subfolders (incremental deltas/, partitions) are ordered by name before path.'''
+        return sorted((p for p in paths if not self.is_processed(p)), key=lambda p: (p.name, str(p)))
+
+    def mark_done(self, path, archive=False):
+        '''Records path as processed. With archive=True the file is moved from RAW_DATA into the same relative place under ARCHIVE_DATA.'''
+        stat = path.stat()
+        entry = {
+            "size": stat.st_size,
+            "mtime": stat.st_mtime,
+            "sha256": file_hash(path),
+            "processed_at": datetime.now().isoformat(timespec='seconds'),
+        }
+
+        if archive:
+            try:
+                target = ARCHIVE_DATA / path.relative_to(RAW_DATA)
+            except ValueError:
+                target = ARCHIVE_DATA / path.name
+            target.parent.mkdir(parents=True, exist_ok=True)
+            shutil.move(str(path), target)
+            entry["archived_to"] = str(target)
+            logger.info(f"Archived {path} to {target}")
+
+        self.entries[str(path)] = entry
+        self.hashes.add(entry["sha256"])
+        self.save()
+
+    def save(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.entries, f)
+        os.replace(tmp_path, self.path)
+
+
+def pending_files(stage, folder, suffixes=(".csv", ".jsonl", ".gz"), recursive=False):
+    '''Returns (manifest, new files in folder) for a stage, ready to process and mark_done one by one.'''
+    manifest = Manifest(stage)
+    files = manifest.new_files(scan_files(folder, suffixes, recursive))
+    logger.info(f"{stage}: {len(files)} new file(s) in {folder}")
+    return manifest, files
@@ -0,0 +1,109 @@
+import uuid
+import logging
+from itertools import chain
+from datetime import date
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.json as pj
+from ecomma.transform.dates import default_parser
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_COMPRESSION = "zstd"
+UNKNOWN_PARTITION = "unknown"
+
+def hive_partitioning(partition_col):
+    return ds.partitioning(pa.schema([(partition_col, pa.string())]), flavor="hive")
+
+def partition_values(series, date_format=None, dayfirst=False):
+    '''Turns a date/datetime column into YYYY-MM-DD partition keys. Already parsed datetime columns are used as they are. Without a date_format, the shared DateParser parses each distinct value once using the dayfirst convention, so messy mixed-format columns stay cheap. Values that cannot be parsed go to the "unknown" partition.'''
+    if pd.api.types.is_datetime64_any_dtype(series):
+        parsed = series
+    elif date_format:
+        parsed = pd.to_datetime(series, format=date_format, errors="coerce")
+    else:
+        parsed = default_parser.parse(series, dayfirst)
+    return parsed.dt.strftime("%Y-%m-%d").fillna(UNKNOWN_PARTITION)
+
+def write_table(data, dataset_dir, partition_col, compression=DEFAULT_COMPRESSION, schema=None, basename=None,
+                replace=False):
+    '''Writes an Arrow table, or an iterable of record batches sharing schema, to a hive-partitioned Parquet dataset in one write. Files are named <basename>-<i>.parquet, with a fresh unique basename by default, so earlier runs are kept next to the new data. A fixed basename makes rewriting the same source overwrite its own files. With replace=True every partition the data touches is emptied first (pyarrow's "delete_matching"), so a re-extracted source replaces that day's rows instead of duplicating them.'''
+    ds.write_dataset(
+        data,
+        dataset_dir,
+        schema=schema,
+        format="parquet",
+        partitioning=hive_partitioning(partition_col),
+        basename_template=f"{basename or 'part-' + uuid.uuid4().hex}-{{i}}.parquet",
+        existing_data_behavior="delete_matching" if replace else "overwrite_or_ignore",
+        file_options=ds.ParquetFileFormat().make_write_options(compression=compression),
+    )
+
+def with_partition(df, partition_col, date_column=None, date_format=None, dayfirst=False):
+    '''Adds the <partition_col> key column: the YYYY-MM-DD day of date_column, or today's date if there is none.'''
+    if date_column is not None:
+        keys = partition_values(df[date_column], date_format, dayfirst)
+    else:
+        keys = date.today().isoformat()
+    return df.assign(**{partition_col: keys})
+
+def write_partitioned(df, dataset_dir, partition_col, date_column=None, date_format=None, dayfirst=False,
+                      compression=DEFAULT_COMPRESSION, basename=None, replace=False):
+    '''Writes a DataFrame partitioned by date as <partition_col>=YYYY-MM-DD. The key comes from date_column, or today's date if there is none.'''
+    table = pa.Table.from_pandas(with_partition(df, partition_col, date_column, date_format, dayfirst), preserve_index=False)
+    write_table(table, dataset_dir, partition_col, compression, basename=basename, replace=replace)
+    return table.num_rows
+
+def write_frames(frames, dataset_dir, partition_col, date_column=None, date_format=None, dayfirst=False,
+                 compression=DEFAULT_COMPRESSION, basename=None, replace=False):
+    '''Chunked counterpart of write_partitioned: streams an iterable of DataFrames with the same columns into the dataset as a single write, so replace=True clears each partition once rather than once per chunk. The first chunk fixes the schema. Returns the number of rows written.'''
+    frames = iter(frames)
+    first = next(frames, None)
+    if first is None:
+        return 0
+    schema = pa.Schema.from_pandas(with_partition(first, partition_col, date_column, date_format, dayfirst), preserve_index=False)
+    rows = 0
+
+    def batches():
+        nonlocal rows
+        for df in chain([first], frames):
+            rows += len(df)
+            yield pa.RecordBatch.from_pandas(with_partition(df, partition_col, date_column, date_format, dayfirst),
+                                             schema=schema, preserve_index=False)
+
+    write_table(batches(), dataset_dir, partition_col, compression, schema=schema, basename=basename, replace=replace)
+    return rows
+
+def csv_to_parquet(csv_path, dataset_dir, partition_col, date_column=None, date_format=None, dayfirst=False,
+                   chunksize=500000):
+    '''Streams a raw CSV into a partitioned Parquet dataset chunk by chunk. All columns are kept as strings so the raw messiness survives as-is; only empty cells become nulls. Files are named after the CSV, so converting the same CSV again overwrites its own files.'''
+    chunks = pd.read_csv(csv_path, dtype=str, keep_default_na=False, na_values=[""], chunksize=chunksize)
+    rows = write_frames(chunks, dataset_dir, partition_col, date_column, date_format, dayfirst, basename=csv_path.stem)
+    logger.info(f"Wrote {rows} rows from {csv_path} to {dataset_dir}")
+    return rows
+
+def jsonl_to_parquet(jsonl_path, dataset_dir, partition_col="extract_date", compression=DEFAULT_COMPRESSION, replace=False):
+    '''Converts an API JSONL snapshot (optionally gzipped) into Parquet, partitioned by extraction date. Nested objects are kept as Arrow structs and lists. With replace=True the snapshot replaces whatever was extracted earlier the same day.'''
+    table = pj.read_json(pa.input_stream(str(jsonl_path), compression="detect"))
+    table = table.append_column(partition_col, pa.array([date.today().isoformat()] * table.num_rows, pa.string()))
+    write_table(table, dataset_dir, partition_col, compression, replace=replace)
+    rows = table.num_rows
+    logger.info(f"Wrote {rows} records from {jsonl_path} to {dataset_dir}")
+    return rows
+
+def read_dataset(dataset_dir, partition_col, columns=None, start=None, end=None, filter=None):
+    '''Reads a partitioned dataset back into pandas. columns limits which columns are read, and start/end (YYYY-MM-DD, inclusive) prune partitions before any file is opened. Rows in the unknown partition have no date, so a start or end always leaves them out. filter takes an extra pyarrow expression.'''
+    dataset = ds.dataset(dataset_dir, format="parquet", partitioning=hive_partitioning(partition_col))
+
+    expr = filter
+    if start is not None or end is not None:
+        # "unknown" sorts after every date string, so it would otherwise pass any start bound
+        known = ds.field(partition_col) != UNKNOWN_PARTITION
+        expr = known if expr is None else expr & known
+    if start is not None:
+        expr = (ds.field(partition_col) >= start) if expr is None else expr & (ds.field(partition_col) >= start)
+    if end is not None:
+        expr = (ds.field(partition_col) <= end) if expr is None else expr & (ds.field(partition_col) <= end)
+
+    return dataset.to_table(columns=columns, filter=expr).to_pandas()
@@ -0,0 +1,125 @@
+import logging
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# canonical value -> spellings seen in the raw data besides case/whitespace variants.
+# Editing these tables is how new aliases are added; the canonical order fixes the integer codes.
+ALIASES = {
+    "channel": {
+        "Google Ads": ["Goggle Ads"],
+        "Facebook": [],
+        "Instagram": ["Insta"],
+        "TikTok": ["Tik Tok"],
+        "Email": [],
+        "Influencer": [],
+    },
+    "region": {
+        "North America": ["NA"],
+        "Europe": ["EU"],
+        "Asia Pacific": ["APAC"],
+        "Latin America": ["Latam"],
+    },
+    "order_status": {
+        "COMPLETED": [],
+        "PENDING": [],
+        "SHIPPED": [],
+        "CANCELLED": [],
+        "RETURNED": [],
+    },
+    "promo_status": {
+        "active": [],
+        "expired": ["Expire"],
+        "scheduled": [],
+        "paused": [],
+    },
+    "category": {
+        "Electronics": [],
+        "Clothing": [],
+        "Home & Garden": [],
+        "Beauty": [],
+        "Sports": [],
+        "Books": [],
+        "Toys": [],
+    },
+    "payment_method": {
+        "Credit Card": [],
+        "PayPal": [],
+        "Debit Card": [],
+        "Apple Pay": [],
+    },
+    "promo_type": {
+        "percentage_off": [],
+        "fixed_amount": [],
+        "bogo": [],
+        "free_shipping": [],
+        "bundle_deal": [],
+    },
+    "campaign_type": {
+        "Summer_Sale": [],
+        "Black_Friday": [],
+        "New_User_Promo": [],
+        "Retargeting": [],
+        "Brand_Awareness": [],
+    },
+}
+
+# column -> alias table name; "promo_code" has no fixed table and is upper-cased instead
+CATEGORICAL_COLUMNS = {
+    "orders": {"status": "order_status", "payment_method": "payment_method", "promo_code_used": "promo_code"},
+    "marketing": {"Channel": "channel", "Target_Region": "region", "Campaign_Type": "campaign_type",
+                  "Promo_Code_Linked": "promo_code"},
+    "promotions": {"Promo_Code": "promo_code", "Promo_Type": "promo_type", "Category": "category",
+                   "Status": "promo_status"},
+}
+
+
+def alias_key(value):
+    return " ".join(str(value).split()).casefold()
+
+
+def build_lookup(table):
+    '''Flattens {canonical: [aliases]} into {normalized spelling: canonical}.'''
+    lookup = {}
+    for canonical, aliases in table.items():
+        for spelling in [canonical] + aliases:
+            lookup[alias_key(spelling)] = canonical
+    return lookup
+
+
+def normalize_promo_code(value):
+    code = "".join(str(value).split()).upper()
+    return code or None
+
+
+def canonicalize(values, table_name, aliases=ALIASES):
+
+    '''Maps a messy column onto canonical values and returns a pandas Categorical. Each distinct raw value is looked up once, and the rows are remapped through their factorize codes. Tables with a fixed category list keep the same integer codes in every file. Values missing from the alias table become NaN and are logged.'''
+
+    s = pd.Series(values)
+    codes, uniques = pd.factorize(s)
+
+    if table_name == "promo_code":
+        mapped = [normalize_promo_code(u) for u in uniques]
+        categories = sorted({m for m in mapped if m})
+    else:
+        lookup = build_lookup(aliases[table_name])
+        mapped = [lookup.get(alias_key(u)) for u in uniques]
+        categories = list(aliases[table_name])
+        unknown = [u for u, m in zip(uniques, mapped) if m is None and alias_key(u)]
+        if unknown:
+            logger.warning(f"{table_name}: {len(unknown)} unrecognised values, e.g. {unknown[:5]}")
+
+    position = {c: i for i, c in enumerate(categories)}
+    unique_codes = np.array([position.get(m, -1) for m in mapped] + [-1], dtype=np.int32)
+    return pd.Categorical.from_codes(unique_codes[codes], categories=categories)
+
+
+def canonicalize_columns(df, dataset, aliases=ALIASES):
+    '''Replaces the dataset's categorical columns with canonical pandas Categoricals. Use .cat.codes for the integer codes.'''
+    df = df.copy()
+    for col, table_name in CATEGORICAL_COLUMNS[dataset].items():
+        if col in df.columns:
+            df[col] = canonicalize(df[col], table_name, aliases)
+    return df
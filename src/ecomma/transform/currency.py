@@ -0,0 +1,88 @@
+import time
+import logging
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+logger = logging.getLogger(__name__)
+
+# Columns holding money in mixed forms ("$123.4", "123.4 USD", "20%", plain numbers, blanks)
+AMOUNT_COLUMNS = {
+    "orders": ["total_amount", "subtotal_before_discount", "discount_applied", "product_cost"],
+    "marketing": ["Budget_Spend"],
+    "promotions": ["Discount_Value", "Min_Purchase"],
+}
+
+# Characters trimmed from either end of a value; none of them can end a number
+CURRENCY_NOISE = " $%USD"
+NUMBER_PATTERN = r"^[+-]?(\d+\.?\d*|\.\d+)([eE][+-]?\d+)?$"
+
+def parse_amounts(values):
+
+    '''Parses a column of mixed money values with a handful of Arrow compute passes instead of a row-wise apply. The column is cast to an Arrow string array once. Whitespace, "$", "USD", "%" and thousands separators are then stripped with Arrow compute kernels, and the whole column is cast to float64. Only if that cast fails is a regex used to find the bad values. Returns a DataFrame on the same index with:
+    amount  - float64 absolute amount (NaN for blanks, percentages and failures)
+    percent - float64 percentage for values like "20%" (NaN otherwise)
+    failed  - True where a non-blank value could not be parsed'''
+
+    s = pd.Series(values)
+    text = pa.array(s.astype("string[pyarrow]"), type=pa.string())
+
+    trimmed = pc.utf8_trim_whitespace(text)
+    is_percent = pc.fill_null(pc.ends_with(trimmed, "%"), False)
+    blank = pc.fill_null(pc.equal(trimmed, ""), True)
+    cleaned = pc.replace_substring(pc.utf8_trim(trimmed, characters=CURRENCY_NOISE), ",", "")
+
+    try:
+        numbers = pc.cast(pc.if_else(blank, pa.scalar(None, pa.string()), cleaned), pa.float64())
+        valid = pc.invert(blank)
+    except pa.ArrowInvalid:
+        valid = pc.fill_null(pc.match_substring_regex(cleaned, NUMBER_PATTERN), False)
+        numbers = pc.cast(pc.if_else(valid, cleaned, pa.scalar(None, pa.string())), pa.float64())
+
+    amount = pc.if_else(is_percent, pa.scalar(None, pa.float64()), numbers)
+    percent = pc.if_else(is_percent, numbers, pa.scalar(None, pa.float64()))
+    failed = pc.and_(pc.invert(valid), pc.invert(blank))
+
+    return pd.DataFrame({
+        "amount": amount.to_numpy(zero_copy_only=False),
+        "percent": percent.to_numpy(zero_copy_only=False),
+        "failed": failed.to_numpy(zero_copy_only=False),
+    }, index=s.index)
+
+def normalize_amounts(df, columns):
+    '''Replaces each money column with its float64 amount. Adds <col>_pct where any percentages were found, and <col>_parse_failed as the failure mask.'''
+    df = df.copy()
+    for col in columns:
+        parsed = parse_amounts(df[col])
+        df[col] = parsed["amount"]
+        if parsed["percent"].notna().any():
+            df[f"{col}_pct"] = parsed["percent"]
+        df[f"{col}_parse_failed"] = parsed["failed"]
+        if parsed["failed"].any():
+            logger.warning(f"{col}: {int(parsed['failed'].sum())} values could not be parsed")
+    return df
+
+def benchmark(n=10_000_000, seed=0):
+    '''Times parse_amounts on n raw strings (as read from the CSVs with dtype=str), mixed the way the generators mix them.'''
+    rng = np.random.default_rng(seed)
+    values = np.round(rng.uniform(1, 50000, n), 2).astype(str).astype(object)
+    roll = rng.random(n)
+    dollar = roll < 0.30
+    usd = (roll >= 0.30) & (roll < 0.50)
+    values[dollar] = "$" + values[dollar]
+    values[usd] = values[usd] + " USD"
+    values[(roll >= 0.50) & (roll < 0.55)] = "20%"
+    values[(roll >= 0.55) & (roll < 0.60)] = None
+    values = pd.Series(values, dtype="string[pyarrow]")
+
+    start = time.perf_counter()
+    parsed = parse_amounts(values)
+    elapsed = time.perf_counter() - start
+    logger.info(f"parse_amounts: {n} values in {elapsed:.2f}s ({n / elapsed:,.0f} values/s), {int(parsed['failed'].sum())} failures")
+    return elapsed
+
+if __name__ == "__main__":
+    from ecomma.settings.config import setup_logging
+    setup_logging()
+    benchmark()
@@ -0,0 +1,114 @@
+import re
+import logging
+import threading
+import numpy as np
+import pandas as pd
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+# Day/month order used by each generator for ambiguous NN/NN/YYYY values
+DAYFIRST = {
+    "orders": False,
+    "marketing": True,     # format_campaign_dates writes %d/%m/%Y
+    "promotions": False,   # format_promo_dates writes %m/%d/%Y
+}
+
+DATE_COLUMNS = {
+    "orders": ["order_date", "delivery_date"],
+    "marketing": ["Start_Date", "End_Date"],
+    "promotions": ["Start_Date", "End_Date"],
+}
+
+# (shape, strptime format); slash dates are handled separately because they can be ambiguous
+DATE_SHAPES = [
+    (re.compile(r"^\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}$"), "%Y-%m-%d %H:%M:%S"),
+    (re.compile(r"^\d{4}-\d{2}-\d{2}$"), "%Y-%m-%d"),
+    (re.compile(r"^[A-Za-z]{3} \d{1,2}, \d{4}$"), "%b %d, %Y"),
+    (re.compile(r"^\d{1,2}-[A-Za-z]{3}-\d{4}$"), "%d-%b-%Y"),
+]
+SLASH_SHAPE = re.compile(r"^(\d{1,2})/(\d{1,2})/(\d{4})$")
+
+# above this many distinct values a column is parsed in bulk rather than value by value
+FAST_PATH_MIN_UNIQUES = 5000
+
+
+def detect_format(value, dayfirst=False):
+    '''Picks the strptime format for one string from its shape. For NN/NN/YYYY, a part above 12 settles the order; otherwise the dataset's dayfirst convention decides.'''
+    for shape, fmt in DATE_SHAPES:
+        if shape.match(value):
+            return fmt
+
+    slash = SLASH_SHAPE.match(value)
+    if slash:
+        first, second = int(slash.group(1)), int(slash.group(2))
+        if first > 12:
+            return "%d/%m/%Y"
+        if second > 12:
+            return "%m/%d/%Y"
+        return "%d/%m/%Y" if dayfirst else "%m/%d/%Y"
+    return None
+
+
+class DateParser:
+
+    '''Parses date columns one distinct string at a time. The cache lives on the instance, so one parser shared by a whole run parses each (value, dayfirst) pair once across every file.'''
+
+    def __init__(self):
+        self.cache = {}
+        self.lock = threading.Lock()
+        self.parsed = 0
+        self.failures = 0
+
+    def parse_value(self, value, dayfirst=False):
+        key = (value, dayfirst)
+        if key in self.cache:
+            return self.cache[key]
+
+        text = str(value).strip()
+        fmt = detect_format(text, dayfirst)
+        try:
+            result = np.datetime64(datetime.strptime(text, fmt), "ns") if fmt else np.datetime64("NaT", "ns")
+        except ValueError:
+            result = np.datetime64("NaT", "ns")
+
+        with self.lock:
+            self.cache[key] = result
+            self.parsed += 1
+            self.failures += np.isnat(result)
+        return result
+
+    def parse(self, values, dayfirst=False):
+        '''Returns a datetime64[ns] Series for values. Blanks and unrecognised strings become NaT.'''
+        s = pd.Series(values)
+        codes, uniques = pd.factorize(s)
+        if len(uniques) > FAST_PATH_MIN_UNIQUES:
+            parsed_uniques = self.parse_uniform(uniques, dayfirst)
+        else:
+            parsed_uniques = [self.parse_value(u, dayfirst) for u in uniques]
+        parsed = np.array(list(parsed_uniques) + [np.datetime64("NaT", "ns")], dtype="datetime64[ns]")
+        return pd.Series(parsed[codes], index=s.index)
+
+    def parse_uniform(self, uniques, dayfirst=False):
+        '''For high-cardinality columns such as order timestamps, caching single values is not worth it. The first value's unambiguous format is applied to all of them in one pd.to_datetime call, and only the values that do not fit fall back to parse_value.'''
+        fmt = detect_format(str(uniques[0]).strip(), dayfirst)
+        if fmt is None or "/" in fmt:
+            return [self.parse_value(u, dayfirst) for u in uniques]
+
+        parsed = pd.to_datetime(pd.Series(uniques).astype(str).str.strip(), format=fmt, errors="coerce").to_numpy("datetime64[ns]")
+        for i in np.flatnonzero(np.isnat(parsed)):
+            parsed[i] = self.parse_value(uniques[i], dayfirst)
+        return parsed
+
+
+default_parser = DateParser()
+
+
+def normalize_dates(df, dataset, parser=None):
+    '''Replaces the dataset's date columns with parsed datetimes, using its day/month convention.'''
+    parser = parser or default_parser
+    df = df.copy()
+    for col in DATE_COLUMNS[dataset]:
+        if col in df.columns:
+            df[col] = parser.parse(df[col], DAYFIRST[dataset])
+    return df
@@ -0,0 +1,59 @@
+import logging
+import pandas as pd
+from ecomma.settings.config import RAW_DATA, PROCESSED_DATA
+from ecomma.storage.manifest import pending_files
+from ecomma.storage.parquet_store import write_partitioned
+from ecomma.transform.currency import AMOUNT_COLUMNS, normalize_amounts
+from ecomma.transform.dates import normalize_dates
+from ecomma.transform.categories import canonicalize_columns
+
+logger = logging.getLogger(__name__)
+
+# dataset -> folder under RAW_DATA holding its generated CSVs
+SOURCES = {
+    "orders": "orders",
+    "marketing": "marketing",
+    "promotions": "promotions",
+}
+
+# Campaign_ID and Promo_ID are drawn from a few thousand values, so they repeat across rows and runs. These datasets get a
+# record_id of <raw file stem>:<row> instead, which stays the same when the same file is transformed again.
+RECORD_ID_DATASETS = ("marketing", "promotions")
+
+# dataset -> (partition column, parsed date column it is derived from)
+PARTITIONS = {
+    "orders": ("order_day", "order_date"),
+    "marketing": ("start_date", "Start_Date"),
+    "promotions": ("start_date", "Start_Date"),
+}
+
+
+def transform_file(path, dataset):
+    '''Reads one raw CSV as text and returns it with parsed money and date columns and canonical categoricals, plus record_id for RECORD_ID_DATASETS.'''
+    df = pd.read_csv(path, dtype=str, keep_default_na=False, na_values=[""])
+    if dataset in RECORD_ID_DATASETS:
+        df.insert(0, "record_id", f"{path.stem}:" + pd.Series(range(len(df)), index=df.index).astype(str))
+    df = normalize_amounts(df, AMOUNT_COLUMNS[dataset])
+    df = normalize_dates(df, dataset)
+    return canonicalize_columns(df, dataset)
+
+
+def run_transform(datasets=None, output_dir=None):
+
+    '''Transforms every raw CSV not yet processed into the partitioned Parquet dataset PROCESSED_DATA/<dataset>/<partition>=YYYY-MM-DD/. Each file's rows are written as <file stem>-<i>.parquet, so transforming the same raw file again overwrites its own output instead of duplicating it. The per-dataset manifest makes a rerun with no new files a no-op. Returns {dataset: [transformed raw paths]}.'''
+
+    output_dir = output_dir or PROCESSED_DATA
+    written = {}
+    for dataset in datasets or SOURCES:
+        manifest, files = pending_files(f"transform_{dataset}", RAW_DATA / SOURCES[dataset], suffixes=(".csv",))
+        partition_col, date_column = PARTITIONS[dataset]
+        target_dir = output_dir / dataset
+        written[dataset] = []
+
+        for path in files:
+            df = transform_file(path, dataset)
+            write_partitioned(df, target_dir, partition_col, date_column, basename=path.stem)
+            manifest.mark_done(path)
+            written[dataset].append(path)
+            logger.info(f"Transformed {len(df)} {dataset} rows from {path.name} to {target_dir}")
+    return written
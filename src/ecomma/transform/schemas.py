@@ -0,0 +1,159 @@
+import numpy as np
+import pandas as pd
+import pandera.pandas as pa
+from ecomma.transform.categories import ALIASES, alias_key, build_lookup
+
+# The CSV schemas describe a file after normalize_amounts/normalize_dates: money columns are
+# float64 and date columns datetime64. Categorical columns are still raw text, and they are
+# checked against the alias tables, so a typo the tables already know about is not a failure.
+
+
+def known_alias(table_name):
+    '''Check that every non-null value maps onto the named alias table. Each distinct value is looked up only once.'''
+    lookup = build_lookup(ALIASES[table_name])
+
+    def check(series):
+        codes, uniques = pd.factorize(series)
+        ok = np.array([alias_key(u) in lookup for u in uniques] + [True])
+        return pd.Series(ok[codes], index=series.index)
+
+    return pa.Check(check, name=f"known_{table_name}")
+
+
+def parsed(column):
+    '''The <column>_parse_failed flag written by normalize_amounts must be False.'''
+    return {f"{column}_parse_failed": pa.Column(bool, pa.Check(lambda s: ~s, name="parseable"), required=False)}
+
+
+def amount(**kwargs):
+    return pa.Column(float, pa.Check.ge(0), nullable=True, **kwargs)
+
+
+def not_before(later, earlier):
+    '''Dataframe-wide check that the later date column is not before the earlier one, ignoring missing dates.'''
+    return pa.Check(lambda df: ~(df[later] < df[earlier]), name=f"{later}>={earlier}")
+
+
+ORDERS_SCHEMA = pa.DataFrameSchema(
+    {
+        "order_id": pa.Column("Int64", pa.Check.ge(0)),
+        "user_id": pa.Column("Int64", pa.Check.ge(1), nullable=True),
+        "order_date": pa.Column("datetime64[ns]"),
+        "status": pa.Column(checks=known_alias("order_status"), nullable=True),
+        "total_amount": amount(),
+        "subtotal_before_discount": amount(),
+        "discount_applied": amount(),
+        "promo_code_used": pa.Column(str, pa.Check.str_matches(r"^\s*\w+\s*$"), nullable=True),
+        "product_cost": amount(),
+        "payment_method": pa.Column(checks=known_alias("payment_method"), nullable=True),
+        "shipping_address": pa.Column(str, nullable=True),
+        "delivery_date": pa.Column("datetime64[ns]", nullable=True),
+        **parsed("total_amount"),
+        **parsed("subtotal_before_discount"),
+        **parsed("discount_applied"),
+        **parsed("product_cost"),
+    },
+    checks=[
+        not_before("delivery_date", "order_date"),
+        pa.Check(lambda df: ~(df["total_amount"] > df["subtotal_before_discount"]), name="total<=subtotal"),
+    ],
+    coerce=True,
+    name="orders",
+)
+
+MARKETING_SCHEMA = pa.DataFrameSchema(
+    {
+        "Campaign_ID": pa.Column(str, pa.Check.str_matches(r"^CMP-\d+$"), nullable=True),
+        "Channel": pa.Column(checks=known_alias("channel"), nullable=True),
+        "Target_Region": pa.Column(checks=known_alias("region"), nullable=True),
+        "Start_Date": pa.Column("datetime64[ns]", nullable=True),
+        "End_Date": pa.Column("datetime64[ns]", nullable=True),
+        "Budget_Spend": amount(),
+        "Impressions": pa.Column(float, pa.Check.ge(0), nullable=True),
+        "Clicks": pa.Column(float, pa.Check.ge(0), nullable=True),
+        "Campaign_Type": pa.Column(checks=known_alias("campaign_type"), nullable=True),
+        "Promo_Code_Linked": pa.Column(str, nullable=True),
+        **parsed("Budget_Spend"),
+    },
+    checks=[
+        not_before("End_Date", "Start_Date"),
+        pa.Check(lambda df: ~(df["Clicks"] > df["Impressions"]), name="clicks<=impressions"),
+    ],
+    coerce=True,
+    name="marketing",
+)
+
+PROMOTIONS_SCHEMA = pa.DataFrameSchema(
+    {
+        "Promo_ID": pa.Column(str, pa.Check.str_matches(r"^PR-\d+$"), nullable=True),
+        "Promo_Code": pa.Column(str, nullable=True),
+        "Promo_Type": pa.Column(checks=known_alias("promo_type"), nullable=True),
+        "Discount_Value": amount(),
+        "Category": pa.Column(checks=known_alias("category"), nullable=True),
+        "Start_Date": pa.Column("datetime64[ns]", nullable=True),
+        "End_Date": pa.Column("datetime64[ns]", nullable=True),
+        "Min_Purchase": amount(),
+        "Usage_Limit": pa.Column(float, pa.Check.ge(1), nullable=True),
+        "Times_Used": pa.Column(float, pa.Check.ge(0), nullable=True),
+        "Status": pa.Column(checks=known_alias("promo_status"), nullable=True),
+        **parsed("Discount_Value"),
+        **parsed("Min_Purchase"),
+    },
+    checks=[
+        not_before("End_Date", "Start_Date"),
+        pa.Check(lambda df: ~(df["Times_Used"] > df["Usage_Limit"]), name="used<=limit"),
+    ],
+    coerce=True,
+    name="promotions",
+)
+
+# API entities as written by extract_to_jsonl, one item per line; nested fields are left unchecked
+PRODUCTS_SCHEMA = pa.DataFrameSchema(
+    {
+        "id": pa.Column(int, pa.Check.ge(1)),
+        "title": pa.Column(str),
+        "category": pa.Column(str, nullable=True),
+        "price": pa.Column(float, pa.Check.ge(0)),
+        "discountPercentage": pa.Column(float, pa.Check.in_range(0, 100), nullable=True),
+        "rating": pa.Column(float, pa.Check.in_range(0, 5), nullable=True),
+        "stock": pa.Column(int, pa.Check.ge(0), nullable=True),
+    },
+    coerce=True,
+    name="products",
+)
+
+USERS_SCHEMA = pa.DataFrameSchema(
+    {
+        "id": pa.Column(int, pa.Check.ge(1)),
+        "firstName": pa.Column(str),
+        "lastName": pa.Column(str),
+        "age": pa.Column(int, pa.Check.in_range(0, 120), nullable=True),
+        "gender": pa.Column(str, pa.Check.isin(["male", "female"]), nullable=True),
+        "email": pa.Column(str, pa.Check.str_matches(r"^[^@\s]+@[^@\s]+$"), nullable=True),
+    },
+    coerce=True,
+    name="users",
+)
+
+CARTS_SCHEMA = pa.DataFrameSchema(
+    {
+        "id": pa.Column(int, pa.Check.ge(1)),
+        "userId": pa.Column(int, pa.Check.ge(1)),
+        "total": pa.Column(float, pa.Check.ge(0)),
+        "discountedTotal": pa.Column(float, pa.Check.ge(0)),
+        "totalProducts": pa.Column(int, pa.Check.ge(0)),
+        "totalQuantity": pa.Column(int, pa.Check.ge(0)),
+    },
+    checks=[pa.Check(lambda df: ~(df["discountedTotal"] > df["total"]), name="discounted<=total")],
+    coerce=True,
+    name="carts",
+)
+
+SCHEMAS = {
+    "orders": ORDERS_SCHEMA,
+    "marketing": MARKETING_SCHEMA,
+    "promotions": PROMOTIONS_SCHEMA,
+    "products": PRODUCTS_SCHEMA,
+    "users": USERS_SCHEMA,
+    "carts": CARTS_SCHEMA,
+}
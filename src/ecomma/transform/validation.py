@@ -0,0 +1,116 @@
+import time
+import json
+import logging
+import numpy as np
+import pandas as pd
+from collections import Counter
+from pandera.errors import SchemaErrors
+from ecomma.settings.config import RAW_DATA, PROCESSED_DATA
+from ecomma.transform.currency import AMOUNT_COLUMNS, normalize_amounts
+from ecomma.transform.dates import normalize_dates
+from ecomma.transform.schemas import SCHEMAS
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHUNK_SIZE = 200_000
+REPORT_DIR = PROCESSED_DATA / "validation"
+
+# dataset -> folder under RAW_DATA and file pattern
+SOURCES = {
+    "orders": ("orders", "*.csv"),
+    "marketing": ("marketing", "*.csv"),
+    "promotions": ("promotions", "*.csv"),
+    "products": ("products", "*.jsonl*"),
+    "users": ("users", "*.jsonl*"),
+    "carts": ("carts", "*.jsonl*"),
+}
+
+
+def prepare(df, dataset):
+    '''Brings a raw chunk into the shape the schema describes (parsed money and date columns).'''
+    if dataset in AMOUNT_COLUMNS:
+        df = normalize_amounts(df, [c for c in AMOUNT_COLUMNS[dataset] if c in df.columns])
+        df = normalize_dates(df, dataset)
+    return df
+
+
+def count_failures(df, schema):
+
+    '''Validates df lazily and returns a Counter of (column, check) -> failing rows. The failure-case frame pandera builds is reduced to counts straight away, so memory stays bounded by one chunk. Dataframe-wide checks are counted once per failing row under the column name "*".'''
+
+    try:
+        schema.validate(df, lazy=True)
+    except SchemaErrors as err:
+        cases = err.failure_cases
+        wide = (cases["schema_context"] == "DataFrameSchema") & cases["index"].notna()
+        column = cases["column"].where(~wide, "*").fillna(cases["schema_context"]).astype(str)
+        check = cases["check"].astype(str)
+        counts = pd.DataFrame({"column": column, "check": check, "index": cases["index"]})
+        return Counter(counts.groupby(["column", "check"])["index"].nunique(dropna=False).to_dict())
+    return Counter()
+
+
+def iter_chunks(path, dataset, chunksize):
+    if dataset in AMOUNT_COLUMNS:
+        return pd.read_csv(path, dtype=str, keep_default_na=False, na_values=[""], chunksize=chunksize)
+    return pd.read_json(path, lines=True, chunksize=chunksize)
+
+
+def validate_file(path, dataset, chunksize=DEFAULT_CHUNK_SIZE, sample=None, seed=None, schema=None):
+
+    '''Validates one file in chunks and returns a summary: rows read, rows checked, and failure counts keyed "column:check". With sample (a fraction between 0 and 1), only that share of each chunk is checked, which makes a cheap pre-check of a large file.'''
+
+    schema = schema or SCHEMAS[dataset]
+    rng = np.random.default_rng(seed)
+    failures = Counter()
+    rows = checked = 0
+    start = time.perf_counter()
+
+    for chunk in iter_chunks(path, dataset, chunksize):
+        rows += len(chunk)
+        if sample is not None and sample < 1:
+            chunk = chunk[rng.random(len(chunk)) < sample]
+        if chunk.empty:
+            continue
+        checked += len(chunk)
+        failures += count_failures(prepare(chunk, dataset), schema)
+
+    elapsed = time.perf_counter() - start
+    summary = {
+        "dataset": dataset,
+        "file": str(path),
+        "rows": rows,
+        "checked_rows": checked,
+        "sample": sample,
+        "failures": {f"{column}:{check}": int(n) for (column, check), n in sorted(failures.items())},
+        "failed_checks": int(sum(failures.values())),
+        "elapsed": round(elapsed, 3),
+    }
+    logger.info(f"Validated {dataset} {path.name}: {checked}/{rows} rows checked, "
+                f"{summary['failed_checks']} failures across {len(failures)} column checks in {elapsed:.2f}s")
+    return summary
+
+
+def run_validation(datasets=None, raw_dir=None, chunksize=DEFAULT_CHUNK_SIZE, sample=None, seed=None, report_dir=None):
+
+    '''Validates the latest file of each dataset and writes the summaries to <report_dir>/validation_<ts>.json. Returns the list of summaries.'''
+
+    raw_dir = raw_dir or RAW_DATA
+    report_dir = report_dir or REPORT_DIR
+    summaries = []
+
+    for dataset in datasets or SOURCES:
+        folder, pattern = SOURCES[dataset]
+        files = [p for p in (raw_dir / folder).glob(pattern) if p.suffix != ".part"]
+        latest = max(files, key=lambda p: p.stat().st_mtime, default=None)
+        if latest is None:
+            logger.warning(f"No {dataset} file found in {raw_dir / folder}")
+            continue
+        summaries.append(validate_file(latest, dataset, chunksize, sample, seed))
+
+    report_dir.mkdir(parents=True, exist_ok=True)
+    report_path = report_dir / f"validation_{time.strftime('%Y%m%d_%H%M%S')}.json"
+    with open(report_path, 'w', encoding='utf-8') as f:
+        json.dump(summaries, f, indent=2)
+    logger.info(f"Validation report written to {report_path}")
+    return summaries
@@ -0,0 +1,21 @@
+import numpy as np
+import pandas as pd
+from ecomma.aggregate.attribution import attribute_orders
+
+
+def test_windows_without_a_label_do_not_shadow_older_windows():
+    orders = pd.DataFrame({"promo_code_used": ["save10", "SAVE10", "SAVE10", None],
+                           "order_date": pd.to_datetime(["2025-01-05", "2025-01-20", "2025-03-01", "2025-01-05"]),
+                           "total_amount": [10.0, 20.0, 30.0, 40.0]})
+    campaigns = pd.DataFrame({"Campaign_ID": ["CMP-1", None, "CMP-3"],
+                              "Promo_Code_Linked": ["SAVE10", "SAVE10", "SAVE10"],
+                              "Start_Date": ["01/01/2025", "03/01/2025", "15/01/2025"],
+                              "End_Date": ["31/01/2025", "31/01/2025", "25/01/2025"]})
+    promotions = pd.DataFrame({"Promo_ID": [np.nan], "Promo_Code": ["SAVE10"],
+                               "Start_Date": ["01/01/2025"], "End_Date": ["12/31/2025"]})
+
+    result = attribute_orders(orders, campaigns, promotions)
+
+    assert result["campaign_id"].fillna("-").tolist() == ["CMP-1", "CMP-3", "-", "-"]
+    assert result["active_campaigns"].tolist() == [1, 2, 0, 0]
+    assert result["promo_id"].isna().all() and (result["active_promos"] == 0).all()
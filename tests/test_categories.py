@@ -0,0 +1,42 @@
+import random
+import pandas as pd
+from ecomma.transform.categories import ALIASES, canonicalize, canonicalize_columns
+from ecomma.datagen.campaign_spend import CHANNELS, REGIONS, apply_channel_messiness, apply_region_messiness
+from ecomma.datagen.promotions import STATUS_MAP, apply_status_messiness
+
+
+def test_messy_channels_and_regions_map_back_to_their_source():
+    random.seed(5)
+    channels = [random.choice(CHANNELS) for _ in range(3000)]
+    regions = [random.choice(REGIONS) for _ in range(3000)]
+
+    assert list(canonicalize([apply_channel_messiness(c) for c in channels], "channel")) == channels
+    assert list(canonicalize([apply_region_messiness(r) for r in regions], "region")) == regions
+
+
+def test_messy_statuses_map_back_to_their_source():
+    random.seed(6)
+    statuses = [random.choice(list(STATUS_MAP)) for _ in range(2000)]
+    assert list(canonicalize([apply_status_messiness(s) for s in statuses], "promo_status")) == statuses
+
+
+def test_codes_are_fixed_by_the_alias_table_order():
+    first = canonicalize(["Email", " tik tok ", None], "channel")
+    second = canonicalize(["GOGGLE ADS", "email"], "channel")
+
+    assert list(first.categories) == list(second.categories) == list(ALIASES["channel"])
+    assert first.codes.tolist() == [4, 3, -1]
+    assert second.codes.tolist() == [0, 4]
+
+
+def test_unknown_values_become_missing():
+    assert canonicalize(["Facebook", "Myspace", ""], "channel").isna().tolist() == [False, True, True]
+
+
+def test_promo_codes_are_trimmed_and_upper_cased():
+    df = pd.DataFrame({"Promo_Code": [" save25", "SAVE25", "get50 ", None], "Status": ["Expire", "ACTIVE", "active", None]})
+    out = canonicalize_columns(df, "promotions")
+
+    assert out["Promo_Code"].tolist()[:3] == ["SAVE25", "SAVE25", "GET50"]
+    assert out["Promo_Code"].cat.codes.tolist()[:2] == [1, 1]
+    assert out["Status"].tolist()[:3] == ["expired", "active", "active"]
@@ -0,0 +1,26 @@
+import os
+import pandas as pd
+from ecomma.aggregate.cube import KpiCube, cube_path
+
+
+def write_cube(cube_dir, revenue, mtime_ns):
+    path = cube_path("orders", cube_dir)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    pd.DataFrame({
+        "date": pd.to_datetime(["2025-01-01"]), "status": ["COMPLETED"], "payment_method": ["Card"], "promo_code": ["(none)"],
+        "orders": [1], "promo_orders": [0], "revenue": [revenue], "subtotal": [revenue], "discount": [0.0], "product_cost": [1.0],
+    }).to_parquet(path, index=False)
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+def test_query_results_follow_the_cube_file(tmp_path):
+    cube = KpiCube(cube_dir=tmp_path)
+    assert cube.query(dims=())["orders"].sum() == 0
+
+    write_cube(tmp_path, 10.0, 10**18)
+    assert cube.query(dims=())["revenue"].item() == 10.0
+    assert cube.query(dims=())["revenue"].item() == 10.0
+    assert cube.cached_query.cache_info().hits == 1
+
+    write_cube(tmp_path, 25.0, 10**18 + 10**9)
+    assert cube.query(dims=())["revenue"].item() == 25.0
@@ -0,0 +1,65 @@
+import math
+import random
+import numpy as np
+import pandas as pd
+from ecomma.transform.currency import parse_amounts, normalize_amounts
+from ecomma.datagen.campaign_spend import format_budget_spend
+from ecomma.datagen.promotions import format_discount_value, get_min_purchase
+
+
+def parse_one(value):
+    '''Row-by-row reference: strip the generators' money decorations and float() what is left.'''
+    if value is None or not str(value).strip():
+        return math.nan, math.nan, False
+    text = str(value).strip()
+    try:
+        if text.endswith("%"):
+            return math.nan, float(text.rstrip("%")), False
+        return float(text.strip("$").replace("USD", "").replace(",", "").strip()), math.nan, False
+    except ValueError:
+        return math.nan, math.nan, True
+
+
+def as_csv_text(values):
+    '''Values as the transform reads them back from the CSVs: strings, with None for empty cells.'''
+    return pd.Series([None if v is None else str(v) for v in values], dtype=object)
+
+
+def assert_matches_reference(values):
+    parsed = parse_amounts(values)
+    expected = pd.DataFrame([parse_one(v) for v in values], columns=["amount", "percent", "failed"])
+    np.testing.assert_allclose(parsed["amount"], expected["amount"])
+    np.testing.assert_allclose(parsed["percent"], expected["percent"])
+    assert parsed["failed"].tolist() == expected["failed"].tolist()
+
+
+def test_budget_spend_round_trips():
+    random.seed(1)
+    pairs = [format_budget_spend(round(random.uniform(100, 50000), 2)) for _ in range(2000)]
+    parsed = parse_amounts(as_csv_text([formatted for formatted, _ in pairs]))
+
+    expected = [math.nan if formatted is None else raw for formatted, raw in pairs]
+    np.testing.assert_allclose(parsed["amount"], expected)
+    assert not parsed["failed"].any()
+
+
+def test_promotion_amounts_match_the_row_by_row_parser():
+    random.seed(2)
+    values = as_csv_text([format_discount_value(random.choice([5, 10, 25]), random.choice(["percentage_off", "fixed_amount"]))
+                          for _ in range(1000)] + [get_min_purchase() for _ in range(1000)])
+    assert_matches_reference(values)
+
+
+def test_unparseable_values_are_flagged_without_breaking_the_column():
+    values = as_csv_text(["$1,234.50", "12 USD", " 7 ", "20%", "", None, "abc", "1.2.3", "$"])
+    assert_matches_reference(values)
+    assert parse_amounts(values)["failed"].sum() == 3
+
+
+def test_normalize_amounts_adds_percent_and_failure_columns():
+    df = pd.DataFrame({"Discount_Value": as_csv_text(["10%", "$5", "oops"])})
+    out = normalize_amounts(df, ["Discount_Value"])
+
+    assert out["Discount_Value"].tolist()[1] == 5.0
+    assert out["Discount_Value_pct"].tolist()[0] == 10.0
+    assert out["Discount_Value_parse_failed"].tolist() == [False, False, True]
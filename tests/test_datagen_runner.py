@@ -0,0 +1,22 @@
+import pandas as pd
+from ecomma.datagen import pools
+from ecomma.datagen.orders import next_id_block, generate_orders, generate_orders_vectorized, ORDER_ID_SPACE
+from ecomma.datagen.runner import derive_seeds
+
+
+def test_each_run_claims_a_new_id_block_and_seed(tmp_path):
+    assert [next_id_block(tmp_path / "orders") for _ in range(3)] == [0, 1, 2]
+    assert next_id_block(tmp_path / "other") == 0
+    assert derive_seeds([42, 0], 2) == derive_seeds([42, 0], 2) != derive_seeds([42, 1], 2)
+
+
+def test_per_row_and_unsharded_runs_claim_their_own_blocks(tmp_path, monkeypatch):
+    monkeypatch.setattr(pools, "POOL_DIR", tmp_path / "pools")
+    generate_orders(tmp_path, num_orders=500)
+    generate_orders_vectorized(tmp_path, num_orders=500, seed=1, file_path=tmp_path / "vectorized.csv")
+    per_row = pd.read_csv(next((tmp_path / "orders").glob("*.csv")))["order_id"]
+    vectorized = pd.read_csv(tmp_path / "vectorized.csv")["order_id"]
+
+    assert per_row.between(0, ORDER_ID_SPACE - 1).all()
+    assert vectorized.between(ORDER_ID_SPACE, 2 * ORDER_ID_SPACE - 1).all()
+    assert next_id_block(tmp_path / "orders") == 2
@@ -0,0 +1,60 @@
+import random
+import numpy as np
+import pandas as pd
+from datetime import datetime, timedelta
+from ecomma.transform.dates import DateParser, DAYFIRST, FAST_PATH_MIN_UNIQUES, detect_format
+from ecomma.datagen.campaign_spend import format_campaign_dates
+from ecomma.datagen.promotions import format_promo_dates
+
+
+def random_starts(n, seed):
+    rng = random.Random(seed)
+    return [datetime(2025, 1, 1) + timedelta(days=rng.randint(0, 364)) for _ in range(n)]
+
+
+def round_trip(formatter, dataset, seed):
+    random.seed(seed)
+    starts = random_starts(3000, seed)
+    formatted = [formatter(start, 10)[0] for start in starts]
+    parser = DateParser()
+    parsed = parser.parse(pd.Series(formatted), DAYFIRST[dataset])
+    return parser, formatted, parsed, pd.Series(pd.to_datetime(starts))
+
+
+def test_promotion_dates_round_trip_with_month_first_slashes():
+    parser, formatted, parsed, expected = round_trip(format_promo_dates, "promotions", 3)
+    assert (parsed == expected).all()
+    assert parser.parsed == len(set(formatted)) < len(formatted)
+
+
+def test_campaign_dates_round_trip_with_day_first_slashes():
+    _, _, parsed, expected = round_trip(format_campaign_dates, "marketing", 4)
+    assert (parsed == expected).all()
+
+
+def test_ambiguous_slash_dates_follow_the_convention_unless_a_part_exceeds_12():
+    assert detect_format("03/04/2025", dayfirst=True) == "%d/%m/%Y"
+    assert detect_format("03/04/2025", dayfirst=False) == "%m/%d/%Y"
+    assert detect_format("13/04/2025", dayfirst=False) == "%d/%m/%Y"
+    assert detect_format("04/13/2025", dayfirst=True) == "%m/%d/%Y"
+
+
+def test_bulk_path_matches_value_by_value_parsing():
+    base = datetime(2025, 1, 1)
+    values = [(base + timedelta(minutes=17 * i)).strftime("%Y-%m-%d %H:%M:%S") for i in range(FAST_PATH_MIN_UNIQUES + 500)]
+    values += ["2025-02-30 10:00:00", "Mar 05, 2025", "", "garbage", None]
+
+    bulk = DateParser().parse(pd.Series(values))
+    reference = DateParser()
+    one_by_one = np.array([reference.parse_value(v) if v is not None else np.datetime64("NaT", "ns") for v in values],
+                          dtype="datetime64[ns]")
+
+    np.testing.assert_array_equal(bulk.to_numpy(), one_by_one)
+    assert bulk.isna().sum() == 4
+
+
+def test_parse_cache_is_shared_across_files():
+    parser = DateParser()
+    parser.parse(pd.Series(["2025-01-01", "01/02/2025"] * 50))
+    parser.parse(pd.Series(["2025-01-01", "Jan 03, 2025"] * 50))
+    assert parser.parsed == 3
@@ -0,0 +1,65 @@
+import gzip
+import json
+import pandas as pd
+from ecomma.storage import manifest
+from ecomma.storage.dedup import run_dedup
+
+
+def write_jsonl(path, records, compress=False):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with (gzip.open if compress else open)(path, 'wt', encoding='utf-8') as f:
+        f.writelines(json.dumps(r) + "\n" for r in records)
+
+
+def counts(summary):
+    return {k: summary[k] for k in ("files", "rows", "new", "changed", "unchanged", "duplicates", "skipped")}
+
+
+def test_orders_deltas_across_snapshots(tmp_path, monkeypatch):
+    monkeypatch.setattr(manifest, "MANIFEST_DIR", tmp_path / "manifests")
+    raw, out = tmp_path / "raw", tmp_path / "dedup"
+    (raw / "orders").mkdir(parents=True)
+    pd.DataFrame({"order_id": ["1", "2", "2", "3", ""], "status": ["new", "old", "paid", "new", "x"]}).to_csv(
+        raw / "orders" / "orders_20250101_000000.csv", index=False)
+
+    report = run_dedup(["orders"], raw, out)
+    assert counts(report["orders"]) == {"files": 1, "rows": 5, "new": 3, "changed": 0, "unchanged": 0, "duplicates": 1, "skipped": 1}
+    first = pd.read_csv(out / "orders" / "orders_20250101_000000.csv", dtype=str)
+    assert first.values.tolist() == [["1", "new"], ["2", "paid"], ["3", "new"]]
+
+    pd.DataFrame({"order_id": ["1", "2", "4"], "status": ["new", "shipped", "new"]}).to_csv(
+        raw / "orders" / "orders_20250102_000000.csv", index=False)
+    report = run_dedup(["orders"], raw, out)
+    assert counts(report["orders"]) == {"files": 1, "rows": 3, "new": 1, "changed": 1, "unchanged": 1, "duplicates": 0, "skipped": 0}
+    assert pd.read_csv(out / "orders" / "orders_20250102_000000.csv", dtype=str).values.tolist() == [["2", "shipped"], ["4", "new"]]
+
+    assert run_dedup(["orders"], raw, out)["orders"]["files"] == 0
+
+
+def test_jsonl_snapshots_ignore_field_order_and_read_gzip(tmp_path, monkeypatch):
+    monkeypatch.setattr(manifest, "MANIFEST_DIR", tmp_path / "manifests")
+    raw, out = tmp_path / "raw", tmp_path / "dedup"
+    write_jsonl(raw / "products" / "products_20250101_000000.jsonl.gz",
+                [{"id": 1, "price": 10}, {"id": 2, "price": 20}, {"price": 5}], compress=True)
+    write_jsonl(raw / "products" / "products_20250102_000000.jsonl",
+                [{"price": 10, "id": 1}, {"id": 2, "price": 25}])
+
+    report = run_dedup(["products"], raw, out)
+    assert counts(report["products"]) == {"files": 2, "rows": 5, "new": 2, "changed": 1, "unchanged": 1, "duplicates": 0, "skipped": 1}
+    delta = (out / "products" / "products_20250102_000000.jsonl").read_text().splitlines()
+    assert [json.loads(line) for line in delta] == [{"id": 2, "price": 25}]
+
+
+def test_campaigns_are_keyed_on_their_content(tmp_path, monkeypatch):
+    monkeypatch.setattr(manifest, "MANIFEST_DIR", tmp_path / "manifests")
+    raw, out = tmp_path / "raw", tmp_path / "dedup"
+    (raw / "marketing").mkdir(parents=True)
+    rows = {"Campaign_ID": ["CMP-1", "CMP-1", "CMP-2", "CMP-2"], "Budget_Spend": ["10", "20", "30", "30"]}
+    pd.DataFrame(rows).to_csv(raw / "marketing" / "marketing_spend_1.csv", index=False)
+    pd.DataFrame({"Campaign_ID": ["CMP-1", "CMP-1"], "Budget_Spend": ["10", "25"]}).to_csv(
+        raw / "marketing" / "marketing_spend_2.csv", index=False)
+
+    report = run_dedup(["marketing"], raw, out)
+
+    assert counts(report["marketing"]) == {"files": 2, "rows": 6, "new": 4, "changed": 0, "unchanged": 1, "duplicates": 1, "skipped": 0}
+    assert pd.read_csv(out / "marketing" / "marketing_spend_1.csv", dtype=str)["Budget_Spend"].tolist() == ["10", "20", "30"]
@@ -0,0 +1,87 @@
+import pytest
+from ecomma.extract import extract_api
+from ecomma.extract.extract_api import RateLimiter, get_with_retry, iter_pages, fetch_data_concurrent, make_session
+from ecomma.benchmarks.stub_api import StubApi
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    '''Records retry delays instead of sleeping through them.'''
+    delays = []
+    monkeypatch.setattr(extract_api.time, "sleep", delays.append)
+    return delays
+
+
+def fast_limiter():
+    return RateLimiter(rate=10_000)
+
+
+def test_pages_are_yielded_in_skip_order_with_total():
+    with StubApi(total=95, latency=0.01) as api:
+        pages = list(iter_pages(api.base_url, "products", limit=10, max_workers=4, rate_limiter=fast_limiter()))
+
+    assert [p.skip for p in pages] == list(range(0, 95, 10))
+    assert all(p.total == 95 and p.error is None for p in pages)
+    assert [item["id"] for p in pages for item in p.items] == list(range(1, 96))
+
+
+def test_fetch_data_concurrent_collects_every_item():
+    with StubApi(total=123) as api:
+        items = fetch_data_concurrent(api.base_url, "users", limit=30, max_workers=3, rate_limiter=fast_limiter())
+
+    assert len(items) == 123
+    assert sorted(item["id"] for item in items) == list(range(1, 124))
+
+
+def test_429_and_5xx_are_retried(sleeps):
+    with StubApi(total=60, failures={30: [429, 503, 500]}) as api:
+        items = fetch_data_concurrent(api.base_url, "products", limit=30, max_workers=2, rate_limiter=fast_limiter())
+        statuses = [status for _, skip, status in api.requests if skip == 30]
+
+    assert len(items) == 60
+    assert statuses == [429, 503, 500, 200]
+    assert sleeps == [0.5, 1.0, 2.0]
+
+
+def test_retry_after_takes_precedence_over_backoff(sleeps):
+    with StubApi(total=10, failures={0: [429]}, retry_after=3) as api:
+        data = get_with_retry(make_session(1), f"{api.base_url}/products?limit=10&skip=0", backoff=0.1)
+
+    assert len(data["products"]) == 10
+    assert sleeps == [3.0]
+
+
+def test_page_failing_after_retries_is_yielded_with_error(sleeps):
+    with StubApi(total=90, failures={30: [503] * 10}) as api:
+        pages = list(iter_pages(api.base_url, "carts", limit=30, max_workers=2, rate_limiter=fast_limiter()))
+
+    assert [p.skip for p in pages] == [0, 30, 60]
+    failed = pages[1]
+    assert failed.items == [] and "503" in failed.error
+    assert [len(p.items) for p in (pages[0], pages[2])] == [30, 30]
+    assert len(sleeps) == 4
+
+
+def test_non_retryable_status_fails_fast(sleeps):
+    with StubApi(total=10, failures={0: [404]}) as api:
+        with pytest.raises(Exception):
+            get_with_retry(make_session(1), f"{api.base_url}/products?limit=10&skip=0")
+    assert sleeps == []
+
+
+def test_extract_with_failed_pages_is_not_published(tmp_path, sleeps):
+    with StubApi(total=60, failures={30: [503] * 10}) as api:
+        summary = extract_api.extract_to_jsonl(tmp_path, api.base_url, "products", limit=30,
+                                               rate_limiter=fast_limiter())
+
+    assert summary["errors"] == 1 and summary["file"] is None
+    assert [p.suffix for p in tmp_path.iterdir()] == [".part"]
+
+
+def test_complete_extract_is_renamed_into_place(tmp_path):
+    with StubApi(total=60) as api:
+        summary = extract_api.extract_to_jsonl(tmp_path, api.base_url, "products", limit=30,
+                                               rate_limiter=fast_limiter())
+
+    assert summary["file"].exists() and summary["items"] == 60
+    assert list(tmp_path.iterdir()) == [summary["file"]]
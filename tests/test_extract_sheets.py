@@ -0,0 +1,34 @@
+import threading
+from functools import partial
+from http.server import ThreadingHTTPServer, SimpleHTTPRequestHandler
+import pytest
+from ecomma.extract import extract_sheets
+
+
+class QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def sheet_server(tmp_path, monkeypatch):
+    '''Serves tmp_path/served/<gid>.csv as the export of sheet gid and writes the extracts under tmp_path/raw.'''
+    served = tmp_path / "served"
+    served.mkdir()
+    server = ThreadingHTTPServer(("127.0.0.1", 0), partial(QuietHandler, directory=str(served)))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    monkeypatch.setattr(extract_sheets, "sheet_csv_url", lambda sheet_id, gid: f"http://127.0.0.1:{server.server_port}/{gid}.csv")
+    monkeypatch.setattr(extract_sheets, "RAW_DATA", tmp_path / "raw")
+    yield served
+    server.shutdown()
+
+
+def test_sheet_is_streamed_in_chunks_and_skipped_when_unchanged(sheet_server, tmp_path):
+    (sheet_server / "0.csv").write_text("order_id,total\n" + "".join(f"{i},{i}.5\n" for i in range(25)))
+
+    first = extract_sheets.extract_sheet_streaming("sheet", "0", "orders.jsonl", chunksize=10)
+    second = extract_sheets.extract_sheet_streaming("sheet", "0", "orders.jsonl", chunksize=10)
+
+    assert (first["rows"], first["skipped"], first["errors"]) == (25, False, 0)
+    assert second["skipped"] and len((tmp_path / "raw" / "orders.jsonl").read_text().splitlines()) == 25
+    assert sorted(p.name for p in (tmp_path / "raw").iterdir()) == ["orders.jsonl", "orders.jsonl.sha256"]
@@ -0,0 +1,168 @@
+import random
+import numpy as np
+import pandas as pd
+import pytest
+from ecomma.datagen import pools
+from ecomma.datagen.pools import AddressPool, DatePool
+from ecomma.datagen.vectorized import make_rng
+from ecomma.datagen.orders import generate_orders, generate_orders_vectorized, build_orders_block
+from ecomma.datagen.campaign_spend import generate_marketing_data, generate_marketing_data_vectorized, REGION_ABBREVS
+from ecomma.datagen.promotions import generate_promotions_data, generate_promotions_data_vectorized, STATUS_MAP
+
+N = 20_000
+TOLERANCE = 0.02
+
+
+@pytest.fixture(autouse=True)
+def pool_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(pools, "POOL_DIR", tmp_path / "pools")
+
+
+def read_raw(path):
+    '''A generated CSV the way the transform sees it: every cell as text, blanks as "".'''
+    return pd.read_csv(path, dtype=str, keep_default_na=False)
+
+
+def only_file(folder):
+    [path] = folder.glob("*.csv")
+    return path
+
+
+def share(mask, within=None):
+    mask = pd.Series(mask)
+    if within is not None:
+        mask = mask[pd.Series(within)]
+    return float(mask.mean())
+
+
+def assert_rates_match(rates, rows, vectorized):
+    expected, actual = rates(rows), rates(vectorized)
+    off = {name: (expected[name], actual[name]) for name in expected if abs(expected[name] - actual[name]) > TOLERANCE}
+    assert not off, f"messiness rates differ (per-row, vectorized): {off}"
+
+
+def order_rates(df):
+    promo = df["promo_code_used"]
+    has_promo = promo != ""
+    discount = df["discount_applied"]
+    has_discount = discount != ""
+    amount = discount.str.strip("$").str.replace(" USD", "", regex=False)
+    rates = {
+        "promo": share(has_promo),
+        "promo_lowered": share(promo.str.strip() == promo.str.strip().str.lower(), has_promo),
+        "promo_padded": share(promo.str.startswith(" "), has_promo),
+        "discount_dollar": share(discount.str.startswith("$"), has_discount),
+        "discount_usd": share(discount.str.endswith(" USD"), has_discount),
+        "discount_whole": share(~amount.str.contains(".", regex=False), has_discount),
+        "subtotal_dollar": share(df["subtotal_before_discount"].str.startswith("$")),
+        "no_delivery": share(df["delivery_date"] == ""),
+    }
+    for status in ["COMPLETED", "PENDING", "SHIPPED", "CANCELLED", "RETURNED"]:
+        rates[f"status_{status}"] = share(df["status"] == status)
+    return rates
+
+
+def test_vectorized_orders_follow_the_per_row_rates(tmp_path):
+    random.seed(1)
+    generate_orders(tmp_path / "rows", num_orders=N)
+    path = generate_orders_vectorized(tmp_path / "vec", num_orders=N, seed=1, chunk_size=7_000)
+    assert_rates_match(order_rates, read_raw(only_file(tmp_path / "rows" / "orders")), read_raw(path))
+
+
+def test_orders_block_is_reproducible_from_the_seed():
+    prices, user_ids = np.array([4.5, 12.0, 30.25]), np.array([1, 2, 3])
+    addresses, dates = AddressPool(50), DatePool(365)
+    ids = np.arange(1_000)
+
+    def block(seed):
+        return build_orders_block(make_rng(seed), ids, prices, user_ids, addresses, dates)
+
+    pd.testing.assert_frame_equal(block(3), block(3))
+    assert not block(3).equals(block(4))
+
+
+def test_orders_file_is_reproducible_from_the_seed(tmp_path):
+    same_run = dict(num_orders=3_000, seed=5, chunk_size=1_000, id_range=(0, 10**6))
+    first = generate_orders_vectorized(tmp_path, file_path=tmp_path / "a.csv", **same_run)
+    second = generate_orders_vectorized(tmp_path, file_path=tmp_path / "b.csv", **same_run)
+    # Order and delivery dates are relative to the current time, so only they may move between runs.
+    undated = lambda path: read_raw(path).drop(columns=["order_date", "delivery_date"])
+    pd.testing.assert_frame_equal(undated(first), undated(second))
+
+
+def marketing_rates(df):
+    channel = df["Channel"]
+    has_channel = channel != ""
+    linked = df["Promo_Code_Linked"]
+    has_linked = linked != ""
+    spend = df["Budget_Spend"]
+    return {
+        "id_prefixed": share(df["Campaign_ID"].str.startswith("id-"), df["Campaign_ID"] != ""),
+        "channel_typo": share(channel.str.strip().isin(["Goggle Ads", "goggle ads", "Insta", "insta", "Tik Tok", "tik tok"]), has_channel),
+        "channel_lowered": share(channel.str.strip() == channel.str.strip().str.lower(), has_channel),
+        "channel_padded": share(channel.str.startswith(" "), has_channel),
+        "region_abbrev": share(df["Target_Region"].isin(REGION_ABBREVS.values())),
+        "date_named_month": share(df["Start_Date"].str.contains(",", regex=False)),
+        "date_slashed": share(df["Start_Date"].str.contains("/", regex=False)),
+        "spend_blank": share(spend == ""),
+        "spend_dollar": share(spend.str.startswith("$")),
+        "spend_usd": share(spend.str.endswith(" USD")),
+        "promo_linked": share(has_linked),
+        "promo_lowered": share(linked.str.strip() == linked.str.strip().str.lower(), has_linked),
+        "promo_padded": share(linked.str.startswith(" "), has_linked),
+        "clicks_blank": share(df["Clicks"] == ""),
+    }
+
+
+def test_vectorized_marketing_follows_the_per_row_rates(tmp_path):
+    random.seed(2)
+    np.random.seed(2)
+    generate_marketing_data(tmp_path / "rows", num_rows=N)
+    path = generate_marketing_data_vectorized(tmp_path / "vec", num_rows=N, seed=2, chunk_size=7_000)
+    assert_rates_match(marketing_rates, read_raw(only_file(tmp_path / "rows" / "marketing")), read_raw(path))
+
+
+def test_marketing_file_is_reproducible_from_the_seed(tmp_path):
+    first = generate_marketing_data_vectorized(tmp_path, num_rows=3_000, seed=5, chunk_size=1_000, file_path=tmp_path / "a.csv")
+    second = generate_marketing_data_vectorized(tmp_path, num_rows=3_000, seed=5, chunk_size=1_000, file_path=tmp_path / "b.csv")
+    pd.testing.assert_frame_equal(read_raw(first), read_raw(second))
+
+
+def promotion_rates(df):
+    code = df["Promo_Code"]
+    has_code = code != ""
+    discount = df["Discount_Value"]
+    minimum = df["Min_Purchase"]
+    return {
+        "id_prefixed": share(df["Promo_ID"].str.startswith("promo_"), df["Promo_ID"] != ""),
+        "code_blank": share(~has_code),
+        "code_lowered": share(code.str.strip() == code.str.strip().str.lower(), has_code),
+        "code_padded": share(code.str.startswith(" "), has_code),
+        "discount_blank": share(discount == ""),
+        "discount_percent": share(discount.str.endswith("%")),
+        "discount_dollar": share(discount.str.startswith("$")),
+        "date_slashed": share(df["Start_Date"].str.contains("/", regex=False)),
+        "date_named_month": share(df["Start_Date"].str.contains("[A-Za-z]")),
+        "min_purchase_blank": share(minimum == ""),
+        "min_purchase_dollar": share(minimum.str.startswith("$")),
+        "min_purchase_usd": share(minimum.str.endswith(" USD")),
+        "usage_limit_blank": share(df["Usage_Limit"] == ""),
+        "never_used": share(pd.to_numeric(df["Times_Used"]) == 0),
+        "category_messy": share(df["Category"].str.startswith(" ")),
+        "status_upper": share(df["Status"].str.isupper()),
+        "status_mapped": share(df["Status"].isin(STATUS_MAP.values())),
+    }
+
+
+def test_vectorized_promotions_follow_the_per_row_rates(tmp_path):
+    random.seed(3)
+    np.random.seed(3)
+    generate_promotions_data(tmp_path / "rows", num_rows=N)
+    path = generate_promotions_data_vectorized(tmp_path / "vec", num_rows=N, seed=3, chunk_size=7_000)
+    assert_rates_match(promotion_rates, read_raw(only_file(tmp_path / "rows" / "promotions")), read_raw(path))
+
+
+def test_promotions_file_is_reproducible_from_the_seed(tmp_path):
+    first = generate_promotions_data_vectorized(tmp_path, num_rows=3_000, seed=5, chunk_size=1_000, file_path=tmp_path / "a.csv")
+    second = generate_promotions_data_vectorized(tmp_path, num_rows=3_000, seed=5, chunk_size=1_000, file_path=tmp_path / "b.csv")
+    pd.testing.assert_frame_equal(read_raw(first), read_raw(second))
@@ -0,0 +1,85 @@
+import os
+import requests
+from concurrent.futures import ThreadPoolExecutor
+from ecomma.extract.http_cache import ResponseCache, resolve_cache
+from ecomma.extract.extract_api import fetch_data
+from ecomma.benchmarks.stub_api import StubApi
+
+
+def page_url(api, skip, limit=5):
+    return f"{api.base_url}/products?limit={limit}&skip={skip}"
+
+
+def test_fresh_entry_is_served_without_a_request(tmp_path):
+    cache = ResponseCache(tmp_path, ttl=3600)
+    with StubApi(total=20) as api:
+        first = cache.get(requests, page_url(api, 0))
+        second = cache.get(requests, page_url(api, 0))
+        served = len(api.requests)
+
+    assert second.json() == first.json()
+    assert served == 1
+    assert cache.stats["hits"] == 1 and cache.stats["misses"] == 1
+
+
+def test_stale_entry_is_revalidated_with_a_304(tmp_path):
+    cache = ResponseCache(tmp_path, ttl=0)
+    with StubApi(total=20) as api:
+        first = cache.get(requests, page_url(api, 0))
+        second = cache.get(requests, page_url(api, 0))
+        api.total = 3
+        changed = cache.get(requests, page_url(api, 0))
+        statuses = [status for _, _, status in api.requests]
+
+    assert statuses == [200, 304, 200]
+    assert second.status_code == 200 and second.content == first.content
+    assert len(changed.json()["products"]) == 3
+    assert cache.stats["revalidated"] == 1 and cache.stats["bytes_saved"] == len(first.content)
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    cache = ResponseCache(tmp_path, ttl=3600)
+    with StubApi(total=100) as api:
+        a, b, c = (page_url(api, skip) for skip in (0, 10, 20))
+        sizes = {url: len(requests.get(url).content) for url in (a, b, c)}
+        cache.get(requests, a)
+        cache.get(requests, b)
+        os.utime(cache.paths(a)[0], (100, 100))
+        os.utime(cache.paths(b)[0], (200, 200))
+        cache.get(requests, a)  # a hit makes a the most recently used entry
+
+        cache.max_bytes = sizes[a] + sizes[c]
+        cache.get(requests, c)
+
+    assert cache.paths(a)[0].exists() and cache.paths(c)[0].exists()
+    assert not cache.paths(b)[0].exists() and not cache.paths(b)[1].exists()
+    assert cache.stats["evictions"] == 1
+
+
+def test_concurrent_stores_of_one_url_do_not_clash(tmp_path):
+    cache = ResponseCache(tmp_path, ttl=0)
+    with StubApi(total=200) as api:
+        url = page_url(api, 0, limit=200)
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            bodies = list(executor.map(lambda _: cache.get(requests, url).content, range(32)))
+        cache.ttl = 3600
+        stored = cache.get(requests, url).content
+
+    assert len(set(bodies)) == 1 and stored == bodies[0]
+    assert not list(tmp_path.glob("*.tmp"))
+
+
+def test_fetch_data_goes_through_the_cache(tmp_path, monkeypatch):
+    monkeypatch.setattr("ecomma.extract.extract_api.time.sleep", lambda seconds: None)
+    cache = ResponseCache(tmp_path, ttl=0)
+    with StubApi(total=50) as api:
+        assert len(fetch_data(api.base_url, "users", cache=cache)) == 50
+        assert len(fetch_data(api.base_url, "users", cache=cache)) == 50
+
+    assert cache.stats["misses"] == 3 and cache.stats["revalidated"] == 3
+
+
+def test_resolve_cache():
+    cache = ResponseCache.__new__(ResponseCache)
+    assert resolve_cache(cache) is cache
+    assert resolve_cache(False) is None and resolve_cache(None) is None
@@ -0,0 +1,114 @@
+import json
+import pytest
+from ecomma.extract import runner, extract_api
+from ecomma.extract.extract_api import RateLimiter, iter_pages
+from ecomma.datagen.orders import load_seed_columns
+from ecomma.benchmarks.stub_api import StubApi
+
+
+class Killed(Exception):
+    pass
+
+
+def killed_after(pages):
+    '''iter_pages stand-in that dies after the given number of pages, like a run killed mid-extraction.'''
+    def fake_iter_pages(*args, **kwargs):
+        for i, page in enumerate(iter_pages(*args, **kwargs)):
+            if i == pages:
+                raise Killed()
+            yield page
+    return fake_iter_pages
+
+
+def extract(api, raw_dir, **kwargs):
+    return runner.extract_resource_incremental(api.base_url, "products", raw_dir=raw_dir,
+                                               rate_limiter=RateLimiter(10_000), **kwargs)
+
+
+def published_ids(raw_dir):
+    ids = []
+    for path in sorted((raw_dir / "products").rglob("*.jsonl")):
+        with open(path, encoding="utf-8") as f:
+            ids.extend(json.loads(line)["id"] for line in f)
+    return ids
+
+
+def test_interrupted_run_resumes_into_the_same_file(tmp_path, monkeypatch):
+    with StubApi(total=300) as api:
+        monkeypatch.setattr(runner, "iter_pages", killed_after(5))
+        with pytest.raises(Killed):
+            extract(api, tmp_path)
+        assert published_ids(tmp_path) == []
+
+        monkeypatch.setattr(runner, "iter_pages", iter_pages)
+        summary = extract(api, tmp_path)
+
+    assert summary["resumed"] and summary["start_skip"] == 150
+    assert published_ids(tmp_path) == list(range(1, 301))
+    assert not list((tmp_path / "products").glob("*.part"))
+
+
+def test_torn_write_is_cut_back_to_the_checkpoint(tmp_path, monkeypatch):
+    with StubApi(total=120) as api:
+        monkeypatch.setattr(runner, "iter_pages", killed_after(2))
+        with pytest.raises(Killed):
+            extract(api, tmp_path)
+        part = next((tmp_path / "products").glob("*.part"))
+        with open(part, "a", encoding="utf-8") as f:
+            f.write('{"id": 999, "title": "half a pa')
+
+        monkeypatch.setattr(runner, "iter_pages", iter_pages)
+        extract(api, tmp_path)
+
+    assert published_ids(tmp_path) == list(range(1, 121))
+
+
+def test_repeat_run_writes_only_new_pages_to_a_delta(tmp_path):
+    with StubApi(total=60) as api:
+        extract(api, tmp_path)
+        assert extract(api, tmp_path)["file"] is None
+
+        api.total = 75
+        summary = extract(api, tmp_path)
+
+    assert summary["file"].parent.name == "deltas"
+    assert sorted(published_ids(tmp_path)) == list(range(1, 76))
+    state = json.loads((tmp_path / "products" / runner.STATE_FILE).read_text())
+    assert state["complete"] and state["run"] is None and sorted(map(int, state["pages"])) == [0, 30, 60]
+
+
+def test_failed_first_page_is_retried_on_the_next_run(tmp_path, monkeypatch):
+    monkeypatch.setattr(extract_api.time, "sleep", lambda delay: None)
+    with StubApi(total=90, failures={0: [500] * 5}) as api:
+        assert extract(api, tmp_path)["file"] is None
+        state = json.loads((tmp_path / "products" / runner.STATE_FILE).read_text())
+        assert state["total"] is None and state["failed"] == [0] and not state["complete"]
+
+        summary = extract(api, tmp_path)
+
+    assert summary["file"] is not None and summary["file"].parent.name == "products"
+    assert published_ids(tmp_path) == list(range(1, 91))
+
+
+def test_snapshot_with_a_failed_page_is_published_only_once_complete(tmp_path, monkeypatch):
+    monkeypatch.setattr(extract_api.time, "sleep", lambda delay: None)
+    with StubApi(total=120, failures={60: [500] * 5}) as api:
+        assert extract(api, tmp_path)["errors"] == 1
+        assert published_ids(tmp_path) == []
+
+        summary = extract(api, tmp_path)
+
+    assert summary["resumed"] and summary["start_skip"] == 60 and summary["errors"] == 0
+    assert sorted(published_ids(tmp_path)) == list(range(1, 121))
+    state = json.loads((tmp_path / "products" / runner.STATE_FILE).read_text())
+    assert state["complete"] and state["failed"] == [] and state["run"] is None
+
+
+def test_seed_data_includes_later_deltas(tmp_path):
+    with StubApi(total=60) as api:
+        extract(api, tmp_path)
+        api.total = 75
+        extract(api, tmp_path)
+
+    product_ids, prices, _ = load_seed_columns(tmp_path)
+    assert sorted(product_ids.tolist()) == list(range(1, 76))
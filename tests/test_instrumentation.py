@@ -0,0 +1,50 @@
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from ecomma.settings import instrumentation
+from ecomma.settings.instrumentation import RunRecorder, submit
+
+
+def test_counts_from_executor_workers_go_to_the_submitting_stage():
+    recorder = RunRecorder()
+    both_open = threading.Barrier(2)
+
+    def run(name, pages):
+        with recorder.stage(name):
+            both_open.wait()
+            with ThreadPoolExecutor(max_workers=4) as executor:
+                for future in [submit(executor, recorder.count, pages=1) for _ in range(pages)]:
+                    future.result()
+            both_open.wait()
+
+    threads = [threading.Thread(target=run, args=args) for args in (("products", 3), ("users", 5))]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        executor.submit(recorder.count, pages=100).result()
+
+    stages = recorder.report()["stages"]
+    assert {name: stats["pages"] for name, stats in stages.items()} == {"products": 3, "users": 5}
+
+
+def test_sub_runner_reports_inside_a_run_go_into_its_single_report(tmp_path, monkeypatch):
+    monkeypatch.setattr(instrumentation, "LOG_DIR", tmp_path)
+    recorder = RunRecorder()
+
+    def sub_runner(name, rows):
+        with recorder.stage(name):
+            recorder.count(rows=rows)
+        return recorder.write_report(name)
+
+    with recorder.run("pipeline"), ThreadPoolExecutor(max_workers=2) as executor:
+        futures = [submit(executor, sub_runner, "extraction", 3), submit(executor, sub_runner, "sheets", 4)]
+        assert [f.result() for f in futures] == [None, None]
+
+    reports = list(tmp_path.glob("*_report_*.json"))
+    assert [p.name.split("_report_")[0] for p in reports] == ["pipeline"]
+    stages = json.loads(reports[0].read_text())["stages"]
+    assert {name: stats["rows"] for name, stats in stages.items()} == {"extraction": 3, "sheets": 4}
+    assert recorder.write_report("standalone") is not None
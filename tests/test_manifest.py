@@ -0,0 +1,48 @@
+import os
+import shutil
+from ecomma.storage import manifest as manifest_module
+from ecomma.storage.manifest import Manifest, pending_files
+
+
+def write(path, text):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text, encoding="utf-8")
+    return path
+
+
+def test_unchanged_file_is_skipped_without_hashing(tmp_path, monkeypatch):
+    path = write(tmp_path / "raw" / "orders_1.csv", "order_id\n1\n")
+    Manifest("transform", tmp_path).mark_done(path)
+
+    def fail(*args, **kwargs):
+        raise AssertionError("unchanged file was hashed")
+    monkeypatch.setattr(manifest_module, "file_hash", fail)
+    assert Manifest("transform", tmp_path).new_files([path]) == []
+
+
+def test_renamed_copy_is_skipped_and_modified_file_reprocessed(tmp_path):
+    path = write(tmp_path / "raw" / "orders_1.csv", "order_id\n1\n")
+    Manifest("transform", tmp_path).mark_done(path)
+
+    copy = tmp_path / "raw" / "orders_copy.csv"
+    shutil.copy(path, copy)
+    write(path, "order_id\n1\n2\n")
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+    assert Manifest("transform", tmp_path).new_files([copy, path]) == [path]
+
+
+def test_pending_files_walks_partitions(tmp_path, monkeypatch):
+    monkeypatch.setattr(manifest_module, "MANIFEST_DIR", tmp_path / "manifests")
+    folder = tmp_path / "processed" / "orders"
+    first = write(folder / "order_day=2025-01-01" / "orders_1-0.parquet", "a")
+    second = write(folder / "order_day=2025-01-02" / "orders_1-0.parquet", "b")
+    write(folder / "notes.txt", "c")
+
+    assert pending_files("load", folder, (".parquet",))[1] == []
+    manifest, files = pending_files("load", folder, (".parquet",), recursive=True)
+    assert files == [first, second]
+
+    manifest.mark_done(first)
+    assert pending_files("load", folder, (".parquet",), recursive=True)[1] == [second]
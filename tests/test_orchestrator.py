@@ -0,0 +1,67 @@
+import json
+import pytest
+from ecomma.settings import instrumentation
+from ecomma.orchestrator import Stage, run_pipeline
+
+
+@pytest.fixture
+def pipeline(tmp_path, monkeypatch):
+    '''Builds a small graph (source -> middle -> sink) whose stages log their runs, and returns a runner for it.'''
+    monkeypatch.setattr(instrumentation, "LOG_DIR", tmp_path / "logs")
+    inputs = tmp_path / "inputs"
+    inputs.mkdir()
+    (inputs / "a.csv").write_text("id\n1\n")
+    ran, failing = [], set()
+
+    def body(name):
+        def run():
+            if name in failing:
+                raise RuntimeError(f"{name} broke")
+            ran.append(name)
+        return run
+
+    def run(force=(), max_age=None):
+        ran.clear()
+        stages = [
+            Stage("source", body("source"), inputs=((inputs, "*.csv"),), max_age=max_age),
+            Stage("middle", body("middle"), deps=("source",)),
+            Stage("sink", body("sink"), deps=("middle",)),
+        ]
+        return run_pipeline(stages, force=force, state_path=tmp_path / "state.json")
+
+    run.inputs, run.ran, run.failing, run.state_path = inputs, ran, failing, tmp_path / "state.json"
+    return run
+
+
+def test_unchanged_inputs_skip_every_stage(pipeline):
+    assert set(pipeline().values()) == {"ran"}
+    assert pipeline() == {"source": "skipped", "middle": "skipped", "sink": "skipped"}
+    assert pipeline.ran == []
+
+
+def test_changed_input_reruns_the_stage_and_its_dependents(pipeline):
+    pipeline()
+    (pipeline.inputs / "b.csv").write_text("id\n2\n")
+    assert pipeline() == {"source": "ran", "middle": "ran", "sink": "ran"}
+
+
+def test_max_age_reruns_a_stage_with_unchanged_inputs(pipeline):
+    pipeline(max_age=3600)
+    assert pipeline(max_age=3600)["source"] == "skipped"
+    assert pipeline(max_age=0)["source"] == "ran"
+
+
+def test_force_reruns_named_stages_or_all(pipeline):
+    pipeline()
+    # sink has no input files of its own and middle's fingerprint did not change, so only middle reruns
+    assert pipeline(force=("middle",)) == {"source": "skipped", "middle": "ran", "sink": "skipped"}
+    assert set(pipeline(force=("all",)).values()) == {"ran"}
+
+
+def test_failed_stage_blocks_its_dependents_and_is_retried(pipeline):
+    pipeline.failing.add("middle")
+    assert pipeline() == {"source": "ran", "middle": "failed", "sink": "blocked"}
+    assert set(json.loads(pipeline.state_path.read_text())) == {"source"}
+
+    pipeline.failing.clear()
+    assert pipeline() == {"source": "skipped", "middle": "ran", "sink": "ran"}
@@ -0,0 +1,61 @@
+import json
+import pandas as pd
+from ecomma.storage.parquet_store import (write_partitioned, write_frames, csv_to_parquet, jsonl_to_parquet,
+                                          read_dataset)
+
+
+def orders_frame(n, offset=0):
+    days = ["2026-01-01 10:00:00", "2026-01-02 11:30:00", "2026-01-03 09:15:00"]
+    return pd.DataFrame({"order_id": [str(offset + i) for i in range(n)],
+                         "order_date": [days[i % 3] for i in range(n)]})
+
+
+def test_partitions_are_pruned_and_projected(tmp_path):
+    write_partitioned(orders_frame(9), tmp_path, "order_day", "order_date", "%Y-%m-%d %H:%M:%S")
+
+    df = read_dataset(tmp_path, "order_day", columns=["order_id", "order_date"], start="2026-01-02", end="2026-01-02")
+    assert sorted(df["order_id"].astype(int)) == [1, 4, 7]
+    assert set(df["order_date"]) == {"2026-01-02 11:30:00"}
+    assert sorted(p.name for p in tmp_path.iterdir()) == [f"order_day=2026-01-0{d}" for d in (1, 2, 3)]
+
+
+def test_undated_rows_are_left_out_of_date_ranges(tmp_path):
+    df = pd.concat([orders_frame(3), pd.DataFrame({"order_id": ["x"], "order_date": ["garbage"]})], ignore_index=True)
+    write_partitioned(df, tmp_path, "order_day", "order_date", "%Y-%m-%d %H:%M:%S")
+
+    assert sorted(read_dataset(tmp_path, "order_day", start="2026-01-02")["order_id"]) == ["1", "2"]
+    assert sorted(read_dataset(tmp_path, "order_day", end="2026-01-01")["order_id"]) == ["0"]
+    assert len(read_dataset(tmp_path, "order_day")) == 4
+
+
+def test_replace_swaps_the_days_snapshot_instead_of_appending(tmp_path):
+    snapshot = tmp_path / "products.jsonl"
+    dataset = tmp_path / "parquet"
+    for items in (range(5), range(3)):
+        snapshot.write_text("".join(json.dumps({"id": i}) + "\n" for i in items))
+        jsonl_to_parquet(snapshot, dataset, replace=True)
+
+    assert sorted(read_dataset(dataset, "extract_date")["id"]) == [0, 1, 2]
+
+
+def test_chunked_replace_clears_the_partition_once(tmp_path):
+    chunks = [pd.DataFrame({"id": ["1", "2"]}), pd.DataFrame({"id": ["3"]})]
+    write_frames(iter(chunks), tmp_path, "extract_date", replace=True)
+    assert sorted(read_dataset(tmp_path, "extract_date")["id"]) == ["1", "2", "3"]
+
+    rows = write_frames(iter([pd.DataFrame({"id": ["4"]}), pd.DataFrame({"id": ["5"]})]), tmp_path, "extract_date",
+                        replace=True)
+    assert rows == 2
+    assert sorted(read_dataset(tmp_path, "extract_date")["id"]) == ["4", "5"]
+
+
+def test_converting_a_csv_again_does_not_duplicate_it(tmp_path):
+    csv_path = tmp_path / "orders_1.csv"
+    orders_frame(6).to_csv(csv_path, index=False)
+    dataset = tmp_path / "parquet"
+    write_partitioned(orders_frame(3, offset=100), dataset, "order_day", "order_date", "%Y-%m-%d %H:%M:%S")
+
+    for _ in range(2):
+        csv_to_parquet(csv_path, dataset, "order_day", "order_date", "%Y-%m-%d %H:%M:%S", chunksize=4)
+
+    assert len(read_dataset(dataset, "order_day")) == 9
@@ -0,0 +1,38 @@
+import numpy as np
+import pytest
+from ecomma.datagen.pools import AddressPool, IdPool
+
+
+def test_id_pool_hands_out_every_id_in_range_once():
+    pool = IdPool(1_000, 1_997, seed=4)
+    ids = np.concatenate([pool.sample(400), pool.sample(400), pool.sample(197)])
+    assert sorted(ids.tolist()) == list(range(1_000, 1_997))
+
+
+def test_id_pool_raises_once_exhausted():
+    pool = IdPool(0, 10, seed=1)
+    pool.sample(8)
+    with pytest.raises(ValueError, match="exhausted"):
+        pool.sample(3)
+    assert len(pool.sample(2)) == 2
+
+
+def test_id_pool_is_reproducible_from_the_seed():
+    assert IdPool(0, 10**8, seed=9).sample(50).tolist() == IdPool(0, 10**8, seed=9).sample(50).tolist()
+    assert IdPool(0, 10**8, seed=9).sample(50).tolist() != IdPool(0, 10**8, seed=10).sample(50).tolist()
+
+
+def test_address_pool_is_built_once_and_reused(tmp_path, monkeypatch):
+    first = AddressPool(30, pool_dir=tmp_path)
+    assert first.path.read_text(encoding="utf-8").splitlines() == first.values.tolist()
+
+    monkeypatch.setattr("ecomma.datagen.pools.Faker", None)
+    assert AddressPool(30, pool_dir=tmp_path).values.tolist() == first.values.tolist()
+    assert AddressPool(10, pool_dir=tmp_path).values.tolist() == first.values[:10].tolist()
+
+
+def test_larger_address_pool_extends_the_stored_one(tmp_path):
+    small = AddressPool(10, pool_dir=tmp_path)
+    large = AddressPool(25, pool_dir=tmp_path)
+    assert large.values[:10].tolist() == small.values.tolist()
+    assert len(large.path.read_text(encoding="utf-8").splitlines()) == 25
@@ -0,0 +1,74 @@
+import os
+import json
+import threading
+import numpy as np
+import pytest
+from ecomma.datagen import seed_cache
+from ecomma.datagen.seed_cache import load_seed_arrays
+
+
+def write_products(path, prices):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text("".join(json.dumps({"id": i + 1, "price": p}) + "\n" for i, p in enumerate(prices)), encoding="utf-8")
+    return path
+
+
+def forbid(monkeypatch, name):
+    def fail(*args, **kwargs):
+        raise AssertionError(f"{name} should not be called")
+    monkeypatch.setattr(seed_cache, name, fail)
+
+
+def test_unchanged_source_is_served_from_the_cache(tmp_path, monkeypatch):
+    source = write_products(tmp_path / "products" / "products_1.jsonl", [5.0, 7.5])
+    assert load_seed_arrays(source)["price"].tolist() == [5.0, 7.5]
+
+    forbid(monkeypatch, "file_hash")
+    forbid(monkeypatch, "build_arrays")
+    seed = load_seed_arrays(source)
+    assert isinstance(seed["id"], np.memmap) and seed["id"].tolist() == [1, 2]
+
+
+def test_touched_source_only_refreshes_the_stat(tmp_path, monkeypatch):
+    source = write_products(tmp_path / "products" / "products_1.jsonl", [5.0, 7.5])
+    load_seed_arrays(source)
+    stat = source.stat()
+    os.utime(source, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+    forbid(monkeypatch, "build_arrays")
+    assert load_seed_arrays(source)["price"].tolist() == [5.0, 7.5]
+    meta = json.loads(seed_cache.cache_paths(source)[2].read_text())
+    assert meta["mtime_ns"] == stat.st_mtime_ns + 10**9
+
+
+def test_changed_source_is_rebuilt(tmp_path):
+    source = write_products(tmp_path / "products" / "products_1.jsonl", [5.0, 7.5])
+    load_seed_arrays(source)
+    write_products(source, [1.0, 2.0, 3.0])
+    stat = source.stat()
+    os.utime(source, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+    assert load_seed_arrays(source)["price"].tolist() == [1.0, 2.0, 3.0]
+
+
+@pytest.mark.parametrize("trial", range(5))
+def test_concurrent_cold_loads_all_see_the_full_cache(tmp_path, trial):
+    source = write_products(tmp_path / "products" / "products_1.jsonl", [float(i) for i in range(20000)])
+    start = threading.Barrier(8)
+    results, errors = [], []
+
+    def load():
+        start.wait()
+        try:
+            results.append(len(load_seed_arrays(source)["price"]))
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=load) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert errors == [] and results == [20000] * 8
+    assert not list(seed_cache.cache_paths(source)[0].glob("*.tmp"))
@@ -0,0 +1,38 @@
+import pandas as pd
+import pytest
+from ecomma.load.sqlite_loader import connect, load_table
+
+
+def test_repeated_and_missing_keys_are_counted(tmp_path):
+    conn = connect(tmp_path / "test.db")
+    df = pd.DataFrame({"id": [1, 2, 1, None, 1], "category": ["beauty", "beauty", "laptops", "beauty", "tops"]})
+    metrics = load_table(conn, "products", df)
+
+    assert (metrics["rows"], metrics["duplicates"], metrics["skipped"]) == (2, 2, 1)
+    assert dict(conn.execute("SELECT id, category FROM products")) == {1: "tops", 2: "beauty"}
+
+
+def test_campaigns_sharing_an_id_are_all_kept(tmp_path):
+    conn = connect(tmp_path / "test.db")
+    df = pd.DataFrame({"record_id": ["marketing_1:0", "marketing_1:1", "marketing_1:2"],
+                       "Campaign_ID": ["CMP-1", "CMP-1", "CMP-2"], "Budget_Spend": [10.0, 20.0, 30.0]})
+    assert load_table(conn, "marketing", df)["duplicates"] == 0
+    load_table(conn, "marketing", df)
+
+    assert conn.execute('SELECT COUNT(*), SUM(Budget_Spend) FROM marketing').fetchone() == (3, 60.0)
+
+
+def test_table_keyed_on_another_column_is_refused(tmp_path):
+    conn = connect(tmp_path / "test.db")
+    conn.execute('CREATE TABLE marketing ("Campaign_ID" TEXT PRIMARY KEY, "Budget_Spend" REAL)')
+    with pytest.raises(ValueError, match="record_id"):
+        load_table(conn, "marketing", pd.DataFrame({"record_id": ["a:0"], "Campaign_ID": ["CMP-1"], "Budget_Spend": [1.0]}))
+
+
+def test_reloading_is_idempotent_and_newer_rows_win(tmp_path):
+    conn = connect(tmp_path / "test.db")
+    load_table(conn, "users", pd.DataFrame({"id": [1, 2], "age": [30, 40]}))
+    metrics = load_table(conn, "users", pd.DataFrame({"id": [2, 3], "age": [41, 50]}))
+
+    assert metrics["duplicates"] == 0 and metrics["insert_seconds"] <= metrics["total_seconds"]
+    assert conn.execute("SELECT id, age FROM users ORDER BY id").fetchall() == [(1, 30), (2, 41), (3, 50)]